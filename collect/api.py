@@ -1,15 +1,128 @@
+import time
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import API_POOL_SIZE, API_RATE_LIMIT, API_LIVE_STATUS_TTL, API_CHANNEL_TTL
 
 HEADERS = {'User-Agent': ''}
 
+# 공용 세션 (TCP/TLS 연결 재사용)
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=API_POOL_SIZE)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+
+# 전체 요청 속도 제한 (토큰 버킷)
+class RateLimiter:
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# TTL 캐시 + 동시 조회 중복 제거 (single-flight)
+class TTLCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, ttl: float, loader):
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self.hits += 1
+                    return entry[1]
+
+                waiter = self.inflight.get(key)
+                if waiter is None:
+                    waiter = threading.Event()
+                    self.inflight[key] = waiter
+                    self.misses += 1
+                    break
+
+            # 다른 스레드의 조회 결과 대기
+            waiter.wait()
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self.hits += 1
+                    return entry[1]
+
+        try:
+            value = loader()
+            with self.lock:
+                self.entries[key] = (time.monotonic() + ttl, value)
+            return value
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            waiter.set()
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+LIMITER = RateLimiter(API_RATE_LIMIT)
+CACHE = TTLCache()
+REQUESTS = {'count': 0}
+_requests_lock = threading.Lock()
+
+
+def _get_json(url: str, cookies: dict = None) -> dict:
+    LIMITER.acquire()
+    with _requests_lock:
+        REQUESTS['count'] += 1
+    response = SESSION.get(url, cookies=cookies)
+    response.raise_for_status()
+    return response.json()
+
+
+# 캐시 적중률 / HTTP 호출 수
+def cache_stats() -> dict:
+    with CACHE.lock:
+        hits, misses = CACHE.hits, CACHE.misses
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+        'http_requests': REQUESTS['count'],
+    }
+
+
 def fetch_chatChannelId(streamer: str, cookies: dict) -> str:
     url = f'https://api.chzzk.naver.com/polling/v2/channels/{streamer}/live-status'
     try:
-        response = requests.get(url, cookies=cookies, headers=HEADERS)
-        response.raise_for_status()
-        response = response.json()
-        
-        chatChannelId = response['content']['chatChannelId']
+        chatChannelId = CACHE.get(
+            ('live-status', streamer),
+            API_LIVE_STATUS_TTL,
+            lambda: _get_json(url, cookies)['content']['chatChannelId'],
+        )
         assert chatChannelId!=None
         return chatChannelId
     except Exception as e:
@@ -18,10 +131,11 @@ def fetch_chatChannelId(streamer: str, cookies: dict) -> str:
 def fetch_channelName(streamer: str) -> str:
     url = f'https://api.chzzk.naver.com/service/v1/channels/{streamer}'
     try:
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        response = response.json()
-        return response['content']['channelName']
+        return CACHE.get(
+            ('channel', streamer),
+            API_CHANNEL_TTL,
+            lambda: _get_json(url)['content']['channelName'],
+        )
     except Exception as e:
         raise e
 
@@ -29,9 +143,7 @@ def fetch_channelName(streamer: str) -> str:
 def fetch_accessToken(chatChannelId, cookies: dict) -> str:
     url = f'https://comm-api.game.naver.com/nng_main/v1/chats/access-token?channelId={chatChannelId}&chatType=STREAMING'
     try:
-        response = requests.get(url, cookies=cookies, headers=HEADERS)
-        response.raise_for_status()
-        response = response.json()
+        response = _get_json(url, cookies)
         return response['content']['accessToken'], response['content']['extraToken']
     except Exception as e:
         raise e
@@ -40,9 +152,10 @@ def fetch_accessToken(chatChannelId, cookies: dict) -> str:
 def fetch_userIdHash(cookies: dict) -> str:
     url = 'https://comm-api.game.naver.com/nng_main/v1/user/getUserStatus'
     try:
-        response = requests.get(url, cookies=cookies, headers=HEADERS)
-        response.raise_for_status()
-        response = response.json()
-        return response['content']['userIdHash']
+        return CACHE.get(
+            ('user', tuple(sorted(cookies.items()))),
+            API_CHANNEL_TTL,
+            lambda: _get_json(url, cookies)['content']['userIdHash'],
+        )
     except Exception as e:
         raise e
@@ -0,0 +1,96 @@
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from bursts import BurstDetector
+from config.settings import *
+
+
+# 채널별 초당 채팅 수 (포아송 기준 속도, 일부 채널에 burst_len 초 동안 배율 burst_x 버스트 주입)
+def make_counts(rng, channels, duration, burst_at, burst_len, burst_x, burst_share, scale=1.0):
+    base = rng.lognormal(mean=0.0, sigma=1.2, size=channels).clip(0.2, 200) * scale
+    counts = rng.poisson(np.broadcast_to(base[:, None], (channels, duration)))
+    injected = rng.random(channels) < burst_share
+    for c in np.flatnonzero(injected):
+        extra = rng.poisson(base[c] * (burst_x - 1), size=burst_len)
+        counts[c, burst_at:burst_at + burst_len] += extra
+    return base, counts, injected
+
+
+# 초마다 채널별 채팅을 넣고 기록 주기마다 tick/drain (합성 시각)
+def run(detector, counts, start, users, flush_every):
+    channels, duration = counts.shape
+    names = [f"{c:032x}" for c in range(channels)]
+    detected = {}
+    added = 0
+    elapsed = 0.0
+    for t in range(duration):
+        second = start + t
+        started = time.perf_counter()
+        for c in range(channels):
+            name = names[c]
+            for i in range(counts[c, t]):
+                detector.add(name, second, f"u{(added + i) % users}", donation=i == 0 and t % 97 == 0)
+            added += counts[c, t]
+        if t % flush_every == 0:
+            detector.tick(second)
+            _, events = detector.drain()
+            for streamer_id, started_at, *_ in events:
+                detected.setdefault(streamer_id, (t, started_at))
+        elapsed += time.perf_counter() - started
+    return names, detected, added, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="버스트 감지 지연/오탐, 처리량, 채널당 메모리")
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--duration", type=int, default=900, help="초")
+    parser.add_argument("--burst-at", type=int, default=600)
+    parser.add_argument("--burst-len", type=int, default=30)
+    parser.add_argument("--burst-x", type=float, default=5.0, help="버스트 구간 속도 배율")
+    parser.add_argument("--burst-share", type=float, default=0.3, help="버스트를 넣을 채널 비율")
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="기준 속도 배율 (바쁜 채널에서도 메모리 일정한지 확인)")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    base, counts, injected = make_counts(
+        rng, args.channels, args.duration, args.burst_at, args.burst_len, args.burst_x, args.burst_share, args.rate_scale
+    )
+    start = int(time.time()) - args.duration - 3600
+
+    tracemalloc.start()
+    detector = BurstDetector(idle=10 ** 9)
+    names, detected, added, elapsed = run(detector, counts, start, args.users, max(1, int(BURST_FLUSH_INTERVAL)))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    delays, missed, false_pos = [], 0, 0
+    for c, name in enumerate(names):
+        hit = detected.get(name)
+        if injected[c]:
+            if hit is None or hit[0] < args.burst_at:
+                missed += hit is None
+                false_pos += hit is not None
+            else:
+                delays.append(hit[0] - args.burst_at)
+        elif hit is not None:
+            false_pos += 1
+
+    print(f"channels={args.channels} duration={args.duration}s burst x{args.burst_x} for {args.burst_len}s "
+          f"on {int(injected.sum())} channels, base rate median {np.median(base):.1f}/s")
+    print(f"chats={added:,} throughput={added / elapsed:,.0f} chats/s "
+          f"({elapsed / (args.channels * args.duration) * 1e6:.0f} us per channel-second) "
+          f"memory={memory / args.channels / 1024:.1f} KiB/channel")
+    if delays:
+        print(f"detected={len(delays)} missed={missed} false_positive={false_pos} "
+              f"delay p50={np.percentile(delays, 50):.0f}s p99={np.percentile(delays, 99):.0f}s (기록 주기 포함)")
+    else:
+        print(f"detected=0 missed={missed} false_positive={false_pos}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import sys
+import json
+import time
+import argparse
+import datetime
+
+import codec
+from config.settings import CHZZK_CHAT_CMD
+from fake_chat_server import make_frame
+
+
+# 기존 경로: json.loads → profile 전체 json.loads → json.dumps
+def current_path(raw):
+    raw_message = json.loads(raw)
+    chat_cmd = raw_message["cmd"]
+    if chat_cmd == CHZZK_CHAT_CMD["chat"]:
+        chat_type = "채팅"
+    elif chat_cmd == CHZZK_CHAT_CMD["donation"]:
+        chat_type = "후원"
+    else:
+        return 0
+
+    n = 0
+    for chat_data in raw_message["bdy"]:
+        if chat_data.get("uid") == "anonymous":
+            user_id = "익명의 후원자"
+        else:
+            try:
+                user_id = json.loads(chat_data["profile"])["nickname"]
+                if "msg" not in chat_data:
+                    continue
+            except Exception:
+                continue
+        msg_ms = chat_data.get("msgTime")
+        payload = {
+            "streamer_id": "s",
+            "type": chat_type,
+            "uid": chat_data.get("uid"),
+            "user_id": user_id,
+            "msg": chat_data.get("msg"),
+            "msgTime_ms": msg_ms,
+            "ts_iso": datetime.datetime.utcfromtimestamp(msg_ms / 1000).isoformat() + "Z",
+        }
+        n += len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    return n
+
+
+# codec 경로
+def codec_path(raw):
+    n = 0
+    for chat in codec.iter_chats(codec.loads(raw)):
+        payload = {
+            "streamer_id": "s",
+            "type": chat.chat_type,
+            "uid": chat.uid,
+            "user_id": chat.user_id,
+            "msg": chat.msg,
+            "msgTime_ms": chat.msg_time,
+            "ts_iso": datetime.datetime.utcfromtimestamp(chat.msg_time / 1000).isoformat() + "Z",
+        }
+        n += len(codec.dumps(payload))
+    return n
+
+
+def bench(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for raw in corpus:
+            fn(raw)
+        best = min(best, time.perf_counter() - started)
+    return len(corpus) / best
+
+
+# 와이어 포맷 비교: 메시지당 바이트, 디코딩 처리량
+def bench_wire(corpus, repeat):
+    payloads = []
+    for raw in corpus:
+        for chat in codec.iter_chats(codec.loads(raw)):
+            payloads.append({
+                "streamer_id": "75cbf189b3bb8f9f687d2aca0d0a382b",
+                "streamer_name": "한동숙",
+                "chat_channel_id": "N1abcd",
+                "type": chat.chat_type,
+                "uid": chat.uid,
+                "user_id": chat.user_id,
+                "msg": chat.msg,
+                "msgTime_ms": chat.msg_time,
+                "ts_iso": datetime.datetime.utcfromtimestamp(chat.msg_time / 1000).isoformat() + "Z",
+            })
+
+    results = {}
+    for fmt in (codec.FORMAT_JSON, codec.FORMAT_COMPACT):
+        encoded = [codec.encode_payload(p, fmt)[0] for p in payloads]
+        rate = bench(lambda b: codec.decode_payload(b, fmt), encoded, repeat)
+        results[fmt] = (sum(map(len, encoded)) / len(encoded), rate)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채팅 프레임 디코더 마이크로벤치마크")
+    parser.add_argument("--corpus", help="녹화된 원본 프레임 파일 (한 줄에 프레임 하나)")
+    parser.add_argument("--frames", type=int, default=20000, help="합성 프레임 수 (--corpus 미지정 시)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--record", help="합성 코퍼스를 파일로 저장")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        corpus = [json.dumps(make_frame("cid"), ensure_ascii=False) for _ in range(args.frames)]
+        if args.record:
+            with open(args.record, "w", encoding="utf-8") as f:
+                f.write("\n".join(corpus) + "\n")
+
+    base = bench(current_path, corpus, args.repeat)
+    fast = bench(codec_path, corpus, args.repeat)
+    print(f"frames={len(corpus)} backend={codec.BACKEND} python={sys.version.split()[0]}")
+    print(f"current : {base:>10.0f} frames/s")
+    print(f"codec   : {fast:>10.0f} frames/s  (x{fast / base:.2f})")
+
+    wire = bench_wire(corpus, args.repeat)
+    for fmt, name in ((codec.FORMAT_JSON, "json"), (codec.FORMAT_COMPACT, "compact")):
+        size, rate = wire[fmt]
+        print(f"wire {name:<8}: {size:>6.1f} bytes/msg, decode {rate:>10.0f} msgs/s")
@@ -0,0 +1,157 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+import logs
+import codec
+import metrics
+from messages import parse_message
+from dedup import message_key
+from transport import Message
+from config.settings import *
+
+MODES = ["none", "sync", "queue", "sampled"]
+
+
+def make_messages(n, streamers=50, users=5000):
+    now_ms = int(time.time() * 1000)
+    messages = []
+    for i in range(n):
+        streamer_id = f"{i % streamers:032x}"
+        payload = {
+            "streamer_id": streamer_id,
+            "type": "채팅",
+            "uid": f"u{i % users}",
+            "user_id": f"user{i % users}",
+            "msg": f"bench message {i}",
+            "msgTime_ms": now_ms + i,
+        }
+        data, _ = codec.encode_payload(payload, codec.FORMAT_JSON)
+        key = message_key(streamer_id, payload["uid"], payload["msgTime_ms"], payload["msg"])
+        attrs = {"streamer_id": streamer_id, "type": "chat", "key": key}
+        messages.append(Message(str(i), data, attrs, datetime.now(tz=timezone.utc), _noop, _noop))
+    return messages
+
+
+def _noop(message):
+    pass
+
+
+# 모드별 로깅 구성 (같은 파일에 기록)
+def configure(mode, path):
+    logs.stop()
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+    root.setLevel(logging.INFO)
+    if mode == "sync":
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+        root.addHandler(handler)
+        return handler.stream
+    if mode in ("queue", "sampled"):
+        stream = open(path, "a", encoding="utf-8")
+        logs.setup(level=logging.INFO, fmt="json", stream=stream)
+        return stream
+    return None
+
+
+# sub.callback 과 같은 파싱 + 메시지 단위 로그 (DB 저장 제외)
+def make_callback(mode, logger):
+    sample = logs.Sampler()
+
+    def callback(message):
+        fields = parse_message(message)
+        metrics.observe_received(fields, message)
+        if mode == "sync":
+            # 기존 방식: 저장한 채팅마다 f-string INFO 한 줄
+            logger.info(f"저장 완료 | streamer_id={fields['streamer_id']}, user_id={fields['user_id']}, msg={fields['msg']}")
+        elif mode == "queue":
+            logger.info("stored", extra={"streamer_id": fields["streamer_id"], "message_id": fields["message_id"]})
+        elif mode == "sampled" and sample():
+            logger.info("stored", extra={"streamer_id": fields["streamer_id"], "message_id": fields["message_id"]})
+
+    return callback
+
+
+def run(mode, messages, path):
+    stream = configure(mode, path)
+    dropped = logs.dropped()
+    callback = make_callback(mode, logging.getLogger("bench"))
+
+    cpu, thread_cpu, started = time.process_time(), time.thread_time(), time.perf_counter()
+    for message in messages:
+        callback(message)
+    elapsed = time.perf_counter() - started
+    thread_cpu = time.thread_time() - thread_cpu
+
+	# 백그라운드 출력이 끝날 때까지 포함한 프로세스 CPU
+    logs.stop()
+    cpu = time.process_time() - cpu
+    if stream is not None:
+        stream.close()
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    return len(messages) / elapsed, thread_cpu, cpu, size, logs.dropped() - dropped
+
+
+# 발행 완료 콜백: 메시지마다 클로저 vs 바운드 메서드 vs future 별 기록 + 바운드 메서드 (스풀 퍼블리셔)
+class _Chat:
+    def __init__(self):
+        self.done = 0
+        self.pending = {}
+
+    def _on_published(self, future):
+        self.done += 1
+
+    def _on_done(self, future):
+        data = self.pending.pop(future)
+        self.done += len(data)
+
+
+def bench_done_callbacks(n):
+    results = {}
+    for name in ("closure", "bound", "record"):
+        chat = _Chat()
+        futures = [Future() for _ in range(n)]
+        started = time.perf_counter()
+        for f in futures:
+            if name == "closure":
+                def _on_done(fut, data=b"x"):
+                    chat.done += len(data)
+
+                f.add_done_callback(_on_done)
+            elif name == "record":
+                chat.pending[f] = b"x"
+                f.add_done_callback(chat._on_done)
+            else:
+                f.add_done_callback(chat._on_published)
+            f.set_result(None)
+        results[name] = n / (time.perf_counter() - started)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수신 콜백 처리량: 메시지 단위 동기 로그 vs 큐 + 표본 로그")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    print(f"messages={args.messages} sample_every={LOG_SAMPLE_EVERY}")
+    print(f"{'mode':<8} {'msgs/s':>10} {'caller cpu s':>13} {'process cpu s':>14} {'log MB':>8} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes.split(","):
+            rate, thread_cpu, cpu, size, dropped = run(mode, messages, os.path.join(tmp, f"{mode}.log"))
+            print(f"{mode:<8} {rate:>10,.0f} {thread_cpu:>13.2f} {cpu:>14.2f} {size / 1024 / 1024:>8.1f} {dropped:>8,}")
+
+    done = bench_done_callbacks(args.messages)
+    print(f"done callback | closure {done['closure']:,.0f}/s, bound method {done['bound']:,.0f}/s, "
+          f"per-future record + bound method {done['record']:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
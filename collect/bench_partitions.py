@@ -0,0 +1,163 @@
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from config.settings import *
+
+PLAIN_DDL = """
+CREATE TABLE bench.chat_logs_plain (
+  id           BIGSERIAL PRIMARY KEY,
+  message_id   TEXT UNIQUE,
+  streamer_id  TEXT NOT NULL,
+  user_id      TEXT,
+  msg          TEXT NOT NULL,
+  ts           TIMESTAMPTZ NOT NULL DEFAULT now(),
+  raw          JSONB
+);
+CREATE INDEX ON bench.chat_logs_plain (streamer_id, ts DESC);
+"""
+
+PART_DDL = """
+CREATE TABLE bench.chat_logs_part (
+  id           BIGSERIAL,
+  message_id   TEXT,
+  streamer_id  TEXT NOT NULL,
+  user_id      TEXT,
+  msg          TEXT NOT NULL,
+  ts           TIMESTAMPTZ NOT NULL DEFAULT now(),
+  raw          JSONB,
+  PRIMARY KEY (id, ts),
+  UNIQUE (message_id, ts)
+) PARTITION BY RANGE (ts);
+CREATE INDEX ON bench.chat_logs_part (streamer_id, ts DESC);
+"""
+
+LOAD_SQL = """
+INSERT INTO {table} (message_id, streamer_id, user_id, msg, ts)
+SELECT 'm' || g, md5((g %% %(streamers)s)::text), 'u' || (g %% 50000), 'chat message ' || g,
+       %(now)s - ((g * 7919) %% (%(days)s * 86400)) * interval '1 second'
+FROM generate_series(%(lo)s, %(hi)s) g;
+"""
+
+QUERIES = {
+    "최근 7일 스트리머별 일별 채팅 수": """
+        SELECT streamer_id, date(ts), count(*) FROM {table}
+        WHERE ts >= %(now)s - interval '7 days'
+        GROUP BY 1, 2;
+    """,
+    "최근 1일 고유 사용자": """
+        SELECT streamer_id, count(DISTINCT user_id) FROM {table}
+        WHERE ts >= %(now)s - interval '1 day'
+        GROUP BY 1;
+    """,
+    "전체 기간 일별 채팅 수": """
+        SELECT date(ts), count(*) FROM {table} GROUP BY 1;
+    """,
+}
+
+
+def _timed(cur, sql, params=None, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        if cur.description:
+            cur.fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def setup(conn, args, now):
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS bench;")
+        cur.execute("DROP TABLE IF EXISTS bench.chat_logs_plain, bench.chat_logs_part CASCADE;")
+        cur.execute(PLAIN_DDL)
+        cur.execute(PART_DDL)
+        day = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+        for i in range(-args.days - 1, 2):
+            start = day + timedelta(days=i)
+            cur.execute(
+                f"CREATE TABLE bench.chat_logs_part_{start:%Y%m%d} PARTITION OF bench.chat_logs_part "
+                f"FOR VALUES FROM (%s) TO (%s);",
+                (start, start + timedelta(days=1)),
+            )
+    conn.commit()
+
+
+def load(conn, table, args, now, chunk=1_000_000):
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for lo in range(1, args.rows + 1, chunk):
+            hi = min(lo + chunk - 1, args.rows)
+            cur.execute(
+                LOAD_SQL.format(table=table),
+                {"streamers": args.streamers, "now": now, "days": args.days, "lo": lo, "hi": hi},
+            )
+            conn.commit()
+        cur.execute(f"ANALYZE {table};")
+    conn.commit()
+    return time.perf_counter() - started
+
+
+# sub.py 와 같은 형태의 배치 INSERT 지연
+def bench_insert(conn, table, args, now):
+    latencies = []
+    with conn.cursor() as cur:
+        for b in range(args.insert_batches):
+            rows = [
+                (f"new-{table}-{b}-{i}", f"{i % args.streamers:032x}", f"u{i}", "new chat", now)
+                for i in range(args.batch)
+            ]
+            started = time.perf_counter()
+            execute_values(
+                cur,
+                f"INSERT INTO {table} (message_id, streamer_id, user_id, msg, ts) VALUES %s ON CONFLICT DO NOTHING;",
+                rows,
+                page_size=len(rows),
+            )
+            conn.commit()
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[-1], args.batch * len(latencies) / sum(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chat_logs 파티션 유무 INSERT/집계 비교")
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--streamers", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=500, help="INSERT 배치 크기 (BATCH_MAX_ROWS)")
+    parser.add_argument("--insert-batches", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="bench 스키마 유지")
+    args = parser.parse_args()
+
+    now = datetime.now(tz=timezone.utc)
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        setup(conn, args, now)
+        results = {}
+        for label, table in (("단일", "bench.chat_logs_plain"), ("파티션", "bench.chat_logs_part")):
+            load_s = load(conn, table, args, now)
+            p50, worst, rate = bench_insert(conn, table, args, now)
+            with conn.cursor() as cur:
+                queries = {name: _timed(cur, sql.format(table=table), {"now": now}) for name, sql in QUERIES.items()}
+            results[label] = (load_s, p50, worst, rate, queries)
+
+        print(f"rows={args.rows:,} days={args.days} streamers={args.streamers} batch={args.batch}")
+        for label, (load_s, p50, worst, rate, queries) in results.items():
+            print(f"[{label}] 적재 {load_s:.1f}s | 배치 INSERT p50 {p50 * 1000:.1f}ms, max {worst * 1000:.1f}ms, {rate:,.0f} rows/s")
+            for name, sec in queries.items():
+                print(f"    {name}: {sec * 1000:.1f}ms")
+    finally:
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute("DROP SCHEMA IF EXISTS bench CASCADE;")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import subprocess
+
+import sub
+import pub
+from pub import AsyncChzzkChat
+from transport import get_transport
+from config.settings import *
+
+STAGES = ["msgTime→publish", "publish→receive", "receive→commit", "msgTime→commit"]
+
+
+# API 조회 없이 가짜 채팅 서버에 연결하는 수집기
+class OfflineChat(AsyncChzzkChat):
+    def __init__(self, streamer, cookies, logger, publisher, topic_path, chat_url):
+        super().__init__(streamer, cookies, logger, publisher, topic_path)
+        self.chat_url = chat_url
+
+    async def _resolve(self):
+        self.userIdHash = "bench"
+        self.channelName = self.streamer
+        self.chatChannelId = f"cid-{self.streamer[:8]}"
+        self.accessToken, self.extraToken = "token", "extra"
+
+    async def _fetch_chatChannelId(self):
+        return self.chatChannelId
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+# 단계별 지연 기록 (수신 시각은 콜백, 커밋 시각은 BatchWriter.on_commit)
+class StageRecorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = {}
+        self.samples = {stage: [] for stage in STAGES}
+        self.committed = 0
+        self.recording = False
+
+    def callback(self, message):
+        with self.lock:
+            self.received[message.message_id] = time.time()
+        sub.callback(message)
+
+    def on_commit(self, batch, committed_at):
+        with self.lock:
+            for fields, message in batch:
+                received_at = self.received.pop(message.message_id, None)
+                if not self.recording:
+                    continue
+                self.committed += 1
+
+                raw = fields["raw"] or {}
+                msg_ms = raw.get("msgTime_ms")
+                published = getattr(message, "publish_time", None)
+                published_at = published.timestamp() if published is not None else None
+
+                if msg_ms is not None:
+                    self.samples["msgTime→commit"].append(committed_at - msg_ms / 1000)
+                    if published_at is not None:
+                        self.samples["msgTime→publish"].append(published_at - msg_ms / 1000)
+                if published_at is not None and received_at is not None:
+                    self.samples["publish→receive"].append(received_at - published_at)
+                if received_at is not None:
+                    self.samples["receive→commit"].append(committed_at - received_at)
+
+
+# Pub/Sub 에뮬레이터에 토픽/구독 생성
+def _ensure_emulator_resources():
+    from google.cloud import pubsub_v1
+
+    publisher = pubsub_v1.PublisherClient()
+    subscriber = pubsub_v1.SubscriberClient()
+    try:
+        publisher.create_topic(name=TOPIC_PATH)
+    except Exception:
+        pass
+    try:
+        subscriber.create_subscription(name=SUBSCRIPTION_PATH, topic=TOPIC_PATH)
+    except Exception:
+        pass
+    subscriber.close()
+
+
+async def _drive(args, publisher, recorder):
+    chat_url = f"ws://127.0.0.1:{args.port}"
+    sessions = [
+        OfflineChat(f"{i:032x}", {}, pub.logger, publisher, TOPIC_PATH, chat_url)
+        for i in range(args.channels)
+    ]
+    tasks = [asyncio.create_task(c.run()) for c in sessions]
+
+    await asyncio.sleep(args.warmup)
+    with recorder.lock:
+        recorder.recording = True
+    started = time.monotonic()
+    await asyncio.sleep(args.duration)
+    elapsed = time.monotonic() - started
+
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 → 전송 → 저장 종단 간 벤치마크")
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10.0, help="채널당 초당 프레임 수")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--corpus", default=None, help="녹화된 프레임 파일")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장 (회귀 비교용)")
+    args = parser.parse_args()
+
+    if TRANSPORT == "pubsub" and os.getenv("PUBSUB_EMULATOR_HOST"):
+        _ensure_emulator_resources()
+
+	# 가짜 채팅 서버
+    server_cmd = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_chat_server.py"),
+        "--port", str(args.port), "--rate", str(args.rate), "--seed", str(args.seed),
+    ]
+    if args.corpus:
+        server_cmd += ["--corpus", args.corpus]
+    server = subprocess.Popen(server_cmd)
+
+    recorder = StageRecorder()
+    publisher = None
+    try:
+        time.sleep(1.0)
+
+		# 저장기
+        sub.init_db_pool()
+        sub.writer = sub.BatchWriter(sub.pool, BATCH_MAX_ROWS, BATCH_MAX_LATENCY, sub.logger)
+        sub.writer.on_commit = recorder.on_commit
+        sub.transport = get_transport()
+        sub.streaming_pull_future = sub.transport.subscribe(recorder.callback)
+
+		# 수집기
+        publisher = pub.create_publisher("bench")
+        elapsed = asyncio.run(_drive(args, publisher, recorder))
+
+		# 남은 메시지 저장 대기
+        time.sleep(BATCH_MAX_LATENCY + 2.0)
+    finally:
+        if publisher is not None:
+            publisher.stop()
+        sub.shutdown()
+        server.terminate()
+        server.wait()
+
+    result = {
+        "transport": TRANSPORT,
+        "channels": args.channels,
+        "rate": args.rate,
+        "duration": elapsed,
+        "committed": recorder.committed,
+        "rows_per_sec": recorder.committed / elapsed,
+        "stages": {
+            stage: {
+                "p50_ms": percentile(values, 50) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "n": len(values),
+            }
+            for stage, values in recorder.samples.items()
+        },
+    }
+
+    print(f"transport={TRANSPORT} channels={args.channels} rate={args.rate}/s/ch duration={elapsed:.1f}s")
+    print(f"committed={recorder.committed} throughput={result['rows_per_sec']:.0f} rows/s")
+    print(f"{'stage':<18} {'p50 ms':>10} {'p99 ms':>10} {'n':>8}")
+    for stage in STAGES:
+        st = result["stages"][stage]
+        print(f"{stage:<18} {st['p50_ms']:>10.1f} {st['p99_ms']:>10.1f} {st['n']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import uuid
+import signal
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+import psycopg2
+
+import codec
+from dedup import message_key
+from transport import get_transport
+from config.settings import *
+from config.sql import ROLLUP_TABLES
+
+DELETE_CHATS_SQL = "DELETE FROM chat_logs WHERE streamer_key = (SELECT streamer_key FROM streamers WHERE streamer_id = %s);"
+COUNT_SQL = "SELECT count(*) FROM chat_logs JOIN streamers USING (streamer_key) WHERE streamer_id = %s;"
+
+
+# 벤치마크용 스트리머 채팅 n건 발행 (pub.py 와 같은 페이로드/속성)
+def preload(transport, streamer_id, n, users=5000):
+    now_ms = int(time.time() * 1000)
+    futures = []
+    for i in range(n):
+        msg_ms = now_ms + i
+        payload = {
+            "streamer_id": streamer_id,
+            "streamer_name": "bench",
+            "type": "채팅",
+            "uid": f"u{i % users}",
+            "user_id": f"user{i % users}",
+            "msg": f"bench message {i}",
+            "msgTime_ms": msg_ms,
+            "ts_iso": datetime.fromtimestamp(msg_ms / 1000, tz=timezone.utc).isoformat(),
+        }
+        data, _ = codec.encode_payload(payload, codec.FORMAT_JSON)
+        key = message_key(streamer_id, payload["uid"], msg_ms, payload["msg"])
+        futures.append(transport.publish(TOPIC_PATH, data, streamer_id=streamer_id, type="chat", key=key))
+    for f in futures:
+        f.result()
+
+
+def count_rows(conn, streamer_id):
+    with conn.cursor() as cur:
+        cur.execute(COUNT_SQL, (streamer_id,))
+        n = cur.fetchone()[0]
+    conn.commit()
+    return n
+
+
+def cleanup(conn, streamer_id):
+    with conn.cursor() as cur:
+        cur.execute(DELETE_CHATS_SQL, (streamer_id,))
+        for table in [*ROLLUP_TABLES, "user_hll_daily"]:
+            cur.execute("SAVEPOINT cleanup;")
+            try:
+                cur.execute(f"DELETE FROM {table} WHERE streamer_id = %s;", (streamer_id,))
+            except psycopg2.Error:
+                cur.execute("ROLLBACK TO SAVEPOINT cleanup;")
+        cur.execute("DELETE FROM streamers WHERE streamer_id = %s;", (streamer_id,))
+    conn.commit()
+
+
+# 저장기 프로세스 procs 개로 미리 쌓아 둔 n건을 모두 저장하는 데 걸린 시간 (첫 행 저장 시점부터)
+def run_step(conn, transport, procs, n, timeout):
+    streamer_id = f"bench-{uuid.uuid4().hex[:12]}"
+    preload(transport, streamer_id, n)
+
+    proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sub.py"), "--procs", str(procs)])
+    try:
+        deadline = time.monotonic() + timeout
+        started = None
+        stored = 0
+        while stored < n and time.monotonic() < deadline:
+            time.sleep(0.2)
+            stored = count_rows(conn, streamer_id)
+            if stored and started is None:
+                started = time.monotonic()
+        elapsed = time.monotonic() - started if started else float("nan")
+    finally:
+        # SIGTERM → 수신 중단, 버퍼 저장/ack 후 종료
+        drain_started = time.monotonic()
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+        drain = time.monotonic() - drain_started
+
+    cleanup(conn, streamer_id)
+    return stored, elapsed, drain
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장기 프로세스 수별 처리량 (선형 확장 확인)")
+    parser.add_argument("--procs", default="1,2,4", help="쉼표로 구분한 프로세스 수 단계")
+    parser.add_argument("--messages", type=int, default=200_000, help="단계별 메시지 수")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--min-efficiency", type=float, default=0.7, help="처리량 / (프로세스 수 × 1개 처리량) 하한")
+    args = parser.parse_args()
+
+    if TRANSPORT == "local":
+        sys.exit("TRANSPORT=local 은 프로세스 간에 공유되지 않습니다 (redis 또는 pubsub 사용)")
+
+    transport = get_transport()
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    results = []
+    try:
+        for procs in (int(x) for x in args.procs.split(",")):
+            stored, elapsed, drain = run_step(conn, transport, procs, args.messages, args.timeout)
+            results.append((procs, stored, stored / elapsed, drain))
+    finally:
+        conn.close()
+        transport.close()
+
+    base = results[0][2] / results[0][0]
+    failed = False
+    print(f"transport={TRANSPORT} messages={args.messages} writers={SUB_WRITERS} batch={BATCH_MAX_ROWS}")
+    print(f"{'procs':>5} {'stored':>10} {'rows/s':>10} {'efficiency':>10} {'drain s':>8}")
+    for procs, stored, rate, drain in results:
+        efficiency = rate / (procs * base)
+        failed |= stored < args.messages or efficiency < args.min_efficiency
+        print(f"{procs:>5} {stored:>10,} {rate:>10,.0f} {efficiency:>10.2f} {drain:>8.1f}")
+
+    # DB 한계에 닿으면 효율이 떨어지므로 --procs 는 그 아래 단계로 지정
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import math
+import time
+import signal
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+import logs
+from messages import parse_message
+from transport import get_transport
+from config.settings import *
+from config.sql import *
+
+# 로깅 설정 (큐 + 백그라운드 출력)
+logs.setup()
+logger = logging.getLogger("chatzzk-bursts")
+
+
+# 비트맵 고유 수 추정 (linear counting, 비트가 모두 차면 상한값)
+def _estimate(bits, m):
+    zeros = m - bin(bits).count("1")  # int.bit_count 는 3.10+
+    if zeros == 0:
+        return round(m * math.log(m))
+    return round(-m * math.log(zeros / m))
+
+
+def _at(second):
+    return datetime.fromtimestamp(second, tz=timezone.utc)
+
+
+# 진행 중인 버스트 (시작 = 기준을 넘은 속도 구간의 첫 초)
+class _Burst:
+    __slots__ = ("started", "peak_at", "peak_rate", "baseline", "peak_z", "chatters", "donations")
+
+    def __init__(self, started, second, rate, baseline, z, chatters, donations):
+        self.started = started
+        self.peak_at = second
+        self.peak_rate = rate
+        self.baseline = baseline
+        self.peak_z = z
+        self.chatters = chatters
+        self.donations = donations
+
+
+# 스트리머 하나의 상태 (초 단위 고정 크기 링 버퍼, 채팅량과 무관하게 크기 일정)
+class _Channel:
+    __slots__ = ("head", "closed", "written", "msgs", "chatters", "donations", "bits",
+                 "rate_sum", "mean", "var", "observed", "burst", "last_seen")
+
+    def __init__(self, second, window, unique_window):
+        self.head = second  # 받은 채팅의 가장 늦은 초
+        self.closed = second - 1  # 확정(감지 완료)된 마지막 초
+        self.written = second - 1  # 시계열로 기록한 마지막 초
+        self.msgs = [0] * window
+        self.chatters = [0] * window
+        self.donations = [0] * window
+        self.bits = [0] * unique_window  # 초별 사용자 비트맵 (고유 채팅 사용자 추정)
+        self.rate_sum = 0  # 최근 rate_window 초의 채팅 수 합
+        self.mean = 0.0  # 초당 채팅 수 기준선 (EWMA)
+        self.var = 0.0
+        self.observed = 0
+        self.burst = None
+        self.last_seen = time.monotonic()
+
+
+# 스트리머별 초당 채팅/고유 사용자/후원 수 + EWMA 기준선 대비 z-score 버스트 감지
+class BurstDetector:
+    def __init__(self, window=BURST_WINDOW, rate_window=BURST_RATE_WINDOW, unique_window=BURST_UNIQUE_WINDOW,
+                 unique_bits=BURST_UNIQUE_BITS, lateness=BURST_LATENESS, halflife=BURST_HALFLIFE,
+                 warmup=BURST_WARMUP, z_start=BURST_Z, z_end=BURST_Z_END, min_rate=BURST_MIN_RATE,
+                 idle=BURST_IDLE_SECONDS):
+        # 기록 전에 링 버퍼가 덮어쓰이지 않도록 (분 단위 기록 + 늦은 채팅 + 속도 구간)
+        self.window = max(window, 120 + lateness + rate_window)
+        self.rate_window = rate_window
+        self.unique_window = unique_window
+        self.unique_bits = unique_bits
+        self.lateness = lateness
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.warmup = warmup
+        self.z_start = z_start
+        self.z_end = z_end
+        self.min_rate = min_rate
+        self.idle = idle
+
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._events = {}  # (streamer_id, 시작 초) → 기록할 버스트 행
+        self.late = 0
+        self.bursts = 0
+
+    # 채팅 한 건 (second: 채팅 시각 epoch 초)
+    def add(self, streamer_id, second, uid=None, donation=False):
+        second = min(second, int(time.time()) + self.lateness)
+        with self._lock:
+            ch = self._channels.get(streamer_id)
+            if ch is None:
+                ch = self._channels[streamer_id] = _Channel(second, self.window, self.unique_window)
+            if second <= ch.closed:
+                self.late += 1
+                return
+            if second > ch.head:
+                self._close(streamer_id, ch, second - self.lateness)
+                self._advance(ch, second)
+
+            i = second % self.window
+            ch.msgs[i] += 1
+            if donation:
+                ch.donations[i] += 1
+            if uid is not None:
+                ch.bits[second % self.unique_window] |= 1 << (hash(uid) % self.unique_bits)
+            ch.last_seen = time.monotonic()
+
+    # 채팅이 없는 채널도 시간이 흐르도록 (기록 주기마다)
+    def tick(self, now=None):
+        upto = int(now if now is not None else time.time()) - self.lateness
+        with self._lock:
+            for streamer_id, ch in self._channels.items():
+                self._close(streamer_id, ch, upto)
+
+    # 링 버퍼에서 second 의 값 (버퍼 범위 밖이거나 아직 받지 않은 초는 0)
+    def _get(self, ch, values, second):
+        if ch.head - self.window < second <= ch.head:
+            return values[second % self.window]
+        return 0
+
+    def _advance(self, ch, second):
+        gap = second - ch.head
+        if gap >= self.window:
+            ch.msgs[:] = ch.chatters[:] = ch.donations[:] = [0] * self.window
+        else:
+            for s in range(ch.head + 1, second + 1):
+                i = s % self.window
+                ch.msgs[i] = ch.chatters[i] = ch.donations[i] = 0
+        if gap >= self.unique_window:
+            ch.bits[:] = [0] * self.unique_window
+        else:
+            for s in range(ch.head + 1, second + 1):
+                ch.bits[s % self.unique_window] = 0
+        ch.head = second
+
+    def _close(self, streamer_id, ch, upto):
+        s = ch.closed + 1
+        while s <= upto:
+            # 채팅 없는 구간은 속도 0 이 이어지므로 기준선만 한 번에 감쇠
+            if ch.burst is None and s > ch.head + self.rate_window:
+                decay = (1 - self.alpha) ** (upto - s + 1)
+                ch.mean *= decay
+                ch.var *= decay
+                ch.observed += upto - s + 1
+                ch.rate_sum = 0
+                break
+            self._second(streamer_id, ch, s)
+            s += 1
+        ch.closed = max(ch.closed, upto)
+
+    # 확정된 초 하나: 속도 → z-score → 버스트 시작/최고점/종료, 버스트가 아니면 기준선 갱신
+    def _second(self, streamer_id, ch, s):
+        ch.rate_sum += self._get(ch, ch.msgs, s) - self._get(ch, ch.msgs, s - self.rate_window)
+        if s <= ch.head:
+            ch.chatters[s % self.window] = _estimate(ch.bits[s % self.unique_window], self.unique_bits)
+        rate = ch.rate_sum / self.rate_window
+
+        # 표준편차 하한: 구간 평균의 포아송 잡음 (조용한 채널에서 몇 건으로 감지되지 않도록)
+        std = max(math.sqrt(ch.var), math.sqrt(max(ch.mean, self.min_rate) / self.rate_window))
+        z = (rate - ch.mean) / std
+
+        burst = ch.burst
+        if burst is not None:
+            burst.donations += self._get(ch, ch.donations, s)
+            if rate > burst.peak_rate:
+                burst.peak_at, burst.peak_rate, burst.peak_z = s, rate, z
+                burst.chatters = self._window_chatters(ch, s)
+            if z >= self.z_end:
+                self._record(streamer_id, burst, None)
+                return
+            self._record(streamer_id, burst, s)
+            ch.burst = None
+            logger.info(
+                "버스트 종료 | streamer_id=%s, %ds, peak=%.1f/s (기준 %.1f/s)",
+                streamer_id, s - burst.started, burst.peak_rate, burst.baseline,
+                extra={"streamer_id": streamer_id},
+            )
+            return
+
+        if ch.observed >= self.warmup and rate >= self.min_rate and z >= self.z_start:
+            started = s - self.rate_window + 1
+            donations = sum(self._get(ch, ch.donations, t) for t in range(started, s + 1))
+            ch.burst = _Burst(started, s, rate, ch.mean, z, self._window_chatters(ch, s), donations)
+            self._record(streamer_id, ch.burst, None)
+            self.bursts += 1
+            logger.info(
+                "버스트 시작 | streamer_id=%s, rate=%.1f/s (기준 %.1f/s, z=%.1f)",
+                streamer_id, rate, ch.mean, z, extra={"streamer_id": streamer_id},
+            )
+            return
+
+        # 처음에는 누적 평균, 이후 EWMA
+        ch.observed += 1
+        a = max(self.alpha, 1 / ch.observed)
+        d = rate - ch.mean
+        ch.mean += a * d
+        ch.var = (1 - a) * (ch.var + a * d * d)
+
+    # second 까지 unique_window 초 동안의 고유 채팅 사용자 추정치
+    def _window_chatters(self, ch, second):
+        union = 0
+        for t in range(max(second - self.unique_window, ch.head - self.unique_window) + 1, min(second, ch.head) + 1):
+            union |= ch.bits[t % self.unique_window]
+        return _estimate(union, self.unique_bits)
+
+    def _record(self, streamer_id, burst, ended):
+        self._events[(streamer_id, burst.started)] = (
+            streamer_id, _at(burst.started), _at(ended) if ended is not None else None, _at(burst.peak_at),
+            burst.peak_rate, burst.baseline, burst.peak_z, burst.chatters, burst.donations,
+        )
+
+    # 기록할 분 단위 시계열 행과 버스트 행 (가져간 뒤 비움, 오래 조용한 채널 상태는 버림)
+    def drain(self):
+        series = []
+        with self._lock:
+            idle_before = time.monotonic() - self.idle
+            for streamer_id, ch in list(self._channels.items()):
+                if ch.closed > ch.written:
+                    series.extend(self._minutes(streamer_id, ch))
+                    ch.written = ch.closed
+                if ch.burst is None and ch.last_seen < idle_before:
+                    del self._channels[streamer_id]
+            events, self._events = list(self._events.values()), {}
+        series.sort(key=lambda row: (row[0], row[1]))
+        return series, events
+
+    def _minutes(self, streamer_id, ch):
+        rows = []
+        for minute in range((ch.written + 1) // 60 * 60, ch.closed // 60 * 60 + 1, 60):
+            msgs = self._span(ch, ch.msgs, minute)
+            if not any(msgs):
+                continue
+            rows.append((streamer_id, _at(minute), msgs, self._span(ch, ch.chatters, minute), self._span(ch, ch.donations, minute)))
+        return rows
+
+    # minute 부터 60초 값 (확정된 초만, 링 버퍼에서 많아야 두 조각)
+    def _span(self, ch, values, minute):
+        lo = max(minute, ch.head - self.window + 1)
+        hi = min(minute + 59, ch.closed, ch.head)
+        if hi < lo:
+            return [0] * 60
+        i, j = lo % self.window, hi % self.window
+        part = values[i:j + 1] if i <= j else values[i:] + values[:j + 1]
+        return [0] * (lo - minute) + part + [0] * (minute + 59 - hi)
+
+    def stats(self):
+        with self._lock:
+            active = sum(1 for ch in self._channels.values() if ch.burst is not None)
+            return {"channels": len(self._channels), "active_bursts": active, "bursts": self.bursts, "late": self.late}
+
+
+def _connect():
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    conn.autocommit = False
+    return conn
+
+
+# 시계열/버스트 기록 (실패하면 이번 주기 행은 버림)
+def flush(conn, detector, now=None):
+    detector.tick(now)
+    series, events = detector.drain()
+    if not series and not events:
+        return
+    try:
+        with conn.cursor() as cur:
+            if series:
+                execute_values(cur, UPSERT_RATE_SERIES_SQL, series, page_size=len(series))
+            if events:
+                execute_values(cur, UPSERT_BURSTS_SQL, events, page_size=len(events))
+        conn.commit()
+    except psycopg2.Error as e:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            pass
+        logger.warning("속도/버스트 기록 실패 (series=%d, bursts=%d): %s", len(series), len(events), e)
+
+
+def run():
+    conn = _connect()
+    with conn.cursor() as cur:
+        cur.execute(CREATE_BURST_SQL)
+    conn.commit()
+
+    detector = BurstDetector()
+
+    # 집계용이라 처리 직후 ack (재시작 시 잃는 몇 초는 감수)
+    def callback(message):
+        try:
+            fields = parse_message(message)
+            donation = (message.attributes or {}).get("type") == "donation"
+            detector.add(fields["streamer_id"], int(fields["ts"].timestamp()), fields["uid"], donation)
+        except Exception as e:
+            logger.exception("메시지 처리 실패: %s", e)
+        finally:
+            message.ack()
+
+    transport = get_transport()
+    subscription = BURST_SUBSCRIPTION_PATH if TRANSPORT == "pubsub" else BURST_REDIS_GROUP
+    handle = transport.subscribe(callback, subscription=subscription)
+
+    stop = threading.Event()
+
+    def _stop(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    last_retention = 0.0
+    last_report = time.monotonic()
+    try:
+        while not stop.wait(BURST_FLUSH_INTERVAL):
+            if conn.closed:
+                try:
+                    conn = _connect()
+                except psycopg2.Error as e:
+                    logger.warning("DB 재연결 실패: %s", e)
+                    continue
+            flush(conn, detector)
+
+            # 오래된 초 단위 시계열 정리 (한 시간마다)
+            if time.monotonic() - last_retention >= 3600:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(DELETE_OLD_RATE_SERIES_SQL, (BURST_SERIES_RETENTION_HOURS,))
+                    conn.commit()
+                    last_retention = time.monotonic()
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    logger.warning("시계열 보존 정리 실패: %s", e)
+
+            if time.monotonic() - last_report >= SUPERVISOR_STATS_INTERVAL:
+                last_report = time.monotonic()
+                logger.info("버스트 감지 상태 | %s", detector.stats())
+    finally:
+        handle.cancel()
+        try:
+            handle.result(timeout=SUB_DRAIN_TIMEOUT)
+        except Exception:
+            pass
+        if not conn.closed:
+            flush(conn, detector)
+            conn.close()
+        transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실시간 채팅 속도/버스트 감지 (별도 구독)")
+    parser.parse_args()
+    if TRANSPORT == "local":
+        raise SystemExit("TRANSPORT=local 은 저장기와 메시지를 나눠 받게 됩니다 (redis 또는 pubsub 사용)")
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import re
+import json
+import struct
+import datetime
+from json.decoder import scanstring
+from typing import NamedTuple, Optional
+
+from config.settings import CHZZK_CHAT_CMD
+
+# JSON 백엔드 선택 (orjson > msgspec > json)
+try:
+    import orjson
+
+    BACKEND = "orjson"
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    try:
+        import msgspec
+
+        BACKEND = "msgspec"
+        _decoder = msgspec.json.Decoder()
+        _encoder = msgspec.json.Encoder()
+
+        def loads(data):
+            return _decoder.decode(data)
+
+        def dumps(obj) -> bytes:
+            return _encoder.encode(obj)
+
+    except ImportError:
+        BACKEND = "json"
+
+        def loads(data):
+            return json.loads(data)
+
+        def dumps(obj) -> bytes:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# 채팅 타입 (cmd → 표시 이름, Pub/Sub 속성 값)
+CHAT_TYPES = {
+    CHZZK_CHAT_CMD["chat"]: ("채팅", "chat"),
+    CHZZK_CHAT_CMD["donation"]: ("후원", "donation"),
+}
+
+ANONYMOUS_USER = "익명의 후원자"
+
+
+# 채팅/후원 항목
+class ChatItem(NamedTuple):
+    chat_type: str
+    type_attr: str
+    uid: Optional[str]
+    user_id: str
+    msg: Optional[str]
+    msg_time: Optional[int]
+
+
+_NICKNAME_KEY = '"nickname"'
+
+
+# profile 문자열에서 nickname만 추출 (전체 파싱 생략)
+def profile_nickname(profile: str) -> Optional[str]:
+    i = profile.find(_NICKNAME_KEY)
+    if i >= 0:
+        j = i + len(_NICKNAME_KEY)
+        n = len(profile)
+        while j < n and profile[j] in " \t\r\n:":
+            j += 1
+        if j < n and profile[j] == '"':
+            try:
+                return scanstring(profile, j + 1)[0]
+            except ValueError:
+                pass
+    return loads(profile)["nickname"]
+
+
+# 프레임에서 채팅/후원 항목 추출
+def iter_chats(frame: dict):
+    chat_type = CHAT_TYPES.get(frame.get("cmd"))
+    if chat_type is None:
+        return
+
+    for chat_data in frame["bdy"]:
+        if chat_data.get("uid") == "anonymous":
+            user_id = ANONYMOUS_USER
+        else:
+            if "msg" not in chat_data:
+                continue
+            try:
+                user_id = profile_nickname(chat_data["profile"])
+            except Exception:
+                continue
+
+        yield ChatItem(
+            chat_type[0],
+            chat_type[1],
+            chat_data.get("uid"),
+            user_id,
+            chat_data.get("msg"),
+            chat_data.get("msgTime"),
+        )
+
+
+# 압축 바이너리 포맷 (Pub/Sub 속성 fmt 로 버전 구분, 속성 없으면 JSON)
+FORMAT_JSON = "1"
+FORMAT_COMPACT = "2"
+
+# 헤더: 스트리머 ID 16바이트 + 타입 + msgTime_ms + 문자열 4개 길이, 이후 UTF-8 문자열
+_HEADER = struct.Struct(">16sBqHHHH")
+_NONE = 0xFFFF
+_TYPE_CODES = {"채팅": 0, "후원": 1}
+_TYPE_NAMES = {v: k for k, v in _TYPE_CODES.items()}
+_EPOCH = datetime.datetime(1970, 1, 1)
+_STREAMER_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def _utf8(value) -> bytes:
+    if value is None:
+        return None
+    b = value.encode("utf-8")
+    if len(b) >= _NONE:
+        raise ValueError("string too long for compact format")
+    return b
+
+
+# 스트리머 ID 는 소문자 hex 32자리만 (디코딩 시 .hex() 로 그대로 복원되는 형태, 아니면 ValueError → JSON)
+def encode_compact(payload: dict) -> bytes:
+    streamer_id = payload.get("streamer_id")
+    if not isinstance(streamer_id, str) or not _STREAMER_ID_RE.fullmatch(streamer_id):
+        raise ValueError(f"streamer_id not representable in compact format: {streamer_id!r}")
+    msg_ms = payload.get("msgTime_ms")
+    parts = [
+        _utf8(payload.get("chat_channel_id")),
+        _utf8(payload.get("uid")),
+        _utf8(payload.get("user_id")),
+        _utf8(payload.get("msg")),
+    ]
+    return _HEADER.pack(
+        bytes.fromhex(streamer_id),
+        _TYPE_CODES.get(payload.get("type"), 0),
+        -1 if msg_ms is None else int(msg_ms),
+        *(_NONE if p is None else len(p) for p in parts),
+    ) + b"".join(p for p in parts if p)
+
+
+# 스트리머 이름은 메시지에 싣지 않고 names(id → 이름)로 복원
+def decode_compact(data: bytes, names: dict = None) -> dict:
+    streamer, type_code, msg_ms, *lengths = _HEADER.unpack_from(data, 0)
+    offset = _HEADER.size
+    values = []
+    for n in lengths:
+        if n == _NONE:
+            values.append(None)
+        else:
+            values.append(data[offset:offset + n].decode("utf-8"))
+            offset += n
+    chat_channel_id, uid, user_id, msg = values
+
+    streamer_id = streamer.hex()
+    ts_iso = None
+    if msg_ms < 0:
+        msg_ms = None
+    else:
+        ts_iso = (_EPOCH + datetime.timedelta(milliseconds=msg_ms)).isoformat() + "Z"
+
+    return {
+        "streamer_id": streamer_id,
+        "streamer_name": names.get(streamer_id) if names else None,
+        "chat_channel_id": chat_channel_id,
+        "type": _TYPE_NAMES.get(type_code, "채팅"),
+        "uid": uid,
+        "user_id": user_id,
+        "msg": msg,
+        "msgTime_ms": msg_ms,
+        "ts_iso": ts_iso,
+    }
+
+
+# 페이로드 인코딩 → (bytes, fmt)
+def encode_payload(payload: dict, fmt: str = FORMAT_JSON):
+    if fmt == FORMAT_COMPACT:
+        try:
+            return encode_compact(payload), FORMAT_COMPACT
+        except (ValueError, TypeError, struct.error):
+            pass
+    return dumps(payload), FORMAT_JSON
+
+
+# fmt 속성에 따라 디코딩 (JSON 메시지는 기존과 동일)
+def decode_payload(data: bytes, fmt: str = None, names: dict = None):
+    if fmt == FORMAT_COMPACT:
+        return decode_compact(data, names)
+    return loads(data)
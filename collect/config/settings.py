@@ -17,6 +17,22 @@ TOPIC_PATH = f"projects/{PROJECT_ID}/topics/{TOPIC_ID}"
 SUBSCRIPTION_ID = os.getenv("PUBSUB_SUBSCRIPTION", "chat-sub")
 SUBSCRIPTION_PATH = f"projects/{PROJECT_ID}/subscriptions/{SUBSCRIPTION_ID}"
 
+# 전송 계층 (pubsub | redis | local)
+TRANSPORT = os.getenv("TRANSPORT", "pubsub")
+
+# Redis Streams
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_STREAM = os.getenv("REDIS_STREAM", "chat")
+REDIS_GROUP = os.getenv("REDIS_GROUP", "chat-sub")
+REDIS_CONSUMER = os.getenv("REDIS_CONSUMER", f"sub-{os.getpid()}")
+REDIS_STREAM_MAXLEN = int(os.getenv("REDIS_STREAM_MAXLEN", "1000000"))
+REDIS_READ_COUNT = int(os.getenv("REDIS_READ_COUNT", "500"))
+REDIS_CLAIM_IDLE_MS = int(os.getenv("REDIS_CLAIM_IDLE_MS", "30000"))
+
+# 단일 프로세스 메모리 큐
+LOCAL_QUEUE_MAX = int(os.getenv("LOCAL_QUEUE_MAX", "100000"))
+LOCAL_WORKERS = int(os.getenv("LOCAL_WORKERS", "2"))
+
 # PostgreSQL
 PG_HOST = os.getenv("PGHOST", "distracted_wing")
 PG_PORT = int(os.getenv("PGPORT", "5432"))
@@ -27,13 +43,131 @@ PG_PASS = os.getenv("PGPASSWORD", "password")
 POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
 POOL_MAX = int(os.getenv("PG_POOL_MAX", "5"))
 
+# chat_logs 파티션 (day | week, 미리 만들 구간 수, 보존 일수(0: 무제한), detach | drop, 관리 주기 초)
+PARTITION_INTERVAL = os.getenv("PARTITION_INTERVAL", "day")
+PARTITION_PREMAKE = int(os.getenv("PARTITION_PREMAKE", "7"))
+PARTITION_RETENTION_DAYS = int(os.getenv("PARTITION_RETENTION_DAYS", "0"))
+PARTITION_RETENTION_ACTION = os.getenv("PARTITION_RETENTION_ACTION", "detach")
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "3600"))
+MIGRATE_BATCH_SIZE = int(os.getenv("MIGRATE_BATCH_SIZE", "50000"))
+
+# 차원 테이블 (streamers, chat_users) 키 캐시 크기 (저장기 프로세스당 LRU)
+DIM_CACHE_STREAMERS = int(os.getenv("DIM_CACHE_STREAMERS", "10000"))
+DIM_CACHE_USERS = int(os.getenv("DIM_CACHE_USERS", "200000"))
+
+# chat_logs.raw 저장 (full: payload 전체 | prune: 컬럼/차원 테이블에 없는 필드만)
+RAW_POLICY = os.getenv("RAW_POLICY", "prune")
+# 보존 일수가 지난 파티션의 raw 처리 (0: 그대로, side: 압축 보조 테이블 chat_raw 로 이동 | drop: 삭제, Parquet 아카이브 이후)
+RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", "0"))
+RAW_RETENTION_ACTION = os.getenv("RAW_RETENTION_ACTION", "side")
+RAW_SIDE_CHUNK = int(os.getenv("RAW_SIDE_CHUNK", "1000"))
+RAW_VACUUM_FULL = os.getenv("RAW_VACUUM_FULL", "1") == "1"
+
+# 증분 집계 (배치 커밋 시 분/시/일 집계 갱신, 날짜 기준 시간대)
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "1") == "1"
+ROLLUP_TZ = os.getenv("ROLLUP_TZ", "Asia/Seoul")
+
+# 고유 사용자 HLL 스케치 (postgresql-hll 확장, 레지스터 2^log2m 개 → 표준 오차 약 1.04/sqrt(2^log2m))
+HLL_ENABLED = os.getenv("HLL_ENABLED", "1") == "1"
+HLL_LOG2M = int(os.getenv("HLL_LOG2M", "12"))
+
+# 수집기 중복 제거 (채널당 최근 키 수 / 유지 시간 초, 재연결 시 다시 받는 최근 채팅 50개 걸러내기)
+DEDUP_MAX_KEYS = int(os.getenv("DEDUP_MAX_KEYS", "500"))
+DEDUP_WINDOW = float(os.getenv("DEDUP_WINDOW", "3600"))
+
+# 배치 저장 (행 수 / 최대 대기 초)
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "500"))
+BATCH_MAX_LATENCY = float(os.getenv("BATCH_MAX_LATENCY", "0.5"))
+
+# 저장기 (프로세스 수, 프로세스당 배치 저장 스레드 수, 수신 콜백이 대기하기 시작하는 버퍼 행 수, 종료 시 drain 대기 초)
+SUB_PROCS = int(os.getenv("SUB_PROCS", "1"))
+SUB_WRITERS = int(os.getenv("SUB_WRITERS", "2"))
+SUB_MAX_PENDING = int(os.getenv("SUB_MAX_PENDING", "5000"))
+SUB_DRAIN_TIMEOUT = float(os.getenv("SUB_DRAIN_TIMEOUT", "30"))
+
+# Pub/Sub 흐름 제어 (프로세스당 미확인 메시지 수/바이트 상한, 콜백 스레드 수)
+SUB_FLOW_MAX_MESSAGES = int(os.getenv("SUB_FLOW_MAX_MESSAGES", "5000"))
+SUB_FLOW_MAX_BYTES = int(os.getenv("SUB_FLOW_MAX_BYTES", str(50 * 1024 * 1024)))
+SUB_CALLBACK_THREADS = int(os.getenv("SUB_CALLBACK_THREADS", "10"))
+
+# 발행 페이로드 포맷 (1: JSON, 2: 압축 바이너리)
+PAYLOAD_FORMAT = os.getenv("PAYLOAD_FORMAT", "1")
+
+# 발행 스풀 (메모리 큐 상한, 동시 발행 상한, 세그먼트 크기, 재전송 배치/재시도 간격)
+SPOOL_ENABLED = os.getenv("SPOOL_ENABLED", "1") == "1"
+SPOOL_DIR = os.getenv("SPOOL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "spool"))
+SPOOL_MAX_QUEUE = int(os.getenv("SPOOL_MAX_QUEUE", "10000"))
+SPOOL_MAX_INFLIGHT = int(os.getenv("SPOOL_MAX_INFLIGHT", "2000"))
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+SPOOL_FSYNC = os.getenv("SPOOL_FSYNC", "0") == "1"
+SPOOL_REPLAY_BATCH = int(os.getenv("SPOOL_REPLAY_BATCH", "500"))
+SPOOL_RETRY_INTERVAL = float(os.getenv("SPOOL_RETRY_INTERVAL", "5"))
+SPOOL_PUBLISH_TIMEOUT = float(os.getenv("SPOOL_PUBLISH_TIMEOUT", "30"))
+
 # 경로
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 COOKIES_PATH = os.path.join(BASE_DIR, "cookies.json")
 STREAMER_LIST_PATH = os.path.join(BASE_DIR, "streamer_list.json")
 
-# 로깅
+# 수집기 (thread | async | supervisor), 프로세스 수
+COLLECTOR_MODE = os.getenv("COLLECTOR_MODE", "thread")
+COLLECTOR_PROCS = int(os.getenv("COLLECTOR_PROCS", "1"))
+
+# 감독 모드 (일관 해시 가상 노드 수, 통계 보고 주기 초)
+SUPERVISOR_VNODES = int(os.getenv("SUPERVISOR_VNODES", "64"))
+SUPERVISOR_STATS_INTERVAL = float(os.getenv("SUPERVISOR_STATS_INTERVAL", "30"))
+WORKER_STATS_INTERVAL = float(os.getenv("WORKER_STATS_INTERVAL", "10"))
+
+# 치지직 API (연결 풀 크기, 초당 요청 상한, 캐시 TTL 초)
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "32"))
+API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "20"))
+API_LIVE_STATUS_TTL = float(os.getenv("API_LIVE_STATUS_TTL", "60"))
+API_CHANNEL_TTL = float(os.getenv("API_CHANNEL_TTL", "3600"))
+
+# 치지직 채팅 서버
+CHZZK_CHAT_URL = os.getenv("CHZZK_CHAT_URL", "wss://kr-ss1.chat.naver.com/chat")
+
+# 재연결 (백오프 시작/상한 초, 프로세스당 동시 핸드셰이크 수, 오프라인 채널 확인 주기 초)
+RECONNECT_BASE = float(os.getenv("RECONNECT_BASE", "1"))
+RECONNECT_CAP = float(os.getenv("RECONNECT_CAP", "60"))
+RECONNECT_MAX_HANDSHAKES = int(os.getenv("RECONNECT_MAX_HANDSHAKES", "8"))
+RECONNECT_OFFLINE_POLL = float(os.getenv("RECONNECT_OFFLINE_POLL", "120"))
+
+# Prometheus 지표 (/metrics 엔드포인트 주소, 수집기/저장기 포트, 0 이면 끔)
+# 워커/저장기 프로세스는 기준 포트 + 번호, 번호는 METRICS_PORT_SPAN 미만 (두 구간이 겹치면 시작 시 오류)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+PUB_METRICS_PORT = int(os.getenv("PUB_METRICS_PORT", "9108"))
+SUB_METRICS_PORT = int(os.getenv("SUB_METRICS_PORT", "9208"))
+METRICS_PORT_SPAN = int(os.getenv("METRICS_PORT_SPAN", "100"))
+
+# 로깅 (json | text, 메시지 단위 이벤트는 N 건에 하나만, 출력 대기 큐 상한)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1000"))
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+
+# 실시간 채팅 속도/버스트 감지 (bursts.py, 저장기와 별도 구독/컨슈머 그룹)
+BURST_SUBSCRIPTION_ID = os.getenv("BURST_SUBSCRIPTION", "chat-bursts")
+BURST_SUBSCRIPTION_PATH = f"projects/{PROJECT_ID}/subscriptions/{BURST_SUBSCRIPTION_ID}"
+BURST_REDIS_GROUP = os.getenv("BURST_REDIS_GROUP", "chat-bursts")
+# 스트리머별 초 단위 링 버퍼 길이, 속도 계산 구간, 고유 채팅 사용자 구간 (초), 사용자 비트맵 크기
+BURST_WINDOW = int(os.getenv("BURST_WINDOW", "300"))
+BURST_RATE_WINDOW = int(os.getenv("BURST_RATE_WINDOW", "10"))
+BURST_UNIQUE_WINDOW = int(os.getenv("BURST_UNIQUE_WINDOW", "60"))
+BURST_UNIQUE_BITS = int(os.getenv("BURST_UNIQUE_BITS", "2048"))
+# 늦게 도착한 채팅을 기다리는 초 (이후 그 초는 확정)
+BURST_LATENESS = int(os.getenv("BURST_LATENESS", "2"))
+# 기준선 EWMA 반감기 초, 감지 전 최소 관측 초, 시작/종료 z-score, 최소 초당 채팅 수
+BURST_HALFLIFE = float(os.getenv("BURST_HALFLIFE", "300"))
+BURST_WARMUP = int(os.getenv("BURST_WARMUP", "120"))
+BURST_Z = float(os.getenv("BURST_Z", "4"))
+BURST_Z_END = float(os.getenv("BURST_Z_END", "1.5"))
+BURST_MIN_RATE = float(os.getenv("BURST_MIN_RATE", "1"))
+# DB 기록 주기 초, 채팅이 없으면 상태를 버리는 초, 초 단위 시계열 보존 시간
+BURST_FLUSH_INTERVAL = float(os.getenv("BURST_FLUSH_INTERVAL", "2"))
+BURST_IDLE_SECONDS = int(os.getenv("BURST_IDLE_SECONDS", "1800"))
+BURST_SERIES_RETENTION_HOURS = int(os.getenv("BURST_SERIES_RETENTION_HOURS", "72"))
 
 # API 코드
 CHZZK_CHAT_CMD = {
@@ -1,18 +1,393 @@
+# 차원 테이블 (스트리머: 치지직 채널 ID, 채팅 사용자: 치지직 uid + 닉네임 이력)
+CREATE_DIMENSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS streamers (
+  streamer_key     SERIAL PRIMARY KEY,
+  streamer_id      TEXT NOT NULL UNIQUE,
+  name             TEXT,
+  chat_channel_id  TEXT,
+  first_seen       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS chat_users (
+  user_key    BIGSERIAL PRIMARY KEY,
+  uid         TEXT NOT NULL UNIQUE,
+  nickname    TEXT,
+  first_seen  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS chat_user_nicknames (
+  user_key    BIGINT NOT NULL REFERENCES chat_users (user_key),
+  nickname    TEXT NOT NULL,
+  first_seen  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (user_key, nickname)
+);
+"""
+
+# 캐시에 없는 차원 행 (중복 없는 입력, 키 순서로 정렬)
+UPSERT_STREAMERS_SQL = """
+INSERT INTO streamers AS t (streamer_id, name, chat_channel_id) VALUES %s
+ON CONFLICT (streamer_id) DO UPDATE
+  SET name = COALESCE(EXCLUDED.name, t.name),
+      chat_channel_id = COALESCE(EXCLUDED.chat_channel_id, t.chat_channel_id),
+      updated_at = now()
+RETURNING streamer_id, streamer_key;
+"""
+
+UPSERT_CHAT_USERS_SQL = """
+INSERT INTO chat_users AS t (uid, nickname) VALUES %s
+ON CONFLICT (uid) DO UPDATE
+  SET nickname = COALESCE(EXCLUDED.nickname, t.nickname), updated_at = now()
+RETURNING uid, user_key;
+"""
+
+INSERT_NICKNAMES_SQL = """
+INSERT INTO chat_user_nicknames (user_key, nickname) VALUES %s
+ON CONFLICT DO NOTHING;
+"""
+
+# raw 에서 뺄 키 (컬럼/차원 테이블에 있는 값)
+DIMENSION_RAW_KEYS = ["streamer_id", "streamer_name", "chat_channel_id", "uid", "user_id", "msg", "msgTime_ms", "ts_iso"]
+
+# ts 기준 범위 파티션 (중복 제거 키에 파티션 키 포함, 고정 길이 컬럼 먼저)
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS chat_logs (
-  id           BIGSERIAL PRIMARY KEY,
-  message_id   TEXT UNIQUE,
-  streamer_id  TEXT NOT NULL,
-  user_id      TEXT,
-  msg          TEXT NOT NULL,
-  ts           TIMESTAMPTZ NOT NULL DEFAULT now(),
-  raw          JSONB
+  id            BIGSERIAL,
+  ts            TIMESTAMPTZ NOT NULL DEFAULT now(),
+  user_key      BIGINT,
+  streamer_key  INT NOT NULL,
+  message_id    TEXT,
+  msg           TEXT NOT NULL,
+  raw           JSONB,
+  CONSTRAINT chat_logs_pk PRIMARY KEY (id, ts),
+  CONSTRAINT chat_logs_message_uq UNIQUE (message_id, ts)
+) PARTITION BY RANGE (ts);
+CREATE INDEX IF NOT EXISTS chat_logs_streamer_ts_idx
+  ON chat_logs (streamer_key, ts DESC);
+CREATE TABLE IF NOT EXISTS chat_logs_default PARTITION OF chat_logs DEFAULT;
+"""
+
+# 파티션 (이름, 시작, 끝)
+CREATE_PARTITION_SQL = """
+CREATE TABLE IF NOT EXISTS {name} PARTITION OF chat_logs
+  FOR VALUES FROM (%s) TO (%s);
+"""
+
+# chat_logs 파티션 목록과 범위
+LIST_PARTITIONS_SQL = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+JOIN pg_class p ON p.oid = i.inhparent
+WHERE p.relname = 'chat_logs';
+"""
+
+DETACH_PARTITION_SQL = "ALTER TABLE chat_logs DETACH PARTITION {name};"
+
+# DEFAULT 파티션에 들어간 구간 행 → 새 구간 파티션으로 이동 (분리 → 생성 → 이동 → 다시 연결, 한 트랜잭션)
+DEFAULT_HAS_ROWS_SQL = "SELECT EXISTS (SELECT 1 FROM chat_logs_default WHERE ts >= %s AND ts < %s);"
+DETACH_DEFAULT_SQL = "ALTER TABLE chat_logs DETACH PARTITION chat_logs_default;"
+MOVE_FROM_DEFAULT_SQL = """
+WITH moved AS (DELETE FROM chat_logs_default WHERE ts >= %s AND ts < %s RETURNING *)
+INSERT INTO {name} SELECT * FROM moved;
+"""
+ATTACH_DEFAULT_SQL = "ALTER TABLE chat_logs ATTACH PARTITION chat_logs_default DEFAULT;"
+DROP_PARTITION_SQL = "DROP TABLE IF EXISTS {name};"
+
+# 테이블 종류 (r: 일반, p: 파티션)
+TABLE_KIND_SQL = "SELECT relkind FROM pg_class WHERE relname = %s AND relnamespace = 'public'::regnamespace;"
+
+# 차원 키 컬럼이 있는지 (없으면 이전 스키마)
+HAS_COLUMN_SQL = """
+SELECT EXISTS (
+  SELECT 1 FROM information_schema.columns
+  WHERE table_schema = 'public' AND table_name = %s AND column_name = %s
+);
+"""
+
+# 기존 chat_logs (단일 또는 파티션 테이블) → {source} 로 이름 변경 (새 테이블과 이름이 겹치는 인덱스/파티션/시퀀스 포함)
+SELECT_TABLE_INDEXES_SQL = "SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND tablename = %s;"
+RENAME_INDEX_SQL = "ALTER INDEX {name} RENAME TO {new};"
+RENAME_TABLE_SQL = "ALTER TABLE {name} RENAME TO {new};"
+RENAME_SEQUENCE_SQL = "ALTER SEQUENCE IF EXISTS chat_logs_id_seq RENAME TO {source}_id_seq;"
+
+MIGRATE_RANGE_SQL = "SELECT min(id), max(id), min(ts), max(ts) FROM {source};"
+
+# 이전 스키마 행에서 차원 테이블 채우기 (uid 가 없으면 'nick:' + 닉네임)
+MIGRATE_STREAMERS_SQL = """
+INSERT INTO streamers (streamer_id, name, chat_channel_id, first_seen)
+SELECT DISTINCT ON (streamer_id) streamer_id, raw->>'streamer_name', raw->>'chat_channel_id',
+       min(ts) OVER (PARTITION BY streamer_id)
+FROM {source}
+ORDER BY streamer_id, ts DESC
+ON CONFLICT (streamer_id) DO NOTHING;
+"""
+
+MIGRATE_USERS_SQL = """
+CREATE TEMP TABLE migrate_users ON COMMIT DROP AS
+SELECT COALESCE(raw->>'uid', 'nick:' || user_id) AS uid, user_id AS nickname, min(ts) AS first_seen, max(ts) AS last_seen
+FROM {source}
+WHERE user_id IS NOT NULL
+GROUP BY 1, 2;
+
+INSERT INTO chat_users (uid, nickname, first_seen)
+SELECT DISTINCT ON (uid) uid, nickname, min(first_seen) OVER (PARTITION BY uid)
+FROM migrate_users
+ORDER BY uid, last_seen DESC
+ON CONFLICT (uid) DO NOTHING;
+
+INSERT INTO chat_user_nicknames (user_key, nickname, first_seen)
+SELECT u.user_key, m.nickname, m.first_seen
+FROM migrate_users m JOIN chat_users u USING (uid)
+ON CONFLICT DO NOTHING;
+"""
+
+# id 구간 배치 복사 (streamer_id/user_id → 대리 키, RAW_POLICY=prune 이면 raw 에서 중복 키 제거)
+MIGRATE_COPY_SQL = """
+INSERT INTO chat_logs (id, ts, user_key, streamer_key, message_id, msg, raw)
+SELECT c.id, c.ts, u.user_key, s.streamer_key, c.message_id, c.msg,
+       NULLIF(c.raw - %s::text[], '{{}}'::jsonb)
+FROM {source} c
+JOIN streamers s ON s.streamer_id = c.streamer_id
+LEFT JOIN chat_users u ON u.uid = COALESCE(c.raw->>'uid', 'nick:' || c.user_id)
+WHERE c.id > %s AND c.id <= %s
+ON CONFLICT DO NOTHING;
+"""
+
+MIGRATE_SETVAL_SQL = "SELECT setval(pg_get_serial_sequence('chat_logs', 'id'), %s);"
+
+# 테이블 크기 (파티션 테이블은 하위 파티션 합계, 행 수는 통계 추정치)
+TABLE_SIZE_SQL = """
+SELECT COALESCE(sum(c.reltuples) FILTER (WHERE c.reltuples > 0), 0)::bigint,
+       COALESCE(sum(pg_table_size(t.relid)), 0)::bigint,
+       COALESCE(sum(pg_indexes_size(t.relid)), 0)::bigint
+FROM pg_partition_tree(%s::regclass) t
+JOIN pg_class c ON c.oid = t.relid
+WHERE t.isleaf;
+"""
+
+# 오래된 raw 보조 테이블 (id 구간 묶음 하나가 한 행 → 값이 커서 TOAST 압축 적용) + 파티션별 처리 기록
+CREATE_RAW_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS chat_raw (
+  first_id   BIGINT PRIMARY KEY,
+  last_id    BIGINT NOT NULL,
+  partition  TEXT NOT NULL,
+  raws       JSONB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS raw_retention_log (
+  partition  TEXT PRIMARY KEY,
+  action     TEXT NOT NULL,
+  rows       BIGINT NOT NULL,
+  done_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+# PostgreSQL 14+ (이전 버전은 기본 pglz)
+RAW_COMPRESSION_SQL = "ALTER TABLE chat_raw ALTER COLUMN raws SET COMPRESSION lz4;"
+
+SELECT_RAW_DONE_SQL = "SELECT partition FROM raw_retention_log;"
+INSERT_RAW_DONE_SQL = "INSERT INTO raw_retention_log (partition, action, rows) VALUES (%s, %s, %s) ON CONFLICT (partition) DO NOTHING;"
+
+SELECT_ID_RANGE_SQL = "SELECT min(id), max(id) FROM {name};"
+
+# id 구간의 raw → 보조 테이블 한 행 ({"id": raw}), 그 뒤 같은 구간 raw 비우기
+MOVE_RAW_SQL = """
+INSERT INTO chat_raw (first_id, last_id, partition, raws)
+SELECT min(id), max(id), %s, jsonb_object_agg(id, raw)
+FROM {name}
+WHERE id > %s AND id <= %s AND raw IS NOT NULL
+HAVING count(*) > 0;
+"""
+
+CLEAR_RAW_SQL = "UPDATE {name} SET raw = NULL WHERE id > %s AND id <= %s AND raw IS NOT NULL;"
+
+# 기존 행 raw 에서 컬럼/차원 테이블에 있는 키 제거 (id 구간 배치)
+PRUNE_RAW_SQL = """
+UPDATE chat_logs SET raw = NULLIF(raw - %s::text[], '{}'::jsonb)
+WHERE id > %s AND id <= %s AND raw ?| %s::text[];
+"""
+
+SELECT_CHAT_ID_RANGE_SQL = "SELECT min(id), max(id) FROM chat_logs;"
+
+# 한 행의 raw (chat_logs 에 없으면 보조 테이블)
+SELECT_RAW_SQL = """
+SELECT COALESCE(
+  (SELECT raw FROM chat_logs WHERE id = %(id)s),
+  (SELECT raws -> %(id)s::text FROM chat_raw WHERE first_id <= %(id)s AND last_id >= %(id)s ORDER BY first_id DESC LIMIT 1)
 );
-  ON chat_logs (streamer_id, ts DESC);
 """
 
 INSERT_SQL = """
-INSERT INTO chat_logs (message_id, streamer_id, user_id, msg, ts, raw)
+INSERT INTO chat_logs (message_id, streamer_key, user_key, msg, ts, raw)
 VALUES (%s, %s, %s, %s, %s, %s)
-ON CONFLICT (message_id) DO NOTHING;
-"""
\ No newline at end of file
+ON CONFLICT DO NOTHING;
+"""
+
+INSERT_BATCH_SQL = """
+INSERT INTO chat_logs (message_id, streamer_key, user_key, msg, ts, raw)
+VALUES %s
+ON CONFLICT DO NOTHING;
+"""
+
+# 증분 집계 테이블 (sub.py 배치 커밋과 같은 트랜잭션에서 갱신)
+CREATE_ROLLUP_SQL = """
+CREATE TABLE IF NOT EXISTS chat_counts_minute (
+  streamer_id  TEXT NOT NULL,
+  bucket       TIMESTAMPTZ NOT NULL,
+  msg_count    BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, bucket)
+);
+CREATE TABLE IF NOT EXISTS chat_counts_hourly (
+  streamer_id  TEXT NOT NULL,
+  bucket       TIMESTAMPTZ NOT NULL,
+  msg_count    BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, bucket)
+);
+CREATE TABLE IF NOT EXISTS chat_counts_daily (
+  streamer_id  TEXT NOT NULL,
+  chat_date    DATE NOT NULL,
+  msg_count    BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, chat_date)
+);
+CREATE TABLE IF NOT EXISTS user_counts_daily (
+  streamer_id     TEXT NOT NULL,
+  chat_date       DATE NOT NULL,
+  user_key        BIGINT NOT NULL,
+  user_msg_count  BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, chat_date, user_key)
+);
+CREATE TABLE IF NOT EXISTS chat_length_daily (
+  streamer_id  TEXT NOT NULL,
+  chat_date    DATE NOT NULL,
+  msg_length   INT NOT NULL,
+  msg_count    BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, chat_date, msg_length)
+);
+"""
+
+ROLLUP_TABLES = ["chat_counts_minute", "chat_counts_hourly", "chat_counts_daily", "user_counts_daily", "chat_length_daily"]
+
+# 실제로 저장된 행만 집계하도록 RETURNING
+INSERT_BATCH_RETURNING_SQL = INSERT_BATCH_SQL.rstrip().rstrip(";") + """
+RETURNING streamer_key, user_key, msg, ts;
+"""
+
+# 사용자 키가 닉네임(TEXT)이던 집계 테이블 (차원 테이블 이전 후 재구성)
+DROP_USER_ROLLUPS_SQL = "DROP TABLE IF EXISTS user_counts_daily, user_hll_daily CASCADE;"
+
+UPSERT_COUNTS_MINUTE_SQL = """
+INSERT INTO chat_counts_minute AS t (streamer_id, bucket, msg_count) VALUES %s
+ON CONFLICT (streamer_id, bucket) DO UPDATE SET msg_count = t.msg_count + EXCLUDED.msg_count;
+"""
+
+UPSERT_COUNTS_HOURLY_SQL = """
+INSERT INTO chat_counts_hourly AS t (streamer_id, bucket, msg_count) VALUES %s
+ON CONFLICT (streamer_id, bucket) DO UPDATE SET msg_count = t.msg_count + EXCLUDED.msg_count;
+"""
+
+UPSERT_COUNTS_DAILY_SQL = """
+INSERT INTO chat_counts_daily AS t (streamer_id, chat_date, msg_count) VALUES %s
+ON CONFLICT (streamer_id, chat_date) DO UPDATE SET msg_count = t.msg_count + EXCLUDED.msg_count;
+"""
+
+UPSERT_USER_COUNTS_SQL = """
+INSERT INTO user_counts_daily AS t (streamer_id, chat_date, user_key, user_msg_count) VALUES %s
+ON CONFLICT (streamer_id, chat_date, user_key) DO UPDATE SET user_msg_count = t.user_msg_count + EXCLUDED.user_msg_count;
+"""
+
+UPSERT_LENGTH_SQL = """
+INSERT INTO chat_length_daily AS t (streamer_id, chat_date, msg_length, msg_count) VALUES %s
+ON CONFLICT (streamer_id, chat_date, msg_length) DO UPDATE SET msg_count = t.msg_count + EXCLUDED.msg_count;
+"""
+
+# 스트리머/일별 고유 사용자 HLL 스케치 (hll_union 으로 임의 기간/스트리머 병합)
+CREATE_HLL_SQL = """
+CREATE EXTENSION IF NOT EXISTS hll;
+CREATE TABLE IF NOT EXISTS user_hll_daily (
+  streamer_id  TEXT NOT NULL,
+  chat_date    DATE NOT NULL,
+  users        hll NOT NULL,
+  PRIMARY KEY (streamer_id, chat_date)
+);
+"""
+
+UPSERT_USER_HLL_SQL = """
+INSERT INTO user_hll_daily AS t (streamer_id, chat_date, users)
+SELECT streamer_id, chat_date, hll_add_agg(hll_hash_bigint(user_key), {log2m}, 5)
+FROM (VALUES %s) AS v (streamer_id, chat_date, user_key)
+GROUP BY streamer_id, chat_date
+ON CONFLICT (streamer_id, chat_date) DO UPDATE SET users = hll_union(t.users, EXCLUDED.users);
+"""
+
+BACKFILL_HLL_SQL = """
+LOCK TABLE user_hll_daily IN SHARE ROW EXCLUSIVE MODE;
+TRUNCATE user_hll_daily;
+
+INSERT INTO user_hll_daily (streamer_id, chat_date, users)
+SELECT streamer_id, (ts AT TIME ZONE %(tz)s)::date, hll_add_agg(hll_hash_bigint(user_key), %(log2m)s, 5)
+FROM chat_logs JOIN streamers USING (streamer_key)
+WHERE user_key IS NOT NULL GROUP BY 1, 2;
+"""
+
+# 전체 재집계 (ROLLUP_TZ 기준 날짜/시간, streamer_id 는 차원 테이블에서)
+BACKFILL_ROLLUP_SQL = """
+LOCK TABLE chat_counts_minute, chat_counts_hourly, chat_counts_daily, user_counts_daily, chat_length_daily
+  IN SHARE ROW EXCLUSIVE MODE;
+TRUNCATE chat_counts_minute, chat_counts_hourly, chat_counts_daily, user_counts_daily, chat_length_daily;
+
+INSERT INTO chat_counts_minute (streamer_id, bucket, msg_count)
+SELECT streamer_id, date_trunc('minute', ts), count(*) FROM chat_logs JOIN streamers USING (streamer_key) GROUP BY 1, 2;
+
+INSERT INTO chat_counts_hourly (streamer_id, bucket, msg_count)
+SELECT streamer_id, date_trunc('hour', ts), count(*) FROM chat_logs JOIN streamers USING (streamer_key) GROUP BY 1, 2;
+
+INSERT INTO chat_counts_daily (streamer_id, chat_date, msg_count)
+SELECT streamer_id, (ts AT TIME ZONE %(tz)s)::date, count(*) FROM chat_logs JOIN streamers USING (streamer_key) GROUP BY 1, 2;
+
+INSERT INTO user_counts_daily (streamer_id, chat_date, user_key, user_msg_count)
+SELECT streamer_id, (ts AT TIME ZONE %(tz)s)::date, user_key, count(*) FROM chat_logs JOIN streamers USING (streamer_key)
+WHERE user_key IS NOT NULL GROUP BY 1, 2, 3;
+
+INSERT INTO chat_length_daily (streamer_id, chat_date, msg_length, msg_count)
+SELECT streamer_id, (ts AT TIME ZONE %(tz)s)::date, length(msg), count(*) FROM chat_logs JOIN streamers USING (streamer_key) GROUP BY 1, 2, 3;
+"""
+# 실시간 채팅 속도 (bursts.py, 스트리머/분당 한 행에 초 단위 값 60개)
+CREATE_BURST_SQL = """
+CREATE TABLE IF NOT EXISTS chat_rate_seconds (
+  streamer_id  TEXT NOT NULL,
+  minute       TIMESTAMPTZ NOT NULL,
+  msgs         INT[] NOT NULL,
+  chatters     INT[] NOT NULL,
+  donations    INT[] NOT NULL,
+  PRIMARY KEY (streamer_id, minute)
+);
+CREATE TABLE IF NOT EXISTS chat_bursts (
+  streamer_id  TEXT NOT NULL,
+  started_at   TIMESTAMPTZ NOT NULL,
+  ended_at     TIMESTAMPTZ,
+  peak_at      TIMESTAMPTZ NOT NULL,
+  peak_rate    REAL NOT NULL,
+  baseline     REAL NOT NULL,
+  peak_z       REAL NOT NULL,
+  chatters     INT NOT NULL,
+  donations    INT NOT NULL,
+  PRIMARY KEY (streamer_id, started_at)
+);
+CREATE INDEX IF NOT EXISTS chat_bursts_started_idx ON chat_bursts (started_at DESC);
+"""
+
+# 진행 중인 분은 매 기록마다 덮어씀
+UPSERT_RATE_SERIES_SQL = """
+INSERT INTO chat_rate_seconds (streamer_id, minute, msgs, chatters, donations) VALUES %s
+ON CONFLICT (streamer_id, minute) DO UPDATE
+  SET msgs = EXCLUDED.msgs, chatters = EXCLUDED.chatters, donations = EXCLUDED.donations;
+"""
+
+# 시작 시 한 번, 최고점 갱신/종료 시 다시 기록
+UPSERT_BURSTS_SQL = """
+INSERT INTO chat_bursts (streamer_id, started_at, ended_at, peak_at, peak_rate, baseline, peak_z, chatters, donations) VALUES %s
+ON CONFLICT (streamer_id, started_at) DO UPDATE
+  SET ended_at = EXCLUDED.ended_at, peak_at = EXCLUDED.peak_at, peak_rate = EXCLUDED.peak_rate,
+      peak_z = EXCLUDED.peak_z, chatters = EXCLUDED.chatters, donations = EXCLUDED.donations;
+"""
+
+DELETE_OLD_RATE_SERIES_SQL = "DELETE FROM chat_rate_seconds WHERE minute < now() - make_interval(hours => %s);"
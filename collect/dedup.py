@@ -0,0 +1,47 @@
+import time
+import hashlib
+from collections import OrderedDict
+
+from config.settings import *
+
+
+# 내용 기반 메시지 키 (채널, 사용자, msgTime, 메시지 해시) → 재연결 시 다시 받은 최근 채팅도 같은 키
+def message_key(channel, uid, msg_time, msg):
+    h = hashlib.blake2b(digest_size=16)
+    for part in (channel, uid, msg_time, msg):
+        h.update(str("" if part is None else part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+# 최근 본 키 (최대 개수 + 유지 시간 제한 LRU)
+class SeenKeys:
+    def __init__(self, max_keys=DEDUP_MAX_KEYS, window=DEDUP_WINDOW):
+        self.max_keys = max_keys
+        self.window = window
+        self._keys = OrderedDict()
+        self.hits = 0
+
+    # 처음 보는 키면 기록 후 True, 유지 시간 안에 본 키면 False
+    def add(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        seen = self._keys.get(key)
+        self._keys[key] = now
+        self._keys.move_to_end(key)
+        if seen is not None and now - seen <= self.window:
+            self.hits += 1
+            return False
+        self._expire(now)
+        return True
+
+    def _expire(self, now):
+        keys = self._keys
+        while keys:
+            key, seen = next(iter(keys.items()))
+            if len(keys) > self.max_keys or now - seen > self.window:
+                keys.popitem(last=False)
+            else:
+                break
+
+    def __len__(self):
+        return len(self._keys)
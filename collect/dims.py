@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+
+from config.settings import *
+from config.sql import *
+
+from psycopg2.extras import execute_values
+
+_RAW_KEYS = frozenset(DIMENSION_RAW_KEYS)
+
+
+# 사용자 식별자 (치지직 uid, 없으면 닉네임으로 대신 - partitions.migrate 와 같은 규칙)
+def user_uid(uid, user_id):
+    if uid:
+        return uid
+    if user_id:
+        return "nick:" + user_id
+    return None
+
+
+# raw 에서 컬럼/차원 테이블에 있는 값을 뺀 나머지 (없으면 None)
+def residual_raw(raw):
+    if not isinstance(raw, dict):
+        return raw
+    rest = {k: v for k, v in raw.items() if k not in _RAW_KEYS}
+    return rest or None
+
+
+class _LRU:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# streamer_id / uid → 대리 키 (프로세스 내 LRU, 없거나 이름이 바뀐 경우에만 DB upsert)
+class Dimensions:
+    def __init__(self, max_streamers=DIM_CACHE_STREAMERS, max_users=DIM_CACHE_USERS):
+        self._lock = threading.Lock()
+        self._streamers = _LRU(max_streamers)  # streamer_id → (streamer_key, name, chat_channel_id)
+        self._users = _LRU(max_users)  # uid → (user_key, nickname)
+        self.hits = 0
+        self.misses = 0
+
+    # 배치의 fields 에 streamer_key, user_key 채우기 (새 차원 행은 별도 트랜잭션으로 커밋)
+    def resolve(self, conn, batch_fields):
+        streamer_keys, user_keys = {}, {}
+        streamer_miss, user_miss = {}, {}
+        with self._lock:
+            for f in batch_fields:
+                sid = f["streamer_id"]
+                cached = self._streamers.get(sid)
+                if cached is None or (f["streamer_name"] or cached[1]) != cached[1] \
+                        or (f["chat_channel_id"] or cached[2]) != cached[2]:
+                    streamer_miss[sid] = (f["streamer_name"], f["chat_channel_id"])
+                else:
+                    streamer_keys[sid] = cached[0]
+
+                uid = f["uid"]
+                if uid is None:
+                    continue
+                cached = self._users.get(uid)
+                if cached is None or (f["user_id"] is not None and f["user_id"] != cached[1]):
+                    user_miss[uid] = f["user_id"]
+                else:
+                    user_keys[uid] = cached[0]
+            self.misses += len(streamer_miss) + len(user_miss)
+            self.hits += len(streamer_keys) + len(user_keys)
+
+        if streamer_miss or user_miss:
+            added_streamers, added_users = self._upsert(conn, streamer_miss, user_miss)
+            streamer_keys.update(added_streamers)
+            user_keys.update(added_users)
+
+        for f in batch_fields:
+            f["streamer_key"] = streamer_keys[f["streamer_id"]]
+            f["user_key"] = user_keys.get(f["uid"])
+
+    def _upsert(self, conn, streamer_miss, user_miss):
+        streamer_rows = sorted((sid, name, ccid) for sid, (name, ccid) in streamer_miss.items())
+        user_rows = sorted(user_miss.items())
+        with conn.cursor() as cur:
+            streamer_keys = dict(execute_values(cur, UPSERT_STREAMERS_SQL, streamer_rows, page_size=len(streamer_rows), fetch=True)) if streamer_rows else {}
+            user_keys = dict(execute_values(cur, UPSERT_CHAT_USERS_SQL, user_rows, page_size=len(user_rows), fetch=True)) if user_rows else {}
+            nicknames = sorted((user_keys[uid], nickname) for uid, nickname in user_rows if nickname is not None)
+            if nicknames:
+                execute_values(cur, INSERT_NICKNAMES_SQL, nicknames, page_size=len(nicknames))
+        conn.commit()
+
+        with self._lock:
+            for sid, name, ccid in streamer_rows:
+                prev = self._streamers.get(sid)
+                self._streamers.put(sid, (
+                    streamer_keys[sid],
+                    name if name is not None else (prev[1] if prev else None),
+                    ccid if ccid is not None else (prev[2] if prev else None),
+                ))
+            for uid, nickname in user_rows:
+                prev = self._users.get(uid)
+                self._users.put(uid, (user_keys[uid], nickname if nickname is not None else (prev[1] if prev else None)))
+        return streamer_keys, user_keys
+
+    def stats(self):
+        with self._lock:
+            return {"streamers": len(self._streamers), "users": len(self._users), "hits": self.hits, "misses": self.misses}
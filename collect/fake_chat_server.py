@@ -0,0 +1,146 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+import itertools
+
+import websockets
+
+from config.settings import CHZZK_CHAT_CMD
+
+# 응답 코드 (요청 cmd + 10000)
+CONNECTED_CMD = CHZZK_CHAT_CMD["connect"] + 10000
+RECENT_CHAT_CMD = CHZZK_CHAT_CMD["request_recent_chat"] + 10000
+
+WORDS = ["ㅋㅋㅋㅋ", "와", "미쳤다", "ㄹㅇ", "대박", "가보자", "안녕하세요", "GG", "ㅠㅠ", "헐", "이게 되네", "무야호"]
+
+_seq = itertools.count()
+
+
+# 가짜 채팅/후원 항목 생성
+def make_chat(cid, user_pool=5000, donation=False):
+    n = random.randrange(user_pool)
+    uid = f"{n:032x}"
+    profile = {
+        "userIdHash": uid,
+        "nickname": f"viewer{n}",
+        "profileImageUrl": "",
+        "userRoleCode": "common_user",
+        "badge": None,
+        "title": None,
+        "verifiedMark": False,
+        "activityBadges": [],
+        "streamingProperty": {"subscription": {"accumulativeMonth": n % 24, "tier": 1}},
+    }
+    extras = {"chatType": "STREAMING", "osType": "PC", "streamingChannelId": cid, "emojis": {}}
+    if donation:
+        extras.update({"payAmount": 1000, "donationType": "CHAT"})
+    return {
+        "svcid": "game",
+        "cid": cid,
+        "mbrCnt": 1,
+        "uid": uid,
+        "profile": json.dumps(profile, ensure_ascii=False),
+        "msg": " ".join(random.choices(WORDS, k=random.randint(1, 4))),
+        "msgTypeCode": 10 if donation else 1,
+        "msgStatusType": "NORMAL",
+        "extras": json.dumps(extras, ensure_ascii=False),
+        "ctime": int(time.time() * 1000),
+        "utime": int(time.time() * 1000),
+        "msgTid": None,
+        "msgTime": int(time.time() * 1000),
+    }
+
+
+# 채팅 프레임 (93101 / 93102)
+def make_frame(cid, chats=1, donation_ratio=0.02):
+    donation = random.random() < donation_ratio
+    cmd = CHZZK_CHAT_CMD["donation"] if donation else CHZZK_CHAT_CMD["chat"]
+    return {
+        "svcid": "game",
+        "ver": "1",
+        "cmd": cmd,
+        "tid": None,
+        "cid": cid,
+        "bdy": [make_chat(cid, donation=donation) for _ in range(chats)],
+    }
+
+
+# 녹화된 프레임 재생 (cid, msgTime 은 현재 값으로 교체)
+def replay_frames(corpus, cid):
+    while True:
+        for frame in corpus:
+            now = int(time.time() * 1000)
+            frame = dict(frame, cid=cid)
+            frame["bdy"] = [dict(chat, cid=cid, msgTime=now) for chat in frame.get("bdy") or []]
+            yield frame
+
+
+# 세션 처리: 핸드셰이크 후 지정 속도로 프레임 송신
+async def _session(ws, rate, ping_interval, corpus=None):
+    cid = None
+    async for raw in ws:
+        msg = json.loads(raw)
+        if msg.get("cmd") == CHZZK_CHAT_CMD["connect"]:
+            cid = msg.get("cid")
+            await ws.send(json.dumps({"cmd": CONNECTED_CMD, "retCode": 0, "bdy": {"sid": f"sid-{next(_seq)}"}}))
+        elif msg.get("cmd") == CHZZK_CHAT_CMD["request_recent_chat"]:
+            await ws.send(json.dumps({"cmd": RECENT_CHAT_CMD, "retCode": 0, "bdy": {"messageList": []}}))
+            break
+
+    async def _drain():
+        async for _ in ws:
+            pass
+
+    drain = asyncio.create_task(_drain())
+    frames = replay_frames(corpus, cid) if corpus else None
+    tick = 0.1
+    per_tick = rate * tick
+    carry = 0.0
+    last_ping = time.monotonic()
+    try:
+        while True:
+            carry += per_tick
+            n, carry = int(carry), carry - int(carry)
+            for _ in range(n):
+                frame = next(frames) if frames else make_frame(cid)
+                await ws.send(json.dumps(frame, ensure_ascii=False))
+            if ping_interval and time.monotonic() - last_ping >= ping_interval:
+                await ws.send(json.dumps({"ver": "2", "cmd": CHZZK_CHAT_CMD["ping"]}))
+                last_ping = time.monotonic()
+            await asyncio.sleep(tick)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        drain.cancel()
+
+
+async def serve(host, port, rate, ping_interval=20.0, seed=None, corpus_path=None):
+    if seed is not None:
+        random.seed(seed)
+
+    corpus = None
+    if corpus_path:
+        with open(corpus_path, "r", encoding="utf-8") as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+        corpus = [frame for frame in corpus if frame.get("cmd") in (CHZZK_CHAT_CMD["chat"], CHZZK_CHAT_CMD["donation"])]
+
+    async def handler(ws, *args):
+        await _session(ws, rate, ping_interval, corpus)
+
+    async with websockets.serve(handler, host, port, max_size=None, ping_interval=None):
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 가짜 치지직 채팅 WebSocket 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=5.0, help="세션당 초당 프레임 수")
+    parser.add_argument("--ping-interval", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=None, help="재현 가능한 합성 데이터용 시드")
+    parser.add_argument("--corpus", default=None, help="녹화된 프레임 파일 (한 줄에 프레임 하나)")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.rate, args.ping_interval, args.seed, args.corpus))
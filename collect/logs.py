@@ -0,0 +1,97 @@
+import sys
+import json
+import queue
+import atexit
+import itertools
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from config.settings import *
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+# LogRecord 기본 속성 (나머지는 extra 로 받은 구조화 필드)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+# 한 줄에 JSON 하나 (extra 필드 포함)
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# 호출 스레드에서는 메시지 병합만 하고 큐에 넣음 (포맷/출력은 리스너 스레드)
+# 큐가 가득 차면 기다리지 않고 버림
+class _QueueHandler(QueueHandler):
+    dropped = 0
+
+    def prepare(self, record):
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _QueueHandler.dropped += 1
+
+
+# N 번에 한 번만 True (메시지 단위 이벤트 표본 로그, 오류는 표본 없이 모두 기록)
+class Sampler:
+    __slots__ = ("every", "_count")
+
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        self.every = max(1, every)
+        self._count = itertools.count()
+
+    def __call__(self):
+        return next(self._count) % self.every == 0
+
+
+# 루트 로거를 큐 + 백그라운드 출력 스레드로 설정 (프로세스당 한 번)
+def setup(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None, maxsize=LOG_QUEUE_MAX):
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    q = queue.Queue(maxsize)
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+    root.addHandler(_QueueHandler(q))
+    root.setLevel(level)
+
+    _listener = QueueListener(q, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop)
+    return _listener
+
+
+# 남은 로그 출력 후 정리
+def stop():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped():
+    return _QueueHandler.dropped
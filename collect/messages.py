@@ -0,0 +1,117 @@
+import json
+from datetime import datetime, timezone
+
+import dims
+import codec
+from dedup import message_key
+from config.settings import *
+
+# 스트리머 이름 (압축 포맷 메시지 복원용)
+try:
+    with open(STREAMER_LIST_PATH, "r", encoding="utf-8") as f:
+        STREAMER_NAMES = {s["id"]: s["name"] for s in json.load(f)}
+except Exception:
+    STREAMER_NAMES = {}
+
+
+# UTC로 변환
+def _to_datetime_utc(val):
+    if val is None:
+        return datetime.now(tz=timezone.utc)
+    if isinstance(val, datetime):
+        return val.astimezone(timezone.utc) if val.tzinfo else val.replace(tzinfo=timezone.utc)
+    if isinstance(val, (int, float)):
+        return datetime.fromtimestamp(val, tz=timezone.utc)
+    if isinstance(val, str):
+        try:
+            dt = datetime.fromisoformat(val.replace("Z", "+00:00"))
+            return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+        except Exception:
+            return datetime.now(tz=timezone.utc)
+    return datetime.now(tz=timezone.utc)
+
+# 메시지 파싱
+def parse_message(message):
+    fields = {
+        "message_id": getattr(message, "message_id", None),
+        "streamer_id": None,
+        "streamer_name": None,
+        "chat_channel_id": None,
+        "uid": None,
+        "user_id": None,
+        "msg": None,
+        "ts": None,
+        "raw": None,
+    }
+
+    attrs = message.attributes or {}
+
+    text = None
+    payload = None
+    data_bytes = message.data or b""
+    try:
+        fmt = attrs.get("fmt")
+        if fmt == codec.FORMAT_COMPACT:
+            payload = codec.decode_payload(data_bytes, fmt, STREAMER_NAMES)
+        else:
+            text = data_bytes.decode("utf-8", errors="replace")
+            payload = codec.loads(text)
+    except Exception:
+        payload = None
+        if text is None:
+            text = data_bytes.decode("utf-8", errors="replace")
+
+    def pick(*candidates, default=None):
+        for c in candidates:
+            if c is not None and c != "":
+                return c
+        return default
+
+	# 스트리머 ID 추출
+    fields["streamer_id"] = pick(
+        payload.get("streamer_id") if isinstance(payload, dict) else None,
+        attrs.get("streamer_id"),
+        default="unknown_streamer",
+    )
+
+	# 사용자 ID 추출
+    fields["user_id"] = pick(
+        (payload.get("user_id") if isinstance(payload, dict) else None),
+        attrs.get("user_id"),
+        default=None,
+    )
+    if isinstance(payload, dict):
+        fields["streamer_name"] = pick(payload.get("streamer_name"))
+        fields["chat_channel_id"] = pick(payload.get("chat_channel_id"))
+    fields["uid"] = dims.user_uid(payload.get("uid") if isinstance(payload, dict) else None, fields["user_id"])
+
+	# 채팅 내용 추출
+    fields["msg"] = pick(
+        (payload.get("msg") if isinstance(payload, dict) else None),
+        (payload.get("message") if isinstance(payload, dict) else None),
+        text,
+        default="",
+    )
+
+	# 타임스탬프 추출 (채팅 시각 우선, 같은 채팅은 항상 같은 ts)
+    ts_candidate = pick(
+        (payload.get("ts") if isinstance(payload, dict) else None),
+        (payload.get("ts_iso") if isinstance(payload, dict) else None),
+        attrs.get("ts"),
+        getattr(message, "publish_time", None),
+        default=None,
+    )
+
+	# 타임스탬프 변환
+    fields["ts"] = _to_datetime_utc(ts_candidate)
+    fields["raw"] = payload if isinstance(payload, dict) else {"data": text, "attributes": dict(attrs)}
+
+	# 중복 제거 키 (수집기가 붙인 내용 기반 키 → 없으면 payload 로 계산 → 전송 계층 메시지 ID)
+    if attrs.get("key"):
+        fields["message_id"] = attrs["key"]
+    elif isinstance(payload, dict) and payload.get("msgTime_ms") is not None:
+        fields["message_id"] = message_key(
+            fields["streamer_id"], payload.get("uid"), payload.get("msgTime_ms"), fields["msg"]
+        )
+
+    return fields
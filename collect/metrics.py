@@ -0,0 +1,192 @@
+import time
+import logging
+from collections import Counter as _Tally
+
+from config.settings import *
+
+logger = logging.getLogger("chzzk-metrics")
+
+# Prometheus 지표 (prometheus_client 가 없거나 METRICS_ENABLED=0 이면 아무것도 하지 않음)
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+    ENABLED = METRICS_ENABLED
+except ImportError:
+    ENABLED = False
+
+
+class _Noop:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def remove(self, *args):
+        pass
+
+    def set_function(self, fn):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+# 지연 구간 (초), 수 ms ~ 1분
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+if ENABLED:
+    # 수집기 (pub.py)
+    FRAMES_RECEIVED = Counter("chzzk_frames_received_total", "웹소켓 수신 프레임 수", ["streamer"])
+    CHATS_PUBLISHED = Counter("chzzk_chats_published_total", "발행 요청한 채팅 수", ["streamer"])
+    CHATS_DEDUPED = Counter("chzzk_chats_deduped_total", "재연결 중복으로 건너뛴 채팅 수", ["streamer"])
+    PUBLISH_ERRORS = Counter("chzzk_publish_errors_total", "발행 실패 수", ["streamer"])
+    PUBLISH_INFLIGHT = Gauge("chzzk_publish_inflight", "완료 대기 중인 발행 future 수", ["streamer"])
+    MSG_TO_PUBLISH = Histogram(
+        "chzzk_msg_to_publish_seconds", "채팅 시각(msgTime) → 발행 요청", ["streamer"], buckets=LATENCY_BUCKETS
+    )
+    PUBLISH_ACK = Histogram(
+        "chzzk_publish_ack_seconds", "발행 요청 → 전송 계층 확인 (스풀 재전송 제외)", ["streamer"], buckets=LATENCY_BUCKETS
+    )
+    SPOOL_QUEUED = Gauge("chzzk_spool_queued", "발행 스풀 메모리 큐 길이")
+    SPOOL_INFLIGHT = Gauge("chzzk_spool_inflight", "발행 스풀 완료 대기 future 수")
+    SPOOL_BYTES = Gauge("chzzk_spool_bytes", "디스크 스풀 재전송 대기 바이트")
+
+    # 저장기 (sub.py)
+    PUBLISH_TO_RECEIVE = Histogram(
+        "chzzk_publish_to_receive_seconds", "발행 → 구독 수신", ["streamer"], buckets=LATENCY_BUCKETS
+    )
+    RECEIVE_TO_COMMIT = Histogram(
+        "chzzk_receive_to_commit_seconds", "구독 수신 → DB 커밋", ["streamer"], buckets=LATENCY_BUCKETS
+    )
+    ROWS_INSERTED = Counter("chzzk_rows_inserted_total", "chat_logs 에 저장된 행 수", ["streamer"])
+    BATCH_FAILURES = Counter("chzzk_batch_failures_total", "배치 저장 실패 수")
+    BATCH_SECONDS = Histogram("chzzk_batch_commit_seconds", "배치 INSERT + 커밋 시간", buckets=LATENCY_BUCKETS)
+    WRITER_PENDING = Gauge("chzzk_writer_pending_rows", "저장 대기 중인 버퍼 행 수")
+    WRITER_BLOCKED = Gauge("chzzk_writer_blocked_seconds", "버퍼가 가득 차 수신 콜백이 기다린 누적 시간")
+else:
+    FRAMES_RECEIVED = CHATS_PUBLISHED = CHATS_DEDUPED = PUBLISH_ERRORS = PUBLISH_INFLIGHT = MSG_TO_PUBLISH = _Noop()
+    PUBLISH_ACK = _Noop()
+    SPOOL_QUEUED = SPOOL_INFLIGHT = SPOOL_BYTES = _Noop()
+    PUBLISH_TO_RECEIVE = RECEIVE_TO_COMMIT = ROWS_INSERTED = BATCH_FAILURES = BATCH_SECONDS = _Noop()
+    WRITER_PENDING = WRITER_BLOCKED = _Noop()
+
+_PER_CHANNEL = (
+    FRAMES_RECEIVED, CHATS_PUBLISHED, CHATS_DEDUPED, PUBLISH_ERRORS, PUBLISH_INFLIGHT, MSG_TO_PUBLISH, PUBLISH_ACK
+)
+
+# 스트리머 → ChannelMetrics (수집 세션과 스풀 퍼블리셔가 같은 객체를 씀)
+_CHANNELS = {}
+
+
+# 채널별 지표 (labels() 조회를 세션 생성 시 한 번만)
+class ChannelMetrics:
+    __slots__ = ("frames", "published", "deduped", "errors", "inflight", "msg_to_publish", "ack")
+
+    def __init__(self, streamer):
+        self.frames = FRAMES_RECEIVED.labels(streamer)
+        self.published = CHATS_PUBLISHED.labels(streamer)
+        self.deduped = CHATS_DEDUPED.labels(streamer)
+        self.errors = PUBLISH_ERRORS.labels(streamer)
+        self.inflight = PUBLISH_INFLIGHT.labels(streamer)
+        self.msg_to_publish = MSG_TO_PUBLISH.labels(streamer)
+        self.ack = PUBLISH_ACK.labels(streamer)
+
+
+# 스트리머별 ChannelMetrics (forget 전까지 같은 객체)
+def channel(streamer):
+    streamer = str(streamer)
+    found = _CHANNELS.get(streamer)
+    if found is None:
+        found = _CHANNELS.setdefault(streamer, ChannelMetrics(streamer))
+    return found
+
+
+# 세션이 끝난 채널 지표 제거 (다른 워커로 옮겨간 스트리머)
+def forget(streamer):
+    _CHANNELS.pop(str(streamer), None)
+    for metric in _PER_CHANNEL:
+        try:
+            metric.remove(streamer)
+        except KeyError:
+            pass
+
+
+# 스풀 퍼블리셔 상태는 수집 시점에 읽기
+def watch_spool(publisher):
+    SPOOL_QUEUED.set_function(lambda: publisher.stats()["queued"])
+    SPOOL_INFLIGHT.set_function(lambda: publisher.stats()["inflight"])
+    SPOOL_BYTES.set_function(lambda: publisher.spool.depth_bytes())
+
+
+# 저장 버퍼 깊이, 역압 대기 누적 시간
+def watch_writer(writer):
+    WRITER_PENDING.set_function(writer.pending)
+    WRITER_BLOCKED.set_function(lambda: writer.blocked_seconds)
+
+
+# 수신 시각 기록 + 발행 → 수신 지연
+def observe_received(fields, message):
+    now = time.time()
+    fields["received_at"] = now
+    published = getattr(message, "publish_time", None)
+    if published is not None:
+        PUBLISH_TO_RECEIVE.labels(fields["streamer_id"]).observe(now - published.timestamp())
+
+
+# 커밋된 배치 (스트리머별 저장 행 수, 수신 → 커밋 지연)
+def observe_commit(batch, inserted, committed_at, elapsed):
+    if not ENABLED:
+        return
+    BATCH_SECONDS.observe(elapsed)
+    children = {}
+    for fields, _ in batch:
+        received_at = fields.get("received_at")
+        if received_at is None:
+            continue
+        streamer_id = fields["streamer_id"]
+        child = children.get(streamer_id)
+        if child is None:
+            child = children[streamer_id] = RECEIVE_TO_COMMIT.labels(streamer_id)
+        child.observe(committed_at - received_at)
+
+    # RETURNING 결과가 있으면 실제로 저장된 행만 (중복 키 제외)
+    if inserted is not None:
+        counts = _Tally(row[0] for row in inserted)
+    else:
+        counts = _Tally(fields["streamer_id"] for fields, _ in batch)
+    for streamer_id, n in counts.items():
+        ROWS_INSERTED.labels(streamer_id).inc(n)
+
+
+def batch_failed():
+    BATCH_FAILURES.inc()
+
+
+# 수집기/저장기 포트 구간이 겹치는지 확인
+def check_ports(pub_port=PUB_METRICS_PORT, sub_port=SUB_METRICS_PORT, span=METRICS_PORT_SPAN):
+    if pub_port and sub_port and abs(pub_port - sub_port) < span:
+        raise ValueError(
+            f"지표 포트 구간이 겹칩니다: PUB_METRICS_PORT={pub_port}, SUB_METRICS_PORT={sub_port} "
+            f"(METRICS_PORT_SPAN={span})"
+        )
+
+
+# 로컬 /metrics HTTP 엔드포인트 (기준 포트 + 프로세스 번호, 기준 포트 0 이면 끔)
+def serve(base, idx=0, addr=METRICS_ADDR):
+    if not ENABLED or not base:
+        return False
+    check_ports()
+    if not 0 <= idx < METRICS_PORT_SPAN:
+        raise ValueError(f"지표 포트 번호 {idx} 가 METRICS_PORT_SPAN={METRICS_PORT_SPAN} 을 넘습니다")
+    port = base + idx
+    try:
+        start_http_server(port, addr=addr)
+    except OSError as e:
+        logger.warning("지표 엔드포인트 시작 실패 (%s:%d): %s", addr, port, e)
+        return False
+    logger.info("지표 엔드포인트 http://%s:%d/metrics", addr, port)
+    return True
@@ -0,0 +1,292 @@
+import re
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+import rollup
+import rawstore
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-partitions")
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+_TZ_RE = re.compile(r"([+-]\d\d)$")
+
+
+def _parse_bound(value: str) -> datetime:
+    return datetime.fromisoformat(_TZ_RE.sub(r"\1:00", value)).astimezone(timezone.utc)
+
+
+# 주어진 시각이 속한 파티션 구간 (일 / 주 단위, UTC)
+def partition_range(ts: datetime, interval=PARTITION_INTERVAL):
+    day = datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+    if interval == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    return day, day + timedelta(days=1)
+
+
+def partition_name(start: datetime, interval=PARTITION_INTERVAL):
+    if interval == "week":
+        year, week, _ = start.isocalendar()
+        return f"chat_logs_{year}w{week:02d}"
+    return f"chat_logs_{start:%Y%m%d}"
+
+
+def table_kind(conn, name="chat_logs"):
+    with conn.cursor() as cur:
+        cur.execute(TABLE_KIND_SQL, (name,))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def has_column(conn, column, name="chat_logs"):
+    with conn.cursor() as cur:
+        cur.execute(HAS_COLUMN_SQL, (name, column))
+        return cur.fetchone()[0]
+
+
+# 현재 파티션 목록 {이름: (시작, 끝)} (DEFAULT 제외)
+def list_partitions(conn):
+    with conn.cursor() as cur:
+        cur.execute(LIST_PARTITIONS_SQL)
+        rows = cur.fetchall()
+    parts = {}
+    for name, bound in rows:
+        m = _BOUND_RE.search(bound or "")
+        if m:
+            parts[name] = tuple(_parse_bound(v) for v in m.groups())
+    return parts
+
+
+# 구간 파티션 생성 (DEFAULT 파티션에 그 구간 행이 있으면 새 파티션으로 옮긴 뒤 다시 연결, 이동한 행 수)
+def _create_partition(cur, name, start, end, has_default):
+    if has_default:
+        cur.execute(DEFAULT_HAS_ROWS_SQL, (start, end))
+        has_default = cur.fetchone()[0]
+    if not has_default:
+        cur.execute(CREATE_PARTITION_SQL.format(name=name), (start, end))
+        return 0
+    cur.execute(DETACH_DEFAULT_SQL)
+    cur.execute(CREATE_PARTITION_SQL.format(name=name), (start, end))
+    cur.execute(MOVE_FROM_DEFAULT_SQL.format(name=name), (start, end))
+    moved = cur.rowcount
+    cur.execute(ATTACH_DEFAULT_SQL)
+    return moved
+
+
+# 시작 시각부터 now + 선생성 구간까지 파티션 생성
+def ensure_partitions(conn, now=None, since=None, ahead=PARTITION_PREMAKE):
+    now = now or datetime.now(tz=timezone.utc)
+    start, _ = partition_range(since or now)
+    last, _ = partition_range(now)
+    step = timedelta(days=7 if PARTITION_INTERVAL == "week" else 1)
+    last += step * ahead
+
+    existing = list_partitions(conn)
+    has_default = table_kind(conn, "chat_logs_default") is not None
+    created = []
+    while start <= last:
+        start, end = partition_range(start)
+        name = partition_name(start)
+        if name not in existing:
+            try:
+                with conn.cursor() as cur:
+                    moved = _create_partition(cur, name, start, end, has_default)
+                conn.commit()
+                created.append(name)
+                if moved:
+                    logger.info("파티션 %s 생성, DEFAULT 파티션에서 %d행 이동", name, moved)
+            except Exception as e:
+                conn.rollback()
+                logger.warning("파티션 %s 생성 실패: %s", name, e)
+        start = end
+    return created
+
+
+# 보존 기간이 지난 파티션 분리(detach) 또는 삭제(drop)
+def apply_retention(conn, now=None, days=PARTITION_RETENTION_DAYS, action=PARTITION_RETENTION_ACTION):
+    if days <= 0:
+        return []
+    now = now or datetime.now(tz=timezone.utc)
+    cutoff = now - timedelta(days=days)
+
+    removed = []
+    for name, (_, end) in sorted(list_partitions(conn).items()):
+        if end > cutoff:
+            continue
+        sql = DETACH_PARTITION_SQL if action == "detach" else DROP_PARTITION_SQL
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql.format(name=name))
+            conn.commit()
+            removed.append(name)
+            logger.info("파티션 %s %s", name, "분리" if action == "detach" else "삭제")
+        except Exception as e:
+            conn.rollback()
+            logger.warning("파티션 %s 정리 실패: %s", name, e)
+    return removed
+
+
+# 주기적 파티션 관리 (sub.py 백그라운드 스레드)
+class PartitionMaintainer:
+    def __init__(self, pool, interval=PARTITION_MAINTENANCE_INTERVAL):
+        self.pool = pool
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="chatzzk-partitions", daemon=True)
+
+    def run_once(self):
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = False
+            created = ensure_partitions(conn)
+            removed = apply_retention(conn)
+            retired = rawstore.apply_retention(conn, list_partitions(conn))
+            if created or removed or retired:
+                logger.info("파티션 관리 | created=%s, removed=%s, raw_retired=%s", created, removed, retired)
+        finally:
+            self.pool.putconn(conn)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception("파티션 관리 실패: %s", e)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# 기존 chat_logs 와 딸린 인덱스/파티션/시퀀스 이름을 source 로 변경
+def _rename_existing(cur, source):
+    cur.execute(LIST_PARTITIONS_SQL)
+    children = [name for name, _ in cur.fetchall()]
+    cur.execute(SELECT_TABLE_INDEXES_SQL, ("chat_logs",))
+    indexes = [name for name, in cur.fetchall()]
+
+    for name in indexes:
+        cur.execute(RENAME_INDEX_SQL.format(name=name, new=name.replace("chat_logs", source, 1)))
+    for name in children:
+        cur.execute(RENAME_TABLE_SQL.format(name=name, new=name.replace("chat_logs", source, 1)))
+    cur.execute(RENAME_TABLE_SQL.format(name="chat_logs", new=source))
+    cur.execute(RENAME_SEQUENCE_SQL.format(source=source))
+
+
+def table_size(conn, name):
+    with conn.cursor() as cur:
+        cur.execute(TABLE_SIZE_SQL, (name,))
+        return cur.fetchone()
+
+
+# 저장 공간 비교 (행 수 추정치, 테이블/인덱스 바이트)
+def size_report(conn, before, after):
+    def _mb(n):
+        return n / 1024 / 1024
+
+    logger.info("%-28s %14s %12s %12s %10s", "", "rows", "table MB", "index MB", "bytes/row")
+    for name, (rows, table, index) in (*before, *after):
+        logger.info("%-28s %14d %12.1f %12.1f %10.0f", name, rows, _mb(table), _mb(index), (table + index) / rows if rows else 0)
+    b = sum(t + i for _, (_, t, i) in before)
+    a = sum(t + i for _, (_, t, i) in after)
+    if b:
+        logger.info("합계 %.1f MB → %.1f MB (%.0f%% 감소)", _mb(b), _mb(a), (1 - a / b) * 100)
+
+
+# 기존 chat_logs (단일 테이블 또는 streamer_id/user_id TEXT 스키마)
+# → 차원 키를 쓰는 파티션 테이블로 이전 (id 구간 배치 복사, 이전 테이블은 source 로 남김)
+def migrate(conn, batch_size=MIGRATE_BATCH_SIZE, source="chat_logs_legacy"):
+    kind = table_kind(conn)
+    migrated = has_column(conn, "streamer_key")
+    conn.commit()
+    if kind is None or (kind == "p" and migrated):
+        logger.info("이전 대상 chat_logs 테이블 없음")
+        return
+
+    conn.autocommit = False
+    with conn.cursor() as cur:
+        _rename_existing(cur, source)
+        cur.execute(CREATE_DIMENSIONS_SQL)
+        cur.execute(CREATE_TABLE_SQL)
+        cur.execute(MIGRATE_RANGE_SQL.format(source=source))
+        min_id, max_id, min_ts, max_ts = cur.fetchone()
+    conn.commit()
+
+    if min_id is None:
+        logger.info("기존 테이블이 비어 있음, 이전 완료")
+        return
+
+    ensure_partitions(conn, now=max(max_ts, datetime.now(tz=timezone.utc)), since=min_ts)
+
+    started = time.monotonic()
+    with conn.cursor() as cur:
+        cur.execute(MIGRATE_STREAMERS_SQL.format(source=source))
+        cur.execute(MIGRATE_USERS_SQL.format(source=source))
+    conn.commit()
+    logger.info("차원 테이블 채움 (%.0fs)", time.monotonic() - started)
+
+    copy_sql = MIGRATE_COPY_SQL.format(source=source)
+    lo = min_id - 1
+    while lo < max_id:
+        hi = lo + batch_size
+        with conn.cursor() as cur:
+            cur.execute(copy_sql, (rawstore.pruned_keys(), lo, hi))
+        conn.commit()
+        lo = hi
+        logger.info("이전 중 | id <= %d / %d (%.0fs)", min(hi, max_id), max_id, time.monotonic() - started)
+
+    with conn.cursor() as cur:
+        cur.execute(MIGRATE_SETVAL_SQL, (max_id,))
+        cur.execute(f"ANALYZE {source};")
+        cur.execute("ANALYZE chat_logs, streamers, chat_users, chat_user_nicknames;")
+    conn.commit()
+
+	# 사용자 키 기준 집계 테이블 재구성
+    with conn.cursor() as cur:
+        cur.execute(DROP_USER_ROLLUPS_SQL)
+    conn.commit()
+    rollup.backfill(conn)
+    logger.warning("대시보드 뷰(streamlit/config/sql.py)를 다시 만드세요 (user_id → user_key).")
+
+    size_report(
+        conn,
+        [(source, table_size(conn, source))],
+        [(name, table_size(conn, name)) for name in ("chat_logs", "streamers", "chat_users", "chat_user_nicknames")],
+    )
+    logger.info("이전 완료. 확인 후 %s 를 삭제하세요.", source)
+
+
+if __name__ == "__main__":
+    import psycopg2
+
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="chat_logs 파티션 관리")
+    parser.add_argument("command", choices=["ensure", "retention", "migrate", "sizes"])
+    parser.add_argument("--source", default="chat_logs_legacy", help="migrate: 기존 테이블을 옮겨 둘 이름")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        if args.command == "migrate":
+            migrate(conn, source=args.source)
+        elif args.command == "sizes":
+            names = [args.source] if table_kind(conn, args.source) else []
+            size_report(
+                conn,
+                [(name, table_size(conn, name)) for name in names],
+                [(name, table_size(conn, name)) for name in ("chat_logs", "streamers", "chat_users", "chat_user_nicknames")],
+            )
+        elif args.command == "ensure":
+            print(ensure_partitions(conn))
+        else:
+            print(apply_retention(conn))
+    finally:
+        conn.close()
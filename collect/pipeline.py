@@ -0,0 +1,40 @@
+import json
+import asyncio
+
+import sub
+import pub
+import metrics
+from transport import get_transport
+from config.settings import *
+
+
+# 단일 프로세스 파이프라인: 수집기(async) → 전송 계층 → 저장기
+def main():
+	# 치지직 쿠키 로드
+    with open(COOKIES_PATH, "r", encoding="utf-8") as f:
+        cookies = json.load(f)
+
+	# 스트리머 목록 로드
+    with open(STREAMER_LIST_PATH, "r", encoding="utf-8") as streamer_list_json:
+        streamer_list = json.load(streamer_list_json)
+
+	# 수집기/저장기 지표를 한 엔드포인트로
+    metrics.serve(PUB_METRICS_PORT)
+
+	# 저장기 시작
+    sub.init_db_pool()
+    sub.writer = sub.BatchWriter(sub.pool, BATCH_MAX_ROWS, BATCH_MAX_LATENCY, sub.logger)
+    sub.transport = get_transport()
+    sub.streaming_pull_future = sub.transport.subscribe(sub.callback)
+
+	# 수집기 실행 (종료 신호까지)
+    publisher = pub.create_publisher("pipeline")
+    try:
+        asyncio.run(pub.run_async(streamer_list, cookies, publisher, TOPIC_PATH))
+    finally:
+        publisher.stop()
+        sub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
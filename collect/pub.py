@@ -1,42 +1,42 @@
 import os
 import json
 import logging
+import signal
+import time
+import queue
+import asyncio
+import argparse
 import datetime
 import threading
+import multiprocessing
 
 import api
+import logs
+import codec
+import metrics
+from dedup import SeenKeys, message_key
+from reconnect import SCHEDULER, StreamerOffline
+from spool import SpooledPublisher
+from supervisor import Supervisor
+from transport import get_transport
 from config.settings import *
 
+import websockets
 from websocket import WebSocket
-from google.cloud import pubsub_v1
-from google.cloud.pubsub_v1.types import BatchSettings, PublisherOptions
 from requests.exceptions import HTTPError
 
-# Google Cloud Pub/Sub 인증
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_APPLICATION_CREDENTIALS
-
-# 로깅 설정
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-)
+# 로깅 설정 (큐 + 백그라운드 출력, 메시지 단위 이벤트는 표본만)
+logs.setup()
 logger = logging.getLogger("chzzk-pub")
+_sample = logs.Sampler()
 
-# 배치 설정
-batch_settings = BatchSettings(
-    max_bytes=1_000_000,
-    max_messages=1000,
-    max_latency=0.05
-)
-
-# 퍼블리셔 설정
-publisher_options = PublisherOptions(enable_message_ordering=False)
-
-# 퍼블리셔 초기화
-PUBLISHER = pubsub_v1.PublisherClient(
-    batch_settings=batch_settings,
-    publisher_options=publisher_options
-)
+# 퍼블리셔 초기화 (TRANSPORT 설정, SPOOL_ENABLED 시 디스크 스풀로 감싸기)
+def create_publisher(spool_name="main"):
+    publisher = get_transport()
+    if SPOOL_ENABLED and TRANSPORT != "local":
+        publisher = SpooledPublisher(publisher, os.path.join(SPOOL_DIR, spool_name), TOPIC_PATH)
+        metrics.watch_spool(publisher)
+    return publisher
 
 class ChzzkChat:
     def __init__(self, streamer, cookies, logger, publisher, topic_path):
@@ -48,48 +48,61 @@ class ChzzkChat:
         self.topic_path = topic_path
 
         self.sid = None
+        self.published = 0
+        self.reconnects = 0
+        self.seen = SeenKeys()
+        self.metrics = metrics.channel(streamer)
+        self._sent = {}  # 발행 future → 요청 시각 (스풀 퍼블리셔는 자체 기록)
         self.userIdHash = api.fetch_userIdHash(self.cookies)
-        self.chatChannelId = api.fetch_chatChannelId(self.streamer, self.cookies)
+        self.chatChannelId = None
         self.channelName = api.fetch_channelName(self.streamer)
-        self.accessToken, self.extraToken = api.fetch_accessToken(self.chatChannelId, self.cookies)
+        self.accessToken, self.extraToken = None, None
 
         self.sock = None
-        self.connect()
 
     # 메시지 발행
     def _publish(self, payload: dict, attributes: dict):
         try:
-            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            data, fmt = codec.encode_payload(payload, PAYLOAD_FORMAT)
+            if fmt != codec.FORMAT_JSON:
+                attributes["fmt"] = fmt
             future = self.publisher.publish(self.topic_path, data, **attributes)
+            self.published += 1
+            self.metrics.published.inc()
 
-            def _on_done(f):
-                try:
-                    mid = f.result()
-                    self.logger.debug(f"published mid={mid}")
-                except Exception as e:
-                    self.logger.error(f"publish failed: {e}")
+            # 스풀 퍼블리셔는 완료/실패와 채널 지표를 직접 처리
+            if future is None:
+                return
 
-            future.add_done_callback(_on_done)
+            self.metrics.inflight.inc()
+            self._sent[future] = time.monotonic()
+            future.add_done_callback(self._on_published)
 
         except Exception as e:
-            self.logger.exception(f"publish exception: {e}")
-
-	# 채팅 연결
-    def connect(self):
-        self.chatChannelId = api.fetch_chatChannelId(self.streamer, self.cookies)
-        self.accessToken, self.extraToken = api.fetch_accessToken(self.chatChannelId, self.cookies)
-
-        sock = WebSocket()
-        sock.connect("wss://kr-ss1.chat.naver.com/chat")
-        print(f"{self.channelName} 채팅창에 연결 중 .", end="")
+            self.metrics.errors.inc()
+            self.logger.exception("publish exception: %s", e, extra={"streamer_id": self.streamer})
 
-        default_dict = {
+    # 발행 완료 (채널당 바운드 메서드 하나, 메시지마다 클로저를 만들지 않음)
+    def _on_published(self, future):
+        started = self._sent.pop(future, None)
+        self.metrics.inflight.dec()
+        try:
+            mid = future.result()
+        except Exception as e:
+            self.metrics.errors.inc()
+            self.logger.error("publish failed: %s", e, extra={"streamer_id": self.streamer})
+            return
+        if started is not None:
+            self.metrics.ack.observe(time.monotonic() - started)
+        if _sample():
+            self.logger.debug("published", extra={"streamer_id": self.streamer, "mid": mid, "sample_every": LOG_SAMPLE_EVERY})
+
+	# 연결 요청 프레임
+    def _connect_frame(self):
+        return {
             "ver": "2",
             "svcid": "game",
             "cid": self.chatChannelId,
-        }
-
-        send_dict = {
             "cmd": CHZZK_CHAT_CMD["connect"],
             "tid": 1,
             "bdy": {
@@ -100,12 +113,19 @@ class ChzzkChat:
             },
         }
 
-        sock.send(json.dumps(dict(send_dict, **default_dict)))
-        sock_response = json.loads(sock.recv())
-        self.sid = sock_response["bdy"]["sid"]
-        print(f"\r{self.channelName} 채팅창에 연결 중 ..", end="")
+	# 방송 중인 채팅 채널 ID (방송 중이 아니면 StreamerOffline)
+    def _live_chatChannelId(self):
+        try:
+            return api.fetch_chatChannelId(self.streamer, self.cookies)
+        except AssertionError:
+            raise StreamerOffline(self.streamer)
 
-        send_dict = {
+	# 최근 채팅 요청 프레임
+    def _recent_chat_frame(self):
+        return {
+            "ver": "2",
+            "svcid": "game",
+            "cid": self.chatChannelId,
             "cmd": CHZZK_CHAT_CMD["request_recent_chat"],
             "tid": 2,
             "sid": self.sid,
@@ -114,9 +134,29 @@ class ChzzkChat:
             },
         }
 
-        sock.send(json.dumps(dict(send_dict, **default_dict)))
-        sock.recv()
-        print(f"\r{self.channelName} 채팅창에 연결 중 ...")
+	# 채팅 연결
+    def connect(self):
+        if self.sid is not None:
+            self.reconnects += 1
+        self.chatChannelId = self._live_chatChannelId()
+        self.accessToken, self.extraToken = api.fetch_accessToken(self.chatChannelId, self.cookies)
+
+        sock = WebSocket()
+        try:
+            sock.connect(CHZZK_CHAT_URL)
+            print(f"{self.channelName} 채팅창에 연결 중 .", end="")
+
+            sock.send(json.dumps(self._connect_frame()))
+            sock_response = json.loads(sock.recv())
+            self.sid = sock_response["bdy"]["sid"]
+            print(f"\r{self.channelName} 채팅창에 연결 중 ..", end="")
+
+            sock.send(json.dumps(self._recent_chat_frame()))
+            sock.recv()
+            print(f"\r{self.channelName} 채팅창에 연결 중 ...")
+        except BaseException:
+            sock.close()
+            raise
 
         self.sock = sock
         if self.sock.connected:
@@ -124,8 +164,8 @@ class ChzzkChat:
         else:
             raise ValueError("오류 발생")
 
-	# 메시지 전송
-    def send(self, message: str):
+	# 메시지 전송 프레임
+    def _send_frame(self, message: str):
         default_dict = {
             "ver": 2,
             "svcid": "game",
@@ -153,89 +193,362 @@ class ChzzkChat:
             },
         }
 
-        self.sock.send(json.dumps(dict(send_dict, **default_dict)))
+        return json.dumps(dict(send_dict, **default_dict))
+
+	# 메시지 전송
+    def send(self, message: str):
+        self.sock.send(self._send_frame(message))
+
+	# 채팅 및 후원 메시지 처리
+    def _handle_chats(self, raw_message: dict):
+        now = time.time()
+        for chat in codec.iter_chats(raw_message):
+            msg_ms = chat.msg_time
+
+            # 재연결 시 다시 받은 최근 채팅은 발행하지 않음
+            key = message_key(self.streamer, chat.uid, msg_ms, chat.msg)
+            if not self.seen.add(key):
+                self.metrics.deduped.inc()
+                continue
+            if msg_ms:
+                self.metrics.msg_to_publish.observe(now - msg_ms / 1000)
+            try:
+                ts_iso = datetime.datetime.utcfromtimestamp(msg_ms / 1000).isoformat() + "Z"
+            except Exception:
+                ts_iso = None
+
+            payload = {
+                "streamer_id": self.streamer,
+                "streamer_name": self.channelName,
+                "chat_channel_id": self.chatChannelId,
+                "type": chat.chat_type,
+                "uid": chat.uid,
+                "user_id": chat.user_id,
+                "msg": chat.msg,
+                "msgTime_ms": msg_ms,
+                "ts_iso": ts_iso,
+            }
+
+            attributes = {
+                "streamer_id": str(self.streamer),
+                "type": chat.type_attr,
+                "key": key,
+            }
+
+            self._publish(payload, attributes)
+
+	# 스케줄러 순서에 맞춰 연결 (실패 시 백오프, 오프라인이면 느린 주기로 재확인)
+    def _reconnect(self):
+        while True:
+            time.sleep(SCHEDULER.delay(self.streamer))
+            try:
+                with SCHEDULER.handshake():
+                    self.connect()
+                SCHEDULER.succeeded(self.streamer)
+                return
+            except Exception as e:
+                SCHEDULER.failed(self.streamer, e)
+                self.logger.debug("연결 실패: %r", e, extra={"streamer_id": self.streamer})
+
+    def _drop(self):
+        SCHEDULER.disconnected(self.streamer)
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
 
 	# 메시지 수신
     def run(self):
         while True:
             try:
-                try:
-                    raw_message = self.sock.recv()
-                except KeyboardInterrupt:
-                    break
-                except Exception:
-                    self.connect()
-                    raw_message = self.sock.recv()
+                if self.sock is None:
+                    self._reconnect()
 
-                raw_message = json.loads(raw_message)
+                raw_message = codec.loads(self.sock.recv())
+                self.metrics.frames.inc()
                 chat_cmd = raw_message["cmd"]
 
                 if chat_cmd == CHZZK_CHAT_CMD["ping"]:
                     self.sock.send(json.dumps({"ver": "2", "cmd": CHZZK_CHAT_CMD["pong"]}))
 
-                    if self.chatChannelId != api.fetch_chatChannelId(self.streamer, self.cookies):
-                        self.connect()
+                    if self.chatChannelId != self._live_chatChannelId():
+                        self._drop()
 
                     continue
 
-				# 채팅 및 후원 메시지 처리
-                if chat_cmd == CHZZK_CHAT_CMD["chat"]:
-                    chat_type = "채팅"
-                elif chat_cmd == CHZZK_CHAT_CMD["donation"]:
-                    chat_type = "후원"
-                else:
-                    continue
-
-                for chat_data in raw_message["bdy"]:
-                    if chat_data.get("uid") == "anonymous":
-                        user_id = "익명의 후원자"
-                    else:
-                        try:
-                            profile_data = json.loads(chat_data["profile"])
-                            user_id = profile_data["nickname"]
-                            if "msg" not in chat_data:
-                                continue
-                        except Exception:
-                            continue
-
-                    msg_ms = chat_data.get("msgTime")
-                    try:
-                        ts_iso = datetime.datetime.utcfromtimestamp(msg_ms / 1000).isoformat() + "Z"
-                    except Exception:
-                        ts_iso = None
-
-                    payload = {
-                        "streamer_id": self.streamer,
-                        "streamer_name": self.channelName,
-                        "chat_channel_id": self.chatChannelId,
-                        "type": chat_type,
-                        "uid": chat_data.get("uid"),
-                        "user_id": user_id,
-                        "msg": chat_data.get("msg"),
-                        "msgTime_ms": msg_ms,
-                        "ts_iso": ts_iso,
-                    }
-
-                    attributes = {
-                        "streamer_id": str(self.streamer),
-                        "type": "chat" if chat_type == "채팅" else "donation",
-                    }
-
-                    self._publish(payload, attributes)
+                self._handle_chats(raw_message)
 
+            except KeyboardInterrupt:
+                break
             except Exception as e:
-                self.logger.debug(f"loop error: {e}")
+                self.logger.debug("loop error: %s", e, extra={"streamer_id": self.streamer})
+                self._drop()
+
+# asyncio 기반 채팅 수집기 (한 이벤트 루프에서 여러 채널 처리)
+class AsyncChzzkChat(ChzzkChat):
+    chat_url = CHZZK_CHAT_URL
+
+    def __init__(self, streamer, cookies, logger, publisher, topic_path):
+        self.streamer = streamer
+        self.cookies = cookies
+        self.logger = logger
+
+        self.publisher = publisher
+        self.topic_path = topic_path
+
+        self.sid = None
+        self.published = 0
+        self.reconnects = 0
+        self.seen = SeenKeys()
+        self.metrics = metrics.channel(streamer)
+        self._sent = {}  # 발행 future → 요청 시각 (스풀 퍼블리셔는 자체 기록)
+        self.userIdHash = None
+        self.chatChannelId = None
+        self.channelName = None
+        self.accessToken, self.extraToken = None, None
+
+        self.sock = None
+
+    # 블로킹 API 호출을 스레드 풀에서 실행
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    # 채널 정보 및 토큰 조회
+    async def _resolve(self):
+        if self.userIdHash is None:
+            self.userIdHash = await self._call(api.fetch_userIdHash, self.cookies)
+        if self.channelName is None:
+            self.channelName = await self._call(api.fetch_channelName, self.streamer)
+        self.chatChannelId = await self._fetch_chatChannelId()
+        self.accessToken, self.extraToken = await self._call(api.fetch_accessToken, self.chatChannelId, self.cookies)
+
+    async def _fetch_chatChannelId(self):
+        return await self._call(self._live_chatChannelId)
+
+	# 채팅 연결
+    async def connect(self):
+        if self.sid is not None:
+            self.reconnects += 1
+        await self._close()
+        await self._resolve()
+
+        sock = await websockets.connect(self.chat_url, max_size=None, ping_interval=None)
+        try:
+            await sock.send(json.dumps(self._connect_frame()))
+            sock_response = json.loads(await sock.recv())
+            self.sid = sock_response["bdy"]["sid"]
+
+            await sock.send(json.dumps(self._recent_chat_frame()))
+            await sock.recv()
+        except BaseException:
+            await sock.close()
+            raise
+
+        self.sock = sock
+        self.logger.info(f"{self.channelName} 채팅창 연결 완료")
+
+    async def _close(self):
+        if self.sock is not None:
+            try:
+                await self.sock.close()
+            except Exception:
                 pass
+            self.sock = None
 
-if __name__ == "__main__":
-	# 치지직 쿠키 로드
-    with open(COOKIES_PATH, "r", encoding="utf-8") as f:
-        cookies = json.load(f)
+	# 메시지 전송
+    async def send(self, message: str):
+        await self.sock.send(self._send_frame(message))
 
-	# 스트리머 목록 로드
-    with open(STREAMER_LIST_PATH, "r", encoding="utf-8") as streamer_list_json:
-        streamer_list = json.load(streamer_list_json)
+	# 스케줄러 순서에 맞춰 연결
+    async def _reconnect(self):
+        while True:
+            await asyncio.sleep(SCHEDULER.delay(self.streamer))
+            try:
+                async with SCHEDULER.ahandshake():
+                    await self.connect()
+                SCHEDULER.succeeded(self.streamer)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                SCHEDULER.failed(self.streamer, e)
+                self.logger.debug("연결 실패: %r", e, extra={"streamer_id": self.streamer})
+
+    async def _drop(self):
+        SCHEDULER.disconnected(self.streamer)
+        await self._close()
+
+	# 메시지 수신
+    async def run(self):
+        try:
+            while True:
+                try:
+                    if self.sock is None:
+                        await self._reconnect()
+
+                    raw_message = codec.loads(await self.sock.recv())
+                    self.metrics.frames.inc()
+                    chat_cmd = raw_message["cmd"]
+
+                    if chat_cmd == CHZZK_CHAT_CMD["ping"]:
+                        await self.sock.send(json.dumps({"ver": "2", "cmd": CHZZK_CHAT_CMD["pong"]}))
+
+                        if self.chatChannelId != await self._fetch_chatChannelId():
+                            await self._drop()
 
+                        continue
+
+                    self._handle_chats(raw_message)
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.debug("loop error: %s", e, extra={"streamer_id": self.streamer})
+                    await self._drop()
+        finally:
+            await self._close()
+            SCHEDULER.forget(self.streamer)
+            metrics.forget(self.streamer)
+
+
+# 재연결 지표 로그 (재연결률, 재연결 소요 시간, 오프라인 대기/백오프 중 채널 수)
+def log_reconnect_stats():
+    rc = SCHEDULER.stats()
+    logger.info(
+        "reconnect | total=%d, rate=%.2f/s, ttr p50=%.1fs p99=%.1fs, parked=%d, backing_off=%d, handshakes=%d",
+        rc["reconnects"], rc["reconnects_per_sec"], rc["ttr_p50"], rc["ttr_p99"],
+        rc["parked"], rc["backing_off"], rc["handshakes"],
+    )
+
+
+# 한 프로세스에서 여러 채널을 하나의 이벤트 루프로 수집
+async def run_async(streamer_list, cookies, publisher, topic_path, chat_cls=AsyncChzzkChat):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    tasks = []
+    for streamer in streamer_list:
+        chzzkchat = chat_cls(streamer["id"], cookies, logger, publisher, topic_path)
+        tasks.append(asyncio.create_task(chzzkchat.run(), name=f"chzzk-{streamer['name']}"))
+
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), SUPERVISOR_STATS_INTERVAL)
+        except asyncio.TimeoutError:
+            log_reconnect_stats()
+
+	# 모든 세션 종료
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# 워커 프로세스 진입점
+def _async_worker(streamer_list, cookies, idx=0):
+    metrics.serve(PUB_METRICS_PORT, idx)
+    publisher = create_publisher(f"worker-{idx}")
+    try:
+        asyncio.run(run_async(streamer_list, cookies, publisher, TOPIC_PATH))
+    finally:
+        publisher.stop()
+
+
+# 감독 대상 워커: 명령 큐로 스트리머 추가/제거, 통계 큐로 처리량 보고
+async def _supervised_main(idx, cmd_q, stats_q, cookies, publisher):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    sessions = {}
+    retired = {"published": 0, "reconnects": 0, "deduped": 0}
+
+    def _get_cmd():
+        try:
+            return cmd_q.get(timeout=1.0)
+        except queue.Empty:
+            return None
+
+    async def _commands():
+        while not stop.is_set():
+            item = await loop.run_in_executor(None, _get_cmd)
+            if item is None:
+                continue
+            cmd, arg = item
+            if cmd == "add" and arg["id"] not in sessions:
+                chzzkchat = AsyncChzzkChat(arg["id"], cookies, logger, publisher, TOPIC_PATH)
+                task = asyncio.create_task(chzzkchat.run(), name=f"chzzk-{arg['name']}")
+                sessions[arg["id"]] = (chzzkchat, task)
+            elif cmd == "remove" and arg in sessions:
+                chzzkchat, task = sessions.pop(arg)
+                task.cancel()
+                retired["published"] += chzzkchat.published
+                retired["reconnects"] += chzzkchat.reconnects
+                retired["deduped"] += chzzkchat.seen.hits
+            elif cmd == "stop":
+                stop.set()
+
+    async def _stats():
+        prev_published, prev_cpu, prev_t = 0, time.process_time(), time.monotonic()
+        while True:
+            await asyncio.sleep(WORKER_STATS_INTERVAL)
+            published = retired["published"] + sum(c.published for c, _ in sessions.values())
+            reconnects = retired["reconnects"] + sum(c.reconnects for c, _ in sessions.values())
+            deduped = retired["deduped"] + sum(c.seen.hits for c, _ in sessions.values())
+            now, cpu = time.monotonic(), time.process_time()
+            stats_q.put((idx, {
+                "pid": os.getpid(),
+                "channels": len(sessions),
+                "msgs_per_sec": (published - prev_published) / (now - prev_t),
+                "reconnects": reconnects,
+                "deduped": deduped,
+                "reconnect": SCHEDULER.stats(),
+                "cpu_pct": (cpu - prev_cpu) / (now - prev_t) * 100,
+                "api": api.cache_stats(),
+                "spool": publisher.stats() if isinstance(publisher, SpooledPublisher) else None,
+            }))
+            prev_published, prev_cpu, prev_t = published, cpu, now
+
+    commands = asyncio.create_task(_commands())
+    stats = asyncio.create_task(_stats())
+    await stop.wait()
+
+    stats.cancel()
+    tasks = [task for _, task in sessions.values()]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(commands, stats, *tasks, return_exceptions=True)
+
+
+def _supervised_worker(idx, cmd_q, stats_q, cookies):
+    metrics.serve(PUB_METRICS_PORT, idx)
+    publisher = create_publisher(f"worker-{idx}")
+    try:
+        asyncio.run(_supervised_main(idx, cmd_q, stats_q, cookies, publisher))
+    finally:
+        publisher.stop()
+
+
+def run_supervisor(cookies, procs):
+    supervisor = Supervisor(_supervised_worker, cookies, procs)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    supervisor.run()
+
+
+def run_threads(streamer_list, cookies):
+    metrics.serve(PUB_METRICS_PORT)
+    publisher = create_publisher()
     chzzkchat_list = []
     threads = []
 
@@ -246,7 +559,7 @@ if __name__ == "__main__":
                 streamer["id"],
                 cookies,
                 logger,
-                PUBLISHER,
+                publisher,
                 TOPIC_PATH,
             )
         except HTTPError as e:
@@ -262,6 +575,56 @@ if __name__ == "__main__":
         threads.append(t)
         t.start()
 
-	# 스레드 종료 대기
-    for t in threads:
-        t.join()
\ No newline at end of file
+	# 스레드 종료 대기 (재연결 지표 주기 보고)
+    while threads:
+        threads[0].join(SUPERVISOR_STATS_INTERVAL)
+        threads = [t for t in threads if t.is_alive()]
+        if threads:
+            log_reconnect_stats()
+
+
+def run_processes(streamer_list, cookies, procs):
+    ctx = multiprocessing.get_context("spawn")
+    shards = [streamer_list[i::procs] for i in range(procs)]
+    workers = [
+        ctx.Process(target=_async_worker, args=(shard, cookies, i), name=f"chzzk-worker-{i}")
+        for i, shard in enumerate(shards) if shard
+    ]
+    for w in workers:
+        w.start()
+
+	# 종료 신호를 워커에 전달
+    def _forward(signum, frame):
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+
+    signal.signal(signal.SIGINT, _forward)
+    signal.signal(signal.SIGTERM, _forward)
+
+    for w in workers:
+        w.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chzzk WebSocket → Pub/Sub 수집기")
+    parser.add_argument("--mode", choices=["thread", "async", "supervisor"], default=COLLECTOR_MODE)
+    parser.add_argument("--procs", type=int, default=COLLECTOR_PROCS, help="async/supervisor 모드 프로세스 수")
+    args = parser.parse_args()
+
+	# 치지직 쿠키 로드
+    with open(COOKIES_PATH, "r", encoding="utf-8") as f:
+        cookies = json.load(f)
+
+	# 스트리머 목록 로드
+    with open(STREAMER_LIST_PATH, "r", encoding="utf-8") as streamer_list_json:
+        streamer_list = json.load(streamer_list_json)
+
+    if args.mode == "thread":
+        run_threads(streamer_list, cookies)
+    elif args.mode == "supervisor":
+        run_supervisor(cookies, args.procs)
+    elif args.procs <= 1:
+        _async_worker(streamer_list, cookies)
+    else:
+        run_processes(streamer_list, cookies, args.procs)
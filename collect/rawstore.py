@@ -0,0 +1,162 @@
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+import dims
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-rawstore")
+
+
+# raw 에서 뺄 키 (full 이면 없음)
+def pruned_keys(policy=RAW_POLICY):
+    return DIMENSION_RAW_KEYS if policy == "prune" else []
+
+
+# chat_logs.raw 에 저장할 값 (full: payload 전체 | prune: 컬럼/차원 테이블에 없는 나머지)
+def stored_raw(raw, policy=RAW_POLICY):
+    if policy == "full":
+        return raw
+    return dims.residual_raw(raw)
+
+
+def create_tables(cur):
+    cur.execute(CREATE_RAW_TABLES_SQL)
+    savepoint = not cur.connection.autocommit
+    try:
+        if savepoint:
+            cur.execute("SAVEPOINT raw_compression;")
+        cur.execute(RAW_COMPRESSION_SQL)
+    except psycopg2.Error as e:
+        if savepoint:
+            cur.execute("ROLLBACK TO SAVEPOINT raw_compression;")
+        logger.info("lz4 압축을 사용할 수 없어 chat_raw 는 기본 압축(pglz)을 씁니다: %s", e)
+
+
+# 기존 행에 prune 정책 적용 (id 구간 배치, 커밋마다 잠금 해제)
+def prune_existing(conn, batch_size=MIGRATE_BATCH_SIZE):
+    conn.autocommit = False
+    with conn.cursor() as cur:
+        cur.execute(SELECT_CHAT_ID_RANGE_SQL)
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+    if min_id is None:
+        return 0
+
+    keys = pruned_keys("prune")
+    started = time.monotonic()
+    updated = 0
+    lo = min_id - 1
+    while lo < max_id:
+        hi = lo + batch_size
+        with conn.cursor() as cur:
+            cur.execute(PRUNE_RAW_SQL, (keys, lo, hi, keys))
+            updated += cur.rowcount
+        conn.commit()
+        lo = hi
+        logger.info("raw 정리 중 | id <= %d / %d, updated=%d (%.0fs)", min(hi, max_id), max_id, updated, time.monotonic() - started)
+    return updated
+
+
+# 파티션 하나의 raw 를 보조 테이블로 옮기거나(side) 비움(drop), 처리한 행 수
+def _retire_partition(conn, name, action, chunk):
+    with conn.cursor() as cur:
+        cur.execute(SELECT_ID_RANGE_SQL.format(name=name))
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+
+    moved = 0
+    if min_id is not None:
+        move_sql = MOVE_RAW_SQL.format(name=name)
+        clear_sql = CLEAR_RAW_SQL.format(name=name)
+        lo = min_id - 1
+        while lo < max_id:
+            hi = lo + chunk
+            with conn.cursor() as cur:
+                if action == "side":
+                    cur.execute(move_sql, (name, lo, hi))
+                cur.execute(clear_sql, (lo, hi))
+                moved += cur.rowcount
+            conn.commit()
+            lo = hi
+
+    with conn.cursor() as cur:
+        cur.execute(INSERT_RAW_DONE_SQL, (name, action, moved))
+    conn.commit()
+    return moved
+
+
+# 보존 기간이 지난 파티션의 raw 정리 (파티션은 {이름: (시작, 끝)}, 쓰기가 끝난 파티션만 VACUUM FULL 로 축소)
+def apply_retention(conn, parts, now=None, days=RAW_RETENTION_DAYS, action=RAW_RETENTION_ACTION,
+                    chunk=RAW_SIDE_CHUNK, vacuum_full=RAW_VACUUM_FULL):
+    if days <= 0:
+        return []
+    now = now or datetime.now(tz=timezone.utc)
+    cutoff = now - timedelta(days=days)
+
+    with conn.cursor() as cur:
+        create_tables(cur)
+        cur.execute(SELECT_RAW_DONE_SQL)
+        done = {name for name, in cur.fetchall()}
+    conn.commit()
+
+    retired = []
+    for name, (_, end) in sorted(parts.items()):
+        if end > cutoff or name in done:
+            continue
+        started = time.monotonic()
+        try:
+            moved = _retire_partition(conn, name, action, chunk)
+        except Exception as e:
+            conn.rollback()
+            logger.warning("파티션 %s raw 정리 실패: %s", name, e)
+            continue
+
+        if vacuum_full and moved:
+            autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"VACUUM FULL {name};")
+            except Exception as e:
+                logger.warning("파티션 %s VACUUM FULL 실패: %s", name, e)
+            finally:
+                conn.autocommit = autocommit
+
+        retired.append(name)
+        logger.info("파티션 %s raw %s | rows=%d (%.0fs)", name, "보조 테이블로 이동" if action == "side" else "삭제", moved, time.monotonic() - started)
+    return retired
+
+
+# 한 행의 raw (chat_logs 에 없으면 보조 테이블에서)
+def fetch_raw(conn, chat_id):
+    with conn.cursor() as cur:
+        cur.execute(SELECT_RAW_SQL, {"id": chat_id})
+        return cur.fetchone()[0]
+
+
+if __name__ == "__main__":
+    import partitions
+
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="chat_logs.raw 보존 정책 적용")
+    parser.add_argument("command", choices=["prune", "retention"])
+    parser.add_argument("--days", type=int, default=RAW_RETENTION_DAYS, help="retention: 이 일수가 지난 파티션")
+    parser.add_argument("--action", choices=["side", "drop"], default=RAW_RETENTION_ACTION)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        if args.command == "prune":
+            logger.info("raw 정리 완료 | updated=%d (공간 회수는 VACUUM FULL 또는 retention 이후)", prune_existing(conn))
+        else:
+            if args.days <= 0:
+                parser.error("--days 또는 RAW_RETENTION_DAYS 를 지정하세요")
+            apply_retention(conn, partitions.list_partitions(conn), days=args.days, action=args.action)
+    finally:
+        conn.close()
@@ -0,0 +1,133 @@
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+from config.settings import *
+
+
+# 방송 중이 아님 (chatChannelId 없음)
+class StreamerOffline(Exception):
+    pass
+
+
+class _ChannelState:
+    __slots__ = ("attempts", "offline", "down_since")
+
+    def __init__(self):
+        self.attempts = 0
+        self.offline = False
+        self.down_since = None
+
+
+# 프로세스 공용 재연결 스케줄러
+# 채널별 지수 백오프 + full jitter, 동시 핸드셰이크 수 제한, 오프라인 채널은 느린 주기로 확인
+class ReconnectScheduler:
+    def __init__(self, base=RECONNECT_BASE, cap=RECONNECT_CAP, max_handshakes=RECONNECT_MAX_HANDSHAKES,
+                 offline_poll=RECONNECT_OFFLINE_POLL):
+        self.base = base
+        self.cap = cap
+        self.max_handshakes = max_handshakes
+        self.offline_poll = offline_poll
+
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._sem = threading.BoundedSemaphore(max_handshakes)
+        self._async_sems = {}
+        self._inflight = 0
+
+        self.reconnects = 0
+        self.failures = 0
+        self._ttr = deque(maxlen=1000)
+        self._prev_reconnects, self._prev_t = 0, time.monotonic()
+
+    def _state(self, key):
+        state = self._channels.get(key)
+        if state is None:
+            state = self._channels[key] = _ChannelState()
+        return state
+
+    # 다음 연결 시도까지 대기 시간 (첫 시도는 즉시)
+    def delay(self, key):
+        with self._lock:
+            state = self._state(key)
+            if state.offline:
+                return self.offline_poll * random.uniform(0.8, 1.2)
+            if state.attempts == 0:
+                return 0.0
+            return random.uniform(0, min(self.cap, self.base * 2 ** (state.attempts - 1)))
+
+    # 연결이 끊김 (재연결 소요 시간 측정 시작)
+    def disconnected(self, key):
+        with self._lock:
+            state = self._state(key)
+            if state.down_since is None:
+                state.down_since = time.monotonic()
+
+    def failed(self, key, error):
+        with self._lock:
+            state = self._state(key)
+            state.offline = isinstance(error, StreamerOffline)
+            state.attempts = 0 if state.offline else state.attempts + 1
+            self.failures += 1
+
+    def succeeded(self, key):
+        with self._lock:
+            state = self._state(key)
+            if state.down_since is not None:
+                self.reconnects += 1
+                self._ttr.append(time.monotonic() - state.down_since)
+            state.attempts, state.offline, state.down_since = 0, False, None
+
+    def forget(self, key):
+        with self._lock:
+            self._channels.pop(key, None)
+
+    @contextmanager
+    def handshake(self):
+        with self._sem:
+            with self._lock:
+                self._inflight += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._inflight -= 1
+
+    @asynccontextmanager
+    async def ahandshake(self):
+        loop = asyncio.get_running_loop()
+        sem = self._async_sems.get(loop)
+        if sem is None:
+            sem = self._async_sems[loop] = asyncio.Semaphore(self.max_handshakes)
+        async with sem:
+            with self._lock:
+                self._inflight += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._inflight -= 1
+
+    # 재연결률 (직전 호출 이후), 재연결 소요 시간 p50/p99, 오프라인 대기 채널 수
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            rate = (self.reconnects - self._prev_reconnects) / max(now - self._prev_t, 1e-9)
+            self._prev_reconnects, self._prev_t = self.reconnects, now
+            ttr = sorted(self._ttr)
+            return {
+                "reconnects": self.reconnects,
+                "reconnects_per_sec": rate,
+                "failures": self.failures,
+                "ttr_p50": ttr[len(ttr) // 2] if ttr else 0.0,
+                "ttr_p99": ttr[min(len(ttr) - 1, int(len(ttr) * 0.99))] if ttr else 0.0,
+                "parked": sum(s.offline for s in self._channels.values()),
+                "backing_off": sum(s.attempts > 0 for s in self._channels.values()),
+                "handshakes": self._inflight,
+            }
+
+
+SCHEDULER = ReconnectScheduler()
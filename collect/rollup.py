@@ -0,0 +1,97 @@
+import time
+import logging
+import argparse
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-rollup")
+
+TZ = ZoneInfo(ROLLUP_TZ)
+
+# hll 확장을 쓸 수 없으면 create_tables 에서 꺼짐
+hll_enabled = HLL_ENABLED
+_UPSERT_HLL_SQL = UPSERT_USER_HLL_SQL.format(log2m=HLL_LOG2M)
+
+
+# 저장된 행 (streamer_id, user_key, msg, ts) → 집계 단위별 증분
+def aggregate(rows):
+    minute, hourly, daily, users, lengths = Counter(), Counter(), Counter(), Counter(), Counter()
+    for streamer_id, user_key, msg, ts in rows:
+        local = ts.astimezone(TZ)
+        chat_date = local.date()
+        minute[(streamer_id, ts.replace(second=0, microsecond=0))] += 1
+        hourly[(streamer_id, ts.replace(minute=0, second=0, microsecond=0))] += 1
+        daily[(streamer_id, chat_date)] += 1
+        if user_key is not None:
+            users[(streamer_id, chat_date, user_key)] += 1
+        lengths[(streamer_id, chat_date, len(msg or ""))] += 1
+    return minute, hourly, daily, users, lengths
+
+
+# 집계 테이블 증분 upsert (키 순서로 정렬해 동시 저장기 간 교착 방지)
+def apply_rollups(cur, rows):
+    if not rows:
+        return
+    minute, hourly, daily, users, lengths = aggregate(rows)
+    for sql, counter in (
+        (UPSERT_COUNTS_MINUTE_SQL, minute),
+        (UPSERT_COUNTS_HOURLY_SQL, hourly),
+        (UPSERT_COUNTS_DAILY_SQL, daily),
+        (UPSERT_USER_COUNTS_SQL, users),
+        (UPSERT_LENGTH_SQL, lengths),
+    ):
+        values = [(*key, n) for key, n in sorted(counter.items())]
+        execute_values(cur, sql, values, page_size=len(values))
+    if hll_enabled and users:
+        keys = sorted(users)
+        execute_values(cur, _UPSERT_HLL_SQL, keys, page_size=len(keys))
+
+
+def create_tables(cur):
+    global hll_enabled
+    cur.execute(CREATE_ROLLUP_SQL)
+    if not hll_enabled:
+        return
+    savepoint = not cur.connection.autocommit
+    try:
+        if savepoint:
+            cur.execute("SAVEPOINT hll;")
+        cur.execute(CREATE_HLL_SQL)
+    except psycopg2.Error as e:
+        if savepoint:
+            cur.execute("ROLLBACK TO SAVEPOINT hll;")
+        hll_enabled = False
+        logger.warning("hll 확장을 사용할 수 없어 고유 사용자 스케치를 끕니다: %s", e)
+
+
+# chat_logs 전체로 집계 테이블 재구성 (한 트랜잭션, 저장기는 잠금 해제까지 대기)
+def backfill(conn):
+    started = time.monotonic()
+    conn.autocommit = False
+    with conn.cursor() as cur:
+        create_tables(cur)
+        cur.execute(BACKFILL_ROLLUP_SQL, {"tz": ROLLUP_TZ})
+        if hll_enabled:
+            cur.execute(BACKFILL_HLL_SQL, {"tz": ROLLUP_TZ, "log2m": HLL_LOG2M})
+    conn.commit()
+    logger.info("집계 테이블 재구성 완료 (%.1fs)", time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="chat_logs 증분 집계 테이블")
+    parser.add_argument("command", choices=["backfill"])
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        backfill(conn)
+    finally:
+        conn.close()
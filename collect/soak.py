@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import resource
+import subprocess
+
+import pub
+from bench_pipeline import OfflineChat
+
+parser = argparse.ArgumentParser(description="async 수집기 소크 테스트 (가짜 채팅 서버)")
+parser.add_argument("--sessions", default="50,200,500,1000", help="쉼표로 구분한 세션 수 단계")
+parser.add_argument("--rate", type=float, default=5.0, help="세션당 초당 프레임 수")
+parser.add_argument("--duration", type=float, default=30.0, help="단계별 측정 시간(초)")
+parser.add_argument("--port", type=int, default=8765)
+
+
+# 발행 횟수만 세는 퍼블리셔
+class _DoneFuture:
+    def add_done_callback(self, fn):
+        pass
+
+
+class CountingPublisher:
+    def __init__(self):
+        self.count = 0
+
+    def publish(self, topic_path, data, **attributes):
+        self.count += 1
+        return _DoneFuture()
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def _stage(args, n, duration):
+    publisher = CountingPublisher()
+    rss_before = _rss_bytes()
+
+    chat_url = f"ws://127.0.0.1:{args.port}"
+    sessions = [OfflineChat(f"{i:032x}", {}, pub.logger, publisher, "soak", chat_url) for i in range(n)]
+    tasks = [asyncio.create_task(c.run()) for c in sessions]
+
+	# 모든 세션 연결 대기
+    deadline = time.monotonic() + 60
+    while sum(c.sock is not None for c in sessions) < n and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+    connected = sum(c.sock is not None for c in sessions)
+    rss_connected = _rss_bytes()
+
+    count0, cpu0, wall0 = publisher.count, time.process_time(), time.monotonic()
+    await asyncio.sleep(duration)
+    count1, cpu1, wall1 = publisher.count, time.process_time(), time.monotonic()
+
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    wall = wall1 - wall0
+    cpu = cpu1 - cpu0
+    cpu_frac = cpu / wall if wall else 0.0
+    return {
+        "sessions": n,
+        "connected": connected,
+        "chats_per_s": (count1 - count0) / wall if wall else 0.0,
+        "cpu_pct": cpu_frac * 100,
+        "sessions_per_core": connected / cpu_frac if cpu_frac else float("inf"),
+        "kb_per_session": (rss_connected - rss_before) / 1024 / max(connected, 1),
+        "rss_mb": rss_connected / 1024 / 1024,
+    }
+
+
+async def main(args):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_chat_server.py"),
+         "--port", str(args.port), "--rate", str(args.rate)],
+    )
+    try:
+        await asyncio.sleep(1.0)
+        print(f"{'sessions':>8} {'conn':>6} {'chats/s':>9} {'cpu%':>6} {'sess/core':>10} {'KB/sess':>8} {'rss MB':>7}")
+        for n in (int(x) for x in args.sessions.split(",")):
+            r = await _stage(args, n, args.duration)
+            print(
+                f"{r['sessions']:>8} {r['connected']:>6} {r['chats_per_s']:>9.0f} {r['cpu_pct']:>6.1f} "
+                f"{r['sessions_per_core']:>10.0f} {r['kb_per_session']:>8.1f} {r['rss_mb']:>7.1f}"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
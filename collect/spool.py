@@ -0,0 +1,398 @@
+import os
+import json
+import time
+import zlib
+import struct
+import logging
+import itertools
+import threading
+from collections import deque
+
+import metrics
+from config.settings import *
+
+logger = logging.getLogger("chzzk-spool")
+
+# 레코드: crc32 + 속성 길이 + 데이터 길이, 이후 속성(JSON) + 데이터
+_RECORD = struct.Struct(">III")
+
+
+# 세그먼트 로그 파일 기반 디스크 스풀 (append-only, 기록 순서대로 읽기)
+class DiskSpool:
+    def __init__(self, path, segment_bytes=SPOOL_SEGMENT_BYTES, fsync=SPOOL_FSYNC):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        segments = self._segments()
+        self.cursor = self._load_cursor() or ((segments[0] if segments else 0), 0)
+
+        # 재시작 시 새 세그먼트에 기록 (이전 세그먼트의 잘린 꼬리 레코드 격리)
+        self.write_seq = (segments[-1] + 1) if segments else 0
+        if not segments:
+            self.cursor = (self.write_seq, 0)
+        self._wf = open(self._segment_path(self.write_seq), "ab")
+
+        self.appended = 0
+        self.replayed = 0
+
+    def _segments(self):
+        return sorted(int(name[:-4]) for name in os.listdir(self.path) if name.endswith(".seg"))
+
+    def _segment_path(self, seq):
+        return os.path.join(self.path, f"{seq:012d}.seg")
+
+    def _cursor_path(self):
+        return os.path.join(self.path, "cursor")
+
+    def _load_cursor(self):
+        try:
+            with open(self._cursor_path(), "r") as f:
+                seq, offset = f.read().split()
+                return int(seq), int(offset)
+        except (OSError, ValueError):
+            return None
+
+    # 레코드 추가 (세그먼트 크기 초과 시 교체)
+    def append(self, data: bytes, attributes: dict):
+        attrs = json.dumps(attributes, ensure_ascii=False).encode("utf-8")
+        body = attrs + data
+        record = _RECORD.pack(zlib.crc32(body), len(attrs), len(data)) + body
+
+        with self.lock:
+            if self._wf.tell() >= self.segment_bytes:
+                self._wf.close()
+                self.write_seq += 1
+                self._wf = open(self._segment_path(self.write_seq), "ab")
+            self._wf.write(record)
+            self._wf.flush()
+            if self.fsync:
+                os.fsync(self._wf.fileno())
+            self.appended += 1
+
+    # 커서부터 최대 limit개 읽기 → [(data, attributes, 레코드 끝 위치)], 마지막 위치 (커서는 commit 시에만 이동)
+    def read(self, limit):
+        with self.lock:
+            write_seq = self.write_seq
+        seq, offset = self.cursor
+        records = []
+
+        while len(records) < limit:
+            try:
+                f = open(self._segment_path(seq), "rb")
+            except FileNotFoundError:
+                if seq < write_seq:
+                    seq, offset = seq + 1, 0
+                    continue
+                break
+
+            with f:
+                f.seek(offset)
+                while len(records) < limit:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    crc, attrs_len, data_len = _RECORD.unpack(header)
+                    body = f.read(attrs_len + data_len)
+                    if len(body) < attrs_len + data_len or zlib.crc32(body) != crc:
+                        if seq < write_seq:
+                            logger.warning("손상된 스풀 레코드 건너뜀: segment=%d offset=%d", seq, offset)
+                            offset = os.path.getsize(self._segment_path(seq))
+                        break
+                    attributes = json.loads(body[:attrs_len].decode("utf-8"))
+                    offset += _RECORD.size + attrs_len + data_len
+                    records.append((body[attrs_len:], attributes, (seq, offset)))
+
+            if len(records) < limit and seq < write_seq and offset >= os.path.getsize(self._segment_path(seq)):
+                seq, offset = seq + 1, 0
+                continue
+            break
+
+        return records, (seq, offset)
+
+    # 재전송 완료 위치 기록, 다 읽은 세그먼트 삭제
+    def commit(self, position, count):
+        self.cursor = position
+        tmp = self._cursor_path() + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(f"{position[0]} {position[1]}")
+        os.replace(tmp, self._cursor_path())
+        self.replayed += count
+
+        for seq in self._segments():
+            if seq < position[0]:
+                try:
+                    os.remove(self._segment_path(seq))
+                except OSError:
+                    pass
+
+    def caught_up(self):
+        with self.lock:
+            return self.cursor == (self.write_seq, self._wf.tell())
+
+    # 재전송 대기 바이트 수
+    def depth_bytes(self):
+        with self.lock:
+            write_seq, write_offset = self.write_seq, self._wf.tell()
+        seq, offset = self.cursor
+        total = 0
+        for s in range(seq, write_seq + 1):
+            if s == write_seq:
+                total += write_offset
+            else:
+                try:
+                    total += os.path.getsize(self._segment_path(s))
+                except OSError:
+                    pass
+        return max(total - offset, 0)
+
+    def close(self):
+        with self.lock:
+            self._wf.close()
+
+
+# 발행 대기열: 메모리 큐(유량 제어) + 장애 시 디스크 스풀 후 순서대로 재전송
+# - 스풀이 비기 전까지 새 메시지는 모두 스풀 뒤에 기록, 실패한 메시지는 접수 순서대로 그보다 앞에 기록
+# - 디스크 기록은 모두 펌프 스레드에서 (호출 스레드는 큐에만 넣음)
+# - 발행 중(in-flight)이던 메시지가 실패하면 그 뒤에 이미 확인된 메시지보다 늦게 도착할 수 있음 (최대 max_inflight 개 범위)
+class SpooledPublisher:
+    def __init__(self, publisher, spool_dir=SPOOL_DIR, topic_path=TOPIC_PATH, max_queue=SPOOL_MAX_QUEUE,
+                 max_inflight=SPOOL_MAX_INFLIGHT, logger=logger):
+        self.publisher = publisher
+        self.topic_path = topic_path
+        self.spool = DiskSpool(spool_dir)
+        self.max_queue = max_queue
+        self.logger = logger
+
+        # 큐/실패 항목: (접수 번호, topic_path, data, attributes, 접수 시각)
+        self._queue = deque()
+        self._failed = []  # 발행 실패 → 펌프 스레드가 접수 순서대로 스풀에 기록
+        self._pending = {}  # 발행 중 future → (항목, 채널 지표), 완료 콜백은 바운드 메서드 하나
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._inflight = threading.BoundedSemaphore(max_inflight)  # 실시간 발행 + 재전송 공용
+        self._live = 0  # 실시간 발행 중인 메시지 수
+        self._spilling = 0  # 펌프가 꺼냈지만 아직 스풀에 기록하지 않은 메시지 수
+        self._spooling = not self.spool.caught_up()
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+
+        self.published = 0
+        self.failed = 0
+
+        self._pump = threading.Thread(target=self._pump_loop, name="chzzk-spool-pump", daemon=True)
+        self._replayer = threading.Thread(target=self._replay_loop, name="chzzk-spool-replay", daemon=True)
+        self._pump.start()
+        self._replayer.start()
+
+    # 발행 요청 (호출 스레드에서는 큐에만 넣음, 스풀 중이거나 큐가 가득 차면 펌프가 디스크로 넘김)
+    def publish(self, topic_path, data: bytes, **attributes):
+        with self._cond:
+            if not self._spooling and len(self._queue) >= self.max_queue:
+                self.logger.warning("발행 큐 가득 참 (%d), 디스크 스풀 시작", len(self._queue))
+                self._spooling = True
+            self._queue.append((next(self._seq), topic_path, data, attributes, time.monotonic()))
+            self._cond.notify_all()
+        return None
+
+    # 장애 감지 시 스풀 모드로 전환 (_cond 를 잡은 채 호출, 큐에 남은 메시지는 펌프가 스풀로 이동)
+    def _fail_over_locked(self, item, error):
+        self._failed.append(item)
+        if not self._spooling:
+            self.logger.error("publish failed, 디스크 스풀 전환: %s", error)
+        self._spooling = True
+        self._retry_at = time.monotonic() + SPOOL_RETRY_INTERVAL
+        self._cond.notify_all()
+
+    def _on_done(self, future):
+        self._inflight.release()
+        error = future.exception()
+        with self._cond:
+            item, channel = self._pending.pop(future)
+            self._live -= 1
+            if error is None:
+                self.published += 1
+            else:
+                self.failed += 1
+                self._fail_over_locked(item, error)
+            self._cond.notify_all()
+        channel.inflight.dec()
+        if error is None:
+            channel.ack.observe(time.monotonic() - item[4])
+        else:
+            channel.errors.inc()
+
+    # 재전송 발행 완료 → 동시 발행 수 반환
+    def _release(self, future):
+        self._inflight.release()
+
+    # 스풀에 기록할 메시지: 실패한 메시지(접수 순) + 큐 전체
+    # 실시간 발행 중인 메시지가 남아 있으면 그 결과(실패분)가 먼저 기록되도록 기다림
+    def _take_spill_locked(self, force=False):
+        if not force and (self._live or not (self._spooling or self._stop.is_set())):
+            return []
+        spill = sorted(self._failed, key=lambda item: item[0])
+        self._failed.clear()
+        spill.extend(self._queue)
+        self._queue.clear()
+        self._spilling += len(spill)
+        return spill
+
+    def _spill(self, items):
+        try:
+            for _, _, data, attributes, _ in items:
+                self.spool.append(data, attributes)
+        finally:
+            with self._cond:
+                self._spilling -= len(items)
+                self._cond.notify_all()
+
+    def _pump_loop(self):
+        while True:
+            item = None
+            with self._cond:
+                while True:
+                    spill = self._take_spill_locked()
+                    if spill or self._stop.is_set():
+                        break
+                    if self._queue and not self._spooling:
+                        item = self._queue.popleft()
+                        self._live += 1
+                        break
+                    self._cond.wait(0.5)
+
+            if spill:
+                self._spill(spill)
+                continue
+            if item is None:
+                return
+
+            _, topic_path, data, attributes, _ = item
+            channel = metrics.channel(attributes.get("streamer_id", ""))
+            self._inflight.acquire()
+            try:
+                future = self.publisher.publish(topic_path, data, **attributes)
+            except Exception as e:
+                self._inflight.release()
+                channel.errors.inc()
+                with self._cond:
+                    self._live -= 1
+                    self.failed += 1
+                    self._fail_over_locked(item, e)
+                continue
+            channel.inflight.inc()
+            with self._cond:
+                self._pending[future] = (item, channel)
+            future.add_done_callback(self._on_done)
+
+    # 스풀 재전송 끝 (디스크가 비고, 발행 중/기록 대기 중인 메시지도 없어야 메모리 큐로 복귀)
+    def _finish_replay(self):
+        with self._cond:
+            if self._live or self._spilling or self._failed or not self.spool.caught_up():
+                return False
+            self._spooling = False
+            self._cond.notify_all()
+        self.logger.info("디스크 스풀 재전송 완료, 메모리 큐로 복귀")
+        return True
+
+    # 배치를 순서대로 발행 (동시 발행 수는 실시간 발행과 같은 세마포어로 제한)
+    # 첫 레코드는 확인 후에 나머지를 보내고, 실패를 보면 뒤 레코드는 더 보내지 않음
+    def _publish_batch(self, records):
+        futures, error = [], None
+        for i, (data, attributes, end) in enumerate(records):
+            if futures and futures[-1][0].done() and futures[-1][0].exception() is not None:
+                break
+            self._inflight.acquire()
+            try:
+                f = self.publisher.publish(self.topic_path, data, **attributes)
+            except Exception as e:
+                self._inflight.release()
+                error = e
+                break
+            f.add_done_callback(self._release)
+            futures.append((f, end))
+            if i == 0:
+                try:
+                    f.result(timeout=SPOOL_PUBLISH_TIMEOUT)
+                except Exception as e:
+                    return [], e
+        return futures, error
+
+    # 스풀 재전송 (확인된 앞부분까지만 커서 이동, 실패한 레코드부터 다시 보냄 → 뒤 레코드는 중복될 수 있음, 저장기는 message_key 로 제거)
+    def _replay_loop(self):
+        while not self._stop.is_set():
+            if not self._spooling or time.monotonic() < self._retry_at:
+                self._stop.wait(0.5)
+                continue
+
+            records, position = self.spool.read(SPOOL_REPLAY_BATCH)
+            if not records:
+                if position != self.spool.cursor:
+                    self.spool.commit(position, 0)
+                if not self._finish_replay():
+                    self._stop.wait(0.05)
+                continue
+
+            started = time.monotonic()
+            futures, error = self._publish_batch(records)
+            committed, count, failed = self.spool.cursor, 0, None
+            for f, end in futures:
+                try:
+                    f.result(timeout=SPOOL_PUBLISH_TIMEOUT)
+                except Exception as e:
+                    failed = failed or e
+                if failed is None:
+                    committed = end
+                    count += 1
+            error = failed or error
+            if error is None and len(futures) == len(records):
+                committed = position
+
+            if committed != self.spool.cursor:
+                self.spool.commit(committed, count)
+            with self._cond:
+                self.published += count
+            if error is not None:
+                self.logger.warning("스풀 재전송 실패, %.0f초 후 재시도: %s", SPOOL_RETRY_INTERVAL, error)
+                self._retry_at = time.monotonic() + SPOOL_RETRY_INTERVAL
+                continue
+            elapsed = time.monotonic() - started
+            self.logger.debug("스풀 재전송 %d건, %.0f msgs/s", count, count / elapsed if elapsed else 0.0)
+
+    # 스풀 깊이, 재전송 속도 등 지표
+    def stats(self) -> dict:
+        with self._cond:
+            queued, inflight, spooling = len(self._queue), self._live, self._spooling
+        return {
+            "queued": queued,
+            "inflight": inflight,
+            "spooling": spooling,
+            "spool_bytes": self.spool.depth_bytes(),
+            "spool_appended": self.spool.appended,
+            "spool_replayed": self.spool.replayed,
+            "published": self.published,
+            "failed": self.failed,
+        }
+
+    # 메모리 큐를 비우고 종료 (남은 메시지는 펌프가 스풀에 보존)
+    def stop(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._cond:
+                if not self._queue and not self._failed and not self._live and not self._spilling:
+                    break
+            time.sleep(0.1)
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._pump.join()
+        self._replayer.join()
+
+        # 남은 큐 + 펌프 종료 후 끝난 발행 실패
+        with self._cond:
+            spill = self._take_spill_locked(force=True)
+        self._spill(spill)
+        self.spool.close()
+        self.publisher.stop()
@@ -1,168 +1,297 @@
-import os
-import json
+import time
 import signal
 import logging
-from datetime import datetime, timezone
+import argparse
+import threading
+import multiprocessing
 from concurrent.futures import TimeoutError
 
+import logs
+import dims
+import rawstore
+import rollup
+import metrics
+import partitions
+from messages import parse_message
+from transport import StreamHandle, get_transport
 from config.settings import *
 from config.sql import *
 
-from google.cloud import pubsub_v1
-import psycopg2
-from psycopg2.pool import SimpleConnectionPool
-from psycopg2.extras import Json
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import Json, execute_values
 
-# Google Cloud Pub/Sub 인증
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_APPLICATION_CREDENTIALS
-
-# 로깅 설정
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(asctime)s | %(levelname)s | %(message)s"
-)
+# 로깅 설정 (큐 + 백그라운드 출력, 메시지 단위 이벤트는 표본만)
+logs.setup()
 logger = logging.getLogger("chatzzk-sub")
+_sample = logs.Sampler()
+
+pool = maintainer = writer = transport = streaming_pull_future = None
+
+# 종료 중 (새 메시지는 nack), 실행 중인 콜백 수
+draining = threading.Event()
+_gate = threading.Condition()
+_active = 0
 
-# 데이터베이스 연결 풀 초기화
-def init_db_pool():
-    global pool
+# 데이터베이스 연결 풀 초기화 (저장 스레드 + 파티션 관리 스레드가 함께 쓰므로 스레드 안전 풀)
+# maintain=False 면 파티션 주기 관리는 하지 않음 (다중 프로세스 모드의 0번 이외 워커)
+def init_db_pool(maintain=True):
+    global pool, maintainer
+    maintainer = None
     dsn = f"host={PG_HOST} port={PG_PORT} dbname={PG_DB} user={PG_USER} password={PG_PASS}"
-    pool = SimpleConnectionPool(POOL_MIN, POOL_MAX, dsn=dsn)
+    pool = ThreadedConnectionPool(POOL_MIN, max(POOL_MAX, SUB_WRITERS + 1), dsn=dsn)
     conn = pool.getconn()
     try:
         conn.autocommit = True
+        kind = partitions.table_kind(conn)
+        if kind == "r" or (kind == "p" and not partitions.has_column(conn, "streamer_key")):
+            logger.warning("chat_logs 가 차원 키를 쓰는 파티션 테이블이 아닙니다. 'python3 partitions.py migrate' 로 이전하세요.")
+            return
         with conn.cursor() as cur:
+            cur.execute(CREATE_DIMENSIONS_SQL)
             cur.execute(CREATE_TABLE_SQL)
+            rawstore.create_tables(cur)
+            if ROLLUP_ENABLED:
+                rollup.create_tables(cur)
     finally:
         pool.putconn(conn)
 
-# UTC로 변환
-def _to_datetime_utc(val):
-    if val is None:
-        return datetime.now(tz=timezone.utc)
-    if isinstance(val, datetime):
-        return val.astimezone(timezone.utc) if val.tzinfo else val.replace(tzinfo=timezone.utc)
-    if isinstance(val, (int, float)):
-        return datetime.fromtimestamp(val, tz=timezone.utc)
-    if isinstance(val, str):
-        try:
-            dt = datetime.fromisoformat(val.replace("Z", "+00:00"))
-            return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        except Exception:
-            return datetime.now(tz=timezone.utc)
-    return datetime.now(tz=timezone.utc)
-
-# 메시지 파싱
-def parse_message(message):
-    fields = {
-        "message_id": getattr(message, "message_id", None),
-        "streamer_id": None,
-        "user_id": None,
-        "msg": None,
-        "ts": None,
-        "raw": None,
-    }
-
-    text = None
-    payload = None
-    try:
-        data_bytes = message.data or b""
-        text = data_bytes.decode("utf-8", errors="replace")
-        payload = json.loads(text)
-    except Exception:
-        payload = None
-
-    attrs = message.attributes or {}
-
-    def pick(*candidates, default=None):
-        for c in candidates:
-            if c is not None and c != "":
-                return c
-        return default
-
-	# 스트리머 ID 추출
-    fields["streamer_id"] = pick(
-        payload.get("streamer_id") if isinstance(payload, dict) else None,
-        attrs.get("streamer_id"),
-        default="unknown_streamer",
-    )
-
-	# 사용자 ID 추출
-    fields["user_id"] = pick(
-        (payload.get("user_id") if isinstance(payload, dict) else None),
-        attrs.get("user_id"),
-        default=None,
-    )
-
-	# 채팅 내용 추출
-    fields["msg"] = pick(
-        (payload.get("msg") if isinstance(payload, dict) else None),
-        (payload.get("message") if isinstance(payload, dict) else None),
-        text,
-        default="",
-    )
-
-	# 타임스탬프 추출
-    ts_candidate = pick(
-        (payload.get("ts") if isinstance(payload, dict) else None),
-        attrs.get("ts"),
-        getattr(message, "publish_time", None),
-        default=None,
-    )
-
-	# 타임스탬프 변환
-    fields["ts"] = _to_datetime_utc(ts_candidate)
-    fields["raw"] = payload if isinstance(payload, dict) else {"data": text, "attributes": dict(attrs)}
-
-    return fields
-
-# DB 저장 콜백 함수
-def callback(message):
-    global pool
-    try:
-        fields = parse_message(message)
+	# 파티션 선생성 및 주기적 관리
+    if not maintain:
+        return
+    maintainer = partitions.PartitionMaintainer(pool)
+    maintainer.run_once()
+    maintainer.start()
+
+
+# 배치 저장기 (write-behind, 저장 스레드 writers 개, 버퍼가 max_pending 행을 넘으면 add 가 대기)
+class BatchWriter:
+    def __init__(self, pool, max_rows, max_latency, logger, writers=SUB_WRITERS, max_pending=SUB_MAX_PENDING):
+        self.pool = pool
+        self.max_rows = max_rows
+        self.max_latency = max_latency
+        self.max_pending = max(max_pending, max_rows)
+        self.logger = logger
+
+        self._buf = []
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._space = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._first_ts = None
+        self.dims = dims.Dimensions()
+
+        # 버퍼가 가득 차 수신 콜백이 기다린 횟수/시간 (Postgres 지연 → 역압)
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+
+        # 커밋 후 호출 (batch, 커밋 시각) - 벤치마크/집계용
+        self.on_commit = None
+
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"chatzzk-batch-writer-{i}", daemon=True)
+            for i in range(writers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buf)
+
+    # 버퍼에 추가 (가득 차 있으면 공간이 날 때까지 대기, 배치 크기마다 저장 스레드 깨우기)
+    def add(self, fields, message):
+        with self._lock:
+            if len(self._buf) >= self.max_pending and not self._stop.is_set():
+                waited = time.monotonic()
+                while len(self._buf) >= self.max_pending and not self._stop.is_set():
+                    self._space.wait(1.0)
+                self.blocked += 1
+                self.blocked_seconds += time.monotonic() - waited
+            if not self._buf:
+                self._first_ts = time.monotonic()
+                self._ready.notify()
+            self._buf.append((fields, message))
+            if len(self._buf) % self.max_rows == 0:
+                self._ready.notify()
 
-        conn = pool.getconn()
+    # 시간/크기 트리거 루프 (저장 스레드마다 한 배치씩)
+    def _loop(self):
+        while True:
+            with self._lock:
+                while not self._stop.is_set():
+                    size = len(self._buf)
+                    waited = time.monotonic() - self._first_ts if size else 0.0
+                    if size >= self.max_rows or (size and waited >= self.max_latency):
+                        break
+                    self._ready.wait(self.max_latency - waited)
+                else:
+                    return
+                batch = self._take_locked()
+            self._write(batch)
+
+    def _take_locked(self):
+        batch, self._buf = self._buf[:self.max_rows], self._buf[self.max_rows:]
+        self._first_ts = time.monotonic() if self._buf else None
+        self._space.notify_all()
+        if len(self._buf) >= self.max_rows:
+            self._ready.notify()
+        return batch
+
+    def flush(self):
+        with self._lock:
+            batch = self._take_locked()
+        if batch:
+            self._write(batch)
+
+    # 배치 커밋 후 ack, 실패 시 nack
+    def _write(self, batch):
+        started = time.perf_counter()
+        inserted = None
+        conn = self.pool.getconn()
         try:
-            conn.autocommit = True
+            conn.autocommit = False
+
+			# 스트리머/사용자 → 대리 키 (raw 는 RAW_POLICY 에 따라 전체 또는 나머지만)
+            self.dims.resolve(conn, [f for f, _ in batch])
+            rows = []
+            for f, _ in batch:
+                raw = rawstore.stored_raw(f["raw"])
+                rows.append((
+                    f["message_id"],
+                    f["streamer_key"],
+                    f["user_key"],
+                    f["msg"],
+                    f["ts"],
+                    Json(raw) if raw is not None else None,
+                ))
+
             with conn.cursor() as cur:
-                cur.execute(
-                    INSERT_SQL,
-                    (
-                        fields["message_id"],
-                        fields["streamer_id"],
-                        fields["user_id"],
-                        fields["msg"],
-                        fields["ts"],
-                        Json(fields["raw"]),
-                    ),
-                )
-            message.ack()
-            logger.info(
-                "DB 저장 | mid=%s, streamer=%s, user=%s, ts=%s",
-                fields["message_id"], fields["streamer_id"], fields["user_id"], fields["ts"].isoformat()
-            )
+                if ROLLUP_ENABLED:
+                    returned = execute_values(cur, INSERT_BATCH_RETURNING_SQL, rows, page_size=len(rows), fetch=True)
+                    ids = {f["streamer_key"]: f["streamer_id"] for f, _ in batch}
+                    inserted = [(ids[streamer_key], user_key, msg, ts) for streamer_key, user_key, msg, ts in returned]
+                    rollup.apply_rollups(cur, inserted)
+                else:
+                    execute_values(cur, INSERT_BATCH_SQL, rows, page_size=len(rows))
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            metrics.batch_failed()
+            self.logger.exception("배치 저장 실패. rows=%d, error=%s", len(batch), e)
+            for _, message in batch:
+                try:
+                    message.nack()
+                except Exception:
+                    pass
+            return
         finally:
-            pool.putconn(conn)
+            self.pool.putconn(conn)
+
+        committed_at = time.time()
+        elapsed = time.perf_counter() - started
+        for _, message in batch:
+            message.ack()
+        metrics.observe_commit(batch, inserted, committed_at, elapsed)
 
+        if self.on_commit is not None:
+            try:
+                self.on_commit(batch, committed_at)
+            except Exception as e:
+                self.logger.exception("on_commit 실패: %s", e)
+
+        self.logger.info(
+            "DB 배치 저장 | rows=%d, latency=%.1fms, rate=%.0f rows/s",
+            len(batch), elapsed * 1000, len(batch) / elapsed if elapsed > 0 else 0.0,
+            extra={"rows": len(batch), "latency_ms": round(elapsed * 1000, 1)},
+        )
+
+    # 남은 버퍼 모두 저장 후 종료
+    def close(self):
+        with self._lock:
+            self._stop.set()
+            self._ready.notify_all()
+            self._space.notify_all()
+        for t in self._threads:
+            t.join()
+        while True:
+            with self._lock:
+                if not self._buf:
+                    break
+            self.flush()
+
+
+# 메시지 수신 콜백 함수
+def callback(message):
+    global _active
+    with _gate:
+        if draining.is_set():
+            try:
+                message.nack()
+            except Exception:
+                pass
+            return
+        _active += 1
+    try:
+        fields = parse_message(message)
+        metrics.observe_received(fields, message)
+        writer.add(fields, message)
+        if _sample():
+            logger.debug("received", extra={
+                "streamer_id": fields["streamer_id"], "message_id": fields["message_id"], "sample_every": LOG_SAMPLE_EVERY,
+            })
     except Exception as e:
-        logger.exception("DB 저장 실패. error=%s", e)
+        logger.exception("메시지 처리 실패. error=%s", e, extra={"message_id": getattr(message, "message_id", None)})
         try:
             message.nack()
         except Exception:
             pass
+    finally:
+        with _gate:
+            _active -= 1
+            _gate.notify_all()
 
-# 종료 처리
+# 수신 중단 (SIGTERM/SIGINT, 스트림은 열어 둔 채 새 메시지만 거절, 저장/ack 는 shutdown 에서)
+def stop_pulling(signum=None, frame=None):
+    draining.set()
+    try:
+        if isinstance(streaming_pull_future, StreamHandle):
+            streaming_pull_future.pause()
+    except Exception:
+        pass
+
+# 종료 처리 (수신 중단 → 처리 중인 콜백 대기 → 스트림이 열린 채 버퍼 저장 후 ack → 스트림 종료 → 정리)
+# Pub/Sub 는 스트림을 닫은 뒤 보낸 ack 를 버리므로 순서가 중요
 def shutdown(signum=None, frame=None):
-    global streaming_pull_future, subscriber, pool
+    started = time.monotonic()
+    stop_pulling()
+    deadline = started + SUB_DRAIN_TIMEOUT
+    with _gate:
+        while _active and time.monotonic() < deadline:
+            _gate.wait(deadline - time.monotonic())
+    try:
+        if writer:
+            pending = writer.pending()
+            writer.close()
+            logger.info("drain 완료 | rows=%d, %.1fs", pending, time.monotonic() - started)
+    except Exception as e:
+        logger.exception("drain 실패: %s", e)
     try:
         if streaming_pull_future:
             streaming_pull_future.cancel()
+            streaming_pull_future.result(timeout=SUB_DRAIN_TIMEOUT)
+    except Exception:
+        pass
+    try:
+        if maintainer:
+            maintainer.stop()
     except Exception:
         pass
     try:
-        if subscriber:
-            subscriber.close()
+        if transport:
+            transport.close()
     except Exception:
         pass
     try:
@@ -172,30 +301,78 @@ def shutdown(signum=None, frame=None):
         pass
 
 
-def main():
-    global subscriber, streaming_pull_future
-    init_db_pool()
+def run(idx=0, maintain=True):
+    global transport, streaming_pull_future, writer
+    metrics.serve(SUB_METRICS_PORT, idx)
+    init_db_pool(maintain)
+    writer = BatchWriter(pool, BATCH_MAX_ROWS, BATCH_MAX_LATENCY, logger)
+    metrics.watch_writer(writer)
 
-	# Subscriber 초기화
-    subscriber = pubsub_v1.SubscriberClient()
-    streaming_pull_future = subscriber.subscribe(SUBSCRIPTION_PATH, callback=callback)
+	# Subscriber 초기화 (TRANSPORT 설정, 흐름 제어는 전송 계층 기본값)
+    transport = get_transport()
+    streaming_pull_future = transport.subscribe(callback)
 
-	# 종료 신호 처리
-    signal.signal(signal.SIGINT, shutdown)
-    signal.signal(signal.SIGTERM, shutdown)
+	# 종료 신호 → 수신 중단 후 drain
+    signal.signal(signal.SIGINT, stop_pulling)
+    signal.signal(signal.SIGTERM, stop_pulling)
 
-	# Subscriber 시작
-    with subscriber:
-        try:
-            streaming_pull_future.result()
-        except TimeoutError:
-            logger.warning("stream timed out")
-            streaming_pull_future.cancel()
+	# 종료 신호 또는 스트림 종료(오류)까지 대기
+    try:
+        while not draining.wait(1.0) and not streaming_pull_future.done():
+            pass
+        if streaming_pull_future.done():
             streaming_pull_future.result()
-        except Exception as e:
-            logger.exception("streaming_pull_future error: %s", e)
-        finally:
-            shutdown()
+    except TimeoutError:
+        logger.warning("stream timed out")
+    except Exception as e:
+        logger.exception("streaming_pull_future error: %s", e)
+    finally:
+        shutdown()
+
+
+def _worker(idx):
+    run(idx, maintain=idx == 0)
+
+
+# 여러 저장기 프로세스 (같은 구독/컨슈머 그룹을 나눠 받음)
+def run_processes(procs):
+	# 테이블/파티션은 워커 시작 전에 한 번 준비
+    init_db_pool()
+    if maintainer:
+        maintainer.stop()
+    pool.closeall()
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_worker, args=(i,), name=f"chatzzk-sub-{i}") for i in range(procs)]
+    for w in workers:
+        w.start()
+
+	# 종료 신호를 워커에 전달 (각 워커가 drain 후 종료)
+    def _forward(signum, frame):
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+
+    signal.signal(signal.SIGINT, _forward)
+    signal.signal(signal.SIGTERM, _forward)
+
+    for w in workers:
+        w.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pub/Sub → Postgres 저장기")
+    parser.add_argument("--procs", type=int, default=SUB_PROCS, help="저장기 프로세스 수")
+    args = parser.parse_args()
+
+    if args.procs > 1 and TRANSPORT == "local":
+        logger.warning("TRANSPORT=local 은 프로세스 간에 공유되지 않아 단일 프로세스로 실행합니다")
+        args.procs = 1
+
+    if args.procs <= 1:
+        run()
+    else:
+        run_processes(args.procs)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
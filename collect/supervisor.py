@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import queue
+import bisect
+import hashlib
+import logging
+import multiprocessing
+
+from config.settings import *
+
+logger = logging.getLogger("chzzk-supervisor")
+
+
+# 일관 해시 링 (가상 노드)
+class HashRing:
+    def __init__(self, nodes, vnodes=SUPERVISOR_VNODES):
+        self.vnodes = vnodes
+        self._keys = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def add(self, node):
+        for v in range(self.vnodes):
+            h = self._hash(f"{node}#{v}")
+            i = bisect.bisect(self._keys, h)
+            self._keys.insert(i, h)
+            self._nodes.insert(i, node)
+
+    def remove(self, node):
+        keep = [(k, n) for k, n in zip(self._keys, self._nodes) if n != node]
+        self._keys = [k for k, _ in keep]
+        self._nodes = [n for _, n in keep]
+
+    def get(self, key: str):
+        i = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+# 워커 프로세스 감독: 배정, 재시작, 목록 변경 반영, 통계 수집
+class Supervisor:
+    def __init__(self, worker_target, cookies, procs, streamer_list_path=STREAMER_LIST_PATH):
+        self.worker_target = worker_target
+        self.cookies = cookies
+        self.procs = procs
+        self.streamer_list_path = streamer_list_path
+
+        self.ctx = multiprocessing.get_context("spawn")
+        self.stats_q = self.ctx.Queue()
+        self.ring = HashRing(range(procs))
+
+        self.streamers = {}
+        self.assignment = {}
+        self.workers = {}
+        self.cmd_qs = {}
+        self.stats = {}
+        self.restarts = {i: 0 for i in range(procs)}
+
+        self._mtime = None
+        self._stopping = False
+
+    def _load_streamers(self):
+        with open(self.streamer_list_path, "r", encoding="utf-8") as f:
+            return {s["id"]: s for s in json.load(f)}
+
+    # 워커 시작 후 배정된 스트리머 전달
+    def _spawn(self, idx):
+        cmd_q = self.ctx.Queue()
+        p = self.ctx.Process(
+            target=self.worker_target,
+            args=(idx, cmd_q, self.stats_q, self.cookies),
+            name=f"chzzk-worker-{idx}",
+        )
+        p.start()
+        self.workers[idx] = p
+        self.cmd_qs[idx] = cmd_q
+        for sid, owner in self.assignment.items():
+            if owner == idx:
+                cmd_q.put(("add", self.streamers[sid]))
+        logger.info("worker %d 시작 (pid=%s, streamers=%d)", idx, p.pid,
+                    sum(1 for o in self.assignment.values() if o == idx))
+
+    # 스트리머 목록 변경 반영 (추가/삭제된 스트리머만 재배정)
+    def _sync_streamers(self):
+        try:
+            mtime = os.path.getmtime(self.streamer_list_path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+
+        try:
+            latest = self._load_streamers()
+        except Exception as e:
+            logger.warning("스트리머 목록 로드 실패: %s", e)
+            return
+
+        for sid in set(self.streamers) - set(latest):
+            owner = self.assignment.pop(sid)
+            self.cmd_qs[owner].put(("remove", sid))
+            logger.info("스트리머 %s 제거 (worker %d)", sid, owner)
+
+        for sid in set(latest) - set(self.streamers):
+            owner = self.ring.get(sid)
+            self.assignment[sid] = owner
+            if owner in self.cmd_qs:
+                self.cmd_qs[owner].put(("add", latest[sid]))
+            logger.info("스트리머 %s 추가 (worker %d)", sid, owner)
+
+        self.streamers = latest
+
+    # 죽은 워커 재시작
+    def _check_workers(self):
+        for idx, p in list(self.workers.items()):
+            if not p.is_alive():
+                logger.warning("worker %d 종료됨 (exitcode=%s), 재시작", idx, p.exitcode)
+                self.restarts[idx] += 1
+                self._spawn(idx)
+
+    def _drain_stats(self):
+        while True:
+            try:
+                idx, stat = self.stats_q.get_nowait()
+            except queue.Empty:
+                break
+            self.stats[idx] = stat
+
+    # 워커별 처리량/재연결 보고
+    def _report(self):
+        total = 0.0
+        for idx in sorted(self.stats):
+            st = self.stats[idx]
+            total += st["msgs_per_sec"]
+            logger.info(
+                "worker %d | channels=%d, msgs/s=%.1f, reconnects=%d, deduped=%d, restarts=%d, cpu=%.0f%%, "
+                "api hit=%.0f%% http=%d",
+                idx, st["channels"], st["msgs_per_sec"], st["reconnects"], st.get("deduped", 0), self.restarts[idx], st["cpu_pct"],
+                st["api"]["hit_ratio"] * 100, st["api"]["http_requests"],
+            )
+            if st.get("spool"):
+                sp = st["spool"]
+                logger.info(
+                    "worker %d spool | queued=%d, inflight=%d, spooling=%s, depth=%dB, appended=%d, replayed=%d",
+                    idx, sp["queued"], sp["inflight"], sp["spooling"], sp["spool_bytes"],
+                    sp["spool_appended"], sp["spool_replayed"],
+                )
+            if st.get("reconnect"):
+                rc = st["reconnect"]
+                logger.info(
+                    "worker %d reconnect | rate=%.2f/s, ttr p50=%.1fs p99=%.1fs, parked=%d, backing_off=%d",
+                    idx, rc["reconnects_per_sec"], rc["ttr_p50"], rc["ttr_p99"], rc["parked"], rc["backing_off"],
+                )
+        logger.info("total msgs/s=%.1f (workers=%d)", total, self.procs)
+
+    def stop(self, signum=None, frame=None):
+        self._stopping = True
+
+    def run(self):
+        self._sync_streamers()
+        for idx in range(self.procs):
+            self._spawn(idx)
+
+        last_report = time.monotonic()
+        while not self._stopping:
+            time.sleep(1.0)
+            self._sync_streamers()
+            self._check_workers()
+            self._drain_stats()
+            if time.monotonic() - last_report >= SUPERVISOR_STATS_INTERVAL:
+                self._report()
+                last_report = time.monotonic()
+
+        for q in self.cmd_qs.values():
+            q.put(("stop", None))
+        for p in self.workers.values():
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
@@ -0,0 +1,27 @@
+import codec
+
+PAYLOAD = {
+    "streamer_id": "0123456789abcdef0123456789abcdef",
+    "chat_channel_id": "N1abcd",
+    "type": "채팅",
+    "uid": "u1",
+    "user_id": "user1",
+    "msg": "안녕하세요",
+    "msgTime_ms": 1_700_000_000_000,
+}
+
+
+def test_compact_round_trip():
+    data, fmt = codec.encode_payload(PAYLOAD, codec.FORMAT_COMPACT)
+    assert fmt == codec.FORMAT_COMPACT
+    decoded = codec.decode_payload(data, fmt)
+    assert {k: decoded[k] for k in PAYLOAD} == PAYLOAD
+
+
+# 16바이트 hex 로 그대로 복원되지 않는 ID 는 JSON 으로 (0 채움/대소문자 변경으로 다른 ID 가 되면 안 됨)
+def test_non_hex32_streamer_id_falls_back_to_json():
+    for streamer_id in ("abcd", "0123456789ABCDEF0123456789ABCDEF", "streamer", "0" * 34, None, 12345):
+        payload = dict(PAYLOAD, streamer_id=streamer_id)
+        data, fmt = codec.encode_payload(payload, codec.FORMAT_COMPACT)
+        assert fmt == codec.FORMAT_JSON
+        assert codec.decode_payload(data, fmt)["streamer_id"] == streamer_id
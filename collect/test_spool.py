@@ -0,0 +1,142 @@
+import time
+import threading
+from concurrent.futures import Future
+
+import spool
+from spool import SpooledPublisher
+
+
+# 처음 fail 번의 발행 호출(또는 fail_calls 에 든 호출 번호)은 실패, 이후 성공하는 가짜 퍼블리셔 (future 는 즉시 완료)
+class FlakyPublisher:
+    def __init__(self, fail=0, fail_calls=()):
+        self.fail = fail
+        self.fail_calls = set(fail_calls)
+        self.calls = 0
+        self.delivered = []
+        self.lock = threading.Lock()
+
+    def publish(self, topic_path, data, **attributes):
+        f = Future()
+        with self.lock:
+            self.calls += 1
+            if self.calls <= self.fail or self.calls in self.fail_calls:
+                f.set_exception(RuntimeError(f"publish failed ({self.calls})"))
+            else:
+                self.delivered.append(data)
+                f.set_result(str(self.calls))
+        return f
+
+    def stop(self):
+        pass
+
+
+def _wait(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _drained(publisher, fake, n):
+    stats = publisher.stats()
+    return len(set(fake.delivered)) == n and not stats["spooling"] and stats["spool_bytes"] == 0
+
+
+# 재전송 중복(같은 레코드가 한 번 더)은 허용, 처음 도착 순서는 발행 순서와 같아야 함
+def _first_arrivals(delivered):
+    return list(dict.fromkeys(delivered))
+
+
+def test_replay_delivers_everything_in_order(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "SPOOL_RETRY_INTERVAL", 0.05)
+    fake = FlakyPublisher(fail=5)
+    publisher = SpooledPublisher(fake, str(tmp_path), "t", max_queue=1000, max_inflight=8)
+    expected = [f"a{i}".encode() for i in range(200)]
+    try:
+        for data in expected:
+            publisher.publish("t", data, streamer_id="s")
+        assert _wait(lambda: _drained(publisher, fake, len(expected)))
+        assert _first_arrivals(fake.delivered) == expected
+        assert publisher.stats()["spool_bytes"] == 0
+    finally:
+        publisher.stop()
+
+
+def test_new_messages_wait_behind_spool(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "SPOOL_RETRY_INTERVAL", 0.2)
+    fake = FlakyPublisher(fail=1)
+    publisher = SpooledPublisher(fake, str(tmp_path), "t", max_queue=1000, max_inflight=8)
+    try:
+        publisher.publish("t", b"a0", streamer_id="s")
+        assert _wait(lambda: publisher.stats()["spooling"])
+        # 스풀이 비기 전 새 메시지는 실시간으로 보내지 않고 스풀 뒤에
+        publisher.publish("t", b"a1", streamer_id="s")
+        publisher.publish("t", b"a2", streamer_id="s")
+        assert _wait(lambda: _drained(publisher, fake, 3))
+        assert _first_arrivals(fake.delivered) == [b"a0", b"a1", b"a2"]
+    finally:
+        publisher.stop()
+
+
+# 스풀 기록이 느린 동안 재전송 스레드가 caught_up() 을 보고 스풀 모드를 끝내면 안 됨
+def test_slow_spill_is_not_stranded(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "SPOOL_RETRY_INTERVAL", 0.01)
+    fake = FlakyPublisher(fail_calls={2})
+    publisher = SpooledPublisher(fake, str(tmp_path), "t", max_queue=1000, max_inflight=8)
+    append = publisher.spool.append
+
+    def slow_append(data, attributes):
+        time.sleep(0.3)
+        append(data, attributes)
+
+    monkeypatch.setattr(publisher.spool, "append", slow_append)
+    expected = [b"a0", b"a1", b"a2", b"a3"]
+    try:
+        for data in expected:
+            publisher.publish("t", data, streamer_id="s")
+        assert _wait(lambda: _drained(publisher, fake, len(expected)))
+        assert _first_arrivals(fake.delivered) == expected
+        stats = publisher.stats()
+        assert stats["spool_bytes"] == 0 and not stats["spooling"]
+    finally:
+        publisher.stop()
+
+
+# 재전송도 실시간 발행과 같은 동시 발행 상한을 지킴
+def test_replay_respects_inflight_limit(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "SPOOL_RETRY_INTERVAL", 0.05)
+
+    class SlowPublisher(FlakyPublisher):
+        def __init__(self):
+            super().__init__(fail=1)
+            self.inflight = 0
+            self.peak = 0
+
+        def publish(self, topic_path, data, **attributes):
+            f = super().publish(topic_path, data, **attributes)
+            if f.exception() is not None:
+                return f
+            slow = Future()
+            with self.lock:
+                self.inflight += 1
+                self.peak = max(self.peak, self.inflight)
+
+            def done():
+                with self.lock:
+                    self.inflight -= 1
+                slow.set_result(f.result())
+
+            threading.Timer(0.01, done).start()
+            return slow
+
+    fake = SlowPublisher()
+    publisher = SpooledPublisher(fake, str(tmp_path), "t", max_queue=1000, max_inflight=4)
+    try:
+        for i in range(100):
+            publisher.publish("t", f"a{i}".encode(), streamer_id="s")
+        assert _wait(lambda: _drained(publisher, fake, 100))
+        assert fake.peak <= 4
+    finally:
+        publisher.stop()
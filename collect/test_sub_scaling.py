@@ -0,0 +1,61 @@
+import time
+import threading
+
+import codec
+import sub
+from transport import LocalTransport
+
+ROWS = 3000
+BATCH_ROWS = 100
+COMMIT_SECONDS = 0.05  # 배치 하나의 INSERT + 커밋 시간 (DB 대기 동안 GIL 을 놓는 것까지 흉내)
+
+
+# 저장 대신 배치마다 고정 시간 대기 후 ack (DB 한도에 닿기 전의 저장 스레드/연결)
+class SleepWriter(sub.BatchWriter):
+    def __init__(self, *args, **kwargs):
+        self.stored = 0
+        self.done = threading.Event()
+        self._count_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _write(self, batch):
+        time.sleep(COMMIT_SECONDS)
+        for _, message in batch:
+            message.ack()
+        with self._count_lock:
+            self.stored += len(batch)
+            if self.stored >= ROWS:
+                self.done.set()
+
+
+# 저장 스레드 writers 개로 미리 쌓아 둔 ROWS 건을 저장하는 처리량 (rows/s)
+def _throughput(monkeypatch, writers):
+    transport = LocalTransport(maxsize=ROWS * 2)
+    for i in range(ROWS):
+        data, _ = codec.encode_payload(
+            {"streamer_id": "s", "uid": f"u{i % 50}", "msg": f"m{i}", "msgTime_ms": 1_700_000_000_000 + i},
+            codec.FORMAT_JSON,
+        )
+        transport.publish("t", data, streamer_id="s")
+
+    writer = SleepWriter(None, BATCH_ROWS, 0.01, sub.logger, writers=writers, max_pending=ROWS)
+    monkeypatch.setattr(sub, "writer", writer)
+    monkeypatch.setattr(sub, "draining", threading.Event())
+
+    started = time.perf_counter()
+    handle = transport.subscribe(sub.callback, workers=2)
+    try:
+        assert writer.done.wait(30)
+        elapsed = time.perf_counter() - started
+    finally:
+        handle.cancel()
+        handle.result()
+        writer.close()
+    return ROWS / elapsed
+
+
+# 저장기는 DB 대기가 병목일 때 저장 스레드(연결) 수에 비례해 빨라져야 함
+def test_throughput_scales_with_writers(monkeypatch):
+    one = _throughput(monkeypatch, 1)
+    two = _throughput(monkeypatch, 2)
+    assert two >= 1.6 * one, f"1 writer {one:,.0f} rows/s, 2 writers {two:,.0f} rows/s"
@@ -0,0 +1,75 @@
+import threading
+
+import sub
+from transport import Message, StreamHandle
+
+
+# 가짜 전송 계층: ack/nack/cancel/close 순서를 기록 (Pub/Sub 처럼 스트림을 닫은 뒤의 ack 는 버려짐)
+class FakeStream(StreamHandle):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def cancel(self):
+        self.events.append("cancel")
+        super().cancel()
+
+
+class FakeTransport:
+    def __init__(self):
+        self.events = []
+        self.stream = None
+        self.delivered = []
+
+    def subscribe(self, callback, **options):
+        self.stream = FakeStream(self.events)
+        return self.stream
+
+    def deliver(self, message_id):
+        message = Message(message_id, b"{}", {}, None, self._ack, self._nack)
+        sub.callback(message)
+
+    def _ack(self, message):
+        dropped = self.stream.cancelled() or "close" in self.events
+        self.events.append(("ack-dropped" if dropped else "ack", message.message_id))
+
+    def _nack(self, message):
+        self.events.append(("nack", message.message_id))
+
+    def close(self):
+        self.events.append("close")
+
+
+# 커밋 대신 바로 ack
+class AckWriter(sub.BatchWriter):
+    def _write(self, batch):
+        for _, message in batch:
+            message.ack()
+
+
+def test_shutdown_acks_before_stream_close(monkeypatch):
+    transport = FakeTransport()
+    writer = AckWriter(None, max_rows=1000, max_latency=60.0, logger=sub.logger, writers=1)
+    monkeypatch.setattr(sub, "draining", threading.Event())
+    monkeypatch.setattr(sub, "parse_message", lambda m: {"streamer_id": "s", "message_id": m.message_id})
+    monkeypatch.setattr(sub, "transport", transport)
+    monkeypatch.setattr(sub, "writer", writer)
+    monkeypatch.setattr(sub, "pool", None)
+    monkeypatch.setattr(sub, "maintainer", None)
+    monkeypatch.setattr(sub, "streaming_pull_future", transport.subscribe(sub.callback))
+
+    for i in range(5):
+        transport.deliver(str(i))
+    assert transport.events == []
+
+    sub.stop_pulling()
+    transport.deliver("late")
+    sub.shutdown()
+
+    events = transport.events
+    acks = [e for e in events if e[0] in ("ack", "ack-dropped")]
+    assert acks == [("ack", str(i)) for i in range(5)]
+    assert ("nack", "late") in events
+    assert events.index("cancel") > events.index(("ack", "4"))
+    assert events[-1] == "close"
+    assert transport.stream.paused()
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import Future
+
+from config.settings import *
+
+logger = logging.getLogger("chzzk-transport")
+
+
+# 구독 스트림 핸들 (Pub/Sub StreamingPullFuture 와 같은 result/cancel 인터페이스, pause 는 수신만 멈추고 ack 는 계속)
+class StreamHandle:
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._paused = threading.Event()
+        self._threads = []
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self._cancelled.is_set()
+
+    def pause(self):
+        self._paused.set()
+
+    def paused(self):
+        return self._paused.is_set()
+
+    def result(self, timeout=None):
+        self._cancelled.wait(timeout)
+        for t in self._threads:
+            t.join()
+
+
+# 전송 계층 인터페이스
+class Transport:
+    # 발행 → Future (result() 는 메시지 ID)
+    def publish(self, topic_path, data: bytes, **attributes) -> Future:
+        raise NotImplementedError
+
+    # 구독 시작 → cancel()/result() 를 갖는 스트림 핸들 (subscription: Pub/Sub 구독 경로 / Redis 컨슈머 그룹, 없으면 저장기 기본값)
+    def subscribe(self, callback, **options):
+        raise NotImplementedError
+
+    # 발행 중인 메시지 전송 후 정리
+    def stop(self):
+        pass
+
+    def close(self):
+        self.stop()
+
+
+# Google Cloud Pub/Sub (기존 동작)
+class PubSubTransport(Transport):
+    def __init__(self):
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_APPLICATION_CREDENTIALS
+        from google.cloud import pubsub_v1
+        from google.cloud.pubsub_v1.types import BatchSettings, PublisherOptions
+
+        self._pubsub_v1 = pubsub_v1
+        self._batch_settings = BatchSettings(
+            max_bytes=1_000_000,
+            max_messages=1000,
+            max_latency=0.05
+        )
+        self._publisher_options = PublisherOptions(enable_message_ordering=False)
+        self._publisher = None
+        self._subscriber = None
+
+    def publish(self, topic_path, data: bytes, **attributes):
+        if self._publisher is None:
+            self._publisher = self._pubsub_v1.PublisherClient(
+                batch_settings=self._batch_settings,
+                publisher_options=self._publisher_options
+            )
+        return self._publisher.publish(topic_path, data, **attributes)
+
+    # 흐름 제어: 미확인(ack 전) 메시지가 상한에 닿으면 수신 중단, 종료 시 실행 중인 콜백 완료 대기
+    def subscribe(self, callback, max_messages=SUB_FLOW_MAX_MESSAGES, max_bytes=SUB_FLOW_MAX_BYTES,
+                  threads=SUB_CALLBACK_THREADS, subscription=None, **options):
+        from concurrent.futures import ThreadPoolExecutor
+        from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+
+        options.setdefault("flow_control", self._pubsub_v1.types.FlowControl(max_messages=max_messages, max_bytes=max_bytes))
+        options.setdefault("scheduler", ThreadScheduler(ThreadPoolExecutor(threads, thread_name_prefix="chatzzk-sub-cb")))
+        options.setdefault("await_callbacks_on_shutdown", True)
+        self._subscriber = self._pubsub_v1.SubscriberClient()
+        return self._subscriber.subscribe(subscription or SUBSCRIPTION_PATH, callback=callback, **options)
+
+    def stop(self):
+        if self._publisher is not None:
+            self._publisher.stop()
+
+    def close(self):
+        self.stop()
+        if self._subscriber is not None:
+            self._subscriber.close()
+
+
+# 구독 콜백에 전달되는 메시지 (Pub/Sub Message 와 같은 필드/메서드)
+class Message:
+    __slots__ = ("message_id", "data", "attributes", "publish_time", "_ack", "_nack")
+
+    def __init__(self, message_id, data, attributes, publish_time, ack, nack):
+        self.message_id = message_id
+        self.data = data
+        self.attributes = attributes
+        self.publish_time = publish_time
+        self._ack = ack
+        self._nack = nack
+
+    def ack(self):
+        self._ack(self)
+
+    def nack(self):
+        self._nack(self)
+
+
+def _done_future(result=None, error=None):
+    f = Future()
+    if error is not None:
+        f.set_exception(error)
+    else:
+        f.set_result(result)
+    return f
+
+
+# Redis Streams (컨슈머 그룹)
+class RedisStreamsTransport(Transport):
+    def __init__(self, url=REDIS_URL, stream=REDIS_STREAM, group=REDIS_GROUP, consumer=REDIS_CONSUMER):
+        import redis
+
+        self._redis = redis
+        self.client = redis.Redis.from_url(url)
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+
+    def publish(self, topic_path, data: bytes, **attributes):
+        try:
+            entry_id = self.client.xadd(
+                self.stream,
+                {"data": data, "attributes": json.dumps(attributes, ensure_ascii=False)},
+                maxlen=REDIS_STREAM_MAXLEN,
+                approximate=True,
+            )
+            return _done_future(entry_id.decode())
+        except Exception as e:
+            return _done_future(error=e)
+
+    def _nack(self, message):
+        # 대기(pending) 상태로 남겨 두면 REDIS_CLAIM_IDLE_MS 이후 재전달
+        pass
+
+    def _to_message(self, entry_id, fields, ack):
+        entry_id = entry_id.decode()
+        ms = int(entry_id.split("-", 1)[0])
+        return Message(
+            entry_id,
+            fields[b"data"],
+            json.loads(fields.get(b"attributes", b"{}")),
+            datetime.fromtimestamp(ms / 1000, tz=timezone.utc),
+            ack,
+            self._nack,
+        )
+
+    def subscribe(self, callback, max_messages=REDIS_READ_COUNT, subscription=None, **options):
+        # 다른 컨슈머 그룹이면 같은 스트림을 따로 받음 (새 그룹은 지금부터, ack 도 그 그룹에)
+        # 그룹은 구독마다 따로 (한 transport 에 저장기/버스트 감지 구독이 함께 있어도 섞이지 않음)
+        group, start = (subscription, "$") if subscription else (self.group, "0")
+        try:
+            self.client.xgroup_create(self.stream, group, id=start, mkstream=True)
+        except self._redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        def _ack(message):
+            self.client.xack(self.stream, group, message.message_id)
+
+        handle = StreamHandle()
+
+        def _loop():
+            last_claim = 0.0
+            while not handle.cancelled():
+                if handle.paused():
+                    handle._cancelled.wait(0.1)
+                    continue
+                try:
+                    entries = []
+                    if time.monotonic() - last_claim >= REDIS_CLAIM_IDLE_MS / 1000:
+                        _, claimed, *_ = self.client.xautoclaim(
+                            self.stream, group, self.consumer,
+                            min_idle_time=REDIS_CLAIM_IDLE_MS, start_id="0-0", count=max_messages,
+                        )
+                        entries.extend(claimed)
+                        last_claim = time.monotonic()
+
+                    resp = self.client.xreadgroup(
+                        group, self.consumer, {self.stream: ">"}, count=max_messages, block=1000,
+                    )
+                    for _, items in resp or []:
+                        entries.extend(items)
+
+                    for entry_id, fields in entries:
+                        if fields:
+                            callback(self._to_message(entry_id, fields, _ack))
+                except Exception as e:
+                    logger.exception("redis stream read error: %s", e)
+                    handle._cancelled.wait(1.0)
+
+        t = threading.Thread(target=_loop, name="chzzk-redis-sub", daemon=True)
+        handle._threads.append(t)
+        t.start()
+        return handle
+
+    def close(self):
+        self.client.close()
+
+
+# 단일 프로세스용 메모리 큐 (수집기와 저장기를 한 프로세스에서 실행)
+class LocalTransport(Transport):
+    def __init__(self, maxsize=LOCAL_QUEUE_MAX):
+        self.queue = queue.Queue(maxsize=maxsize)
+        # 큐가 가득 찰 때 nack 된 메시지 (구독 스레드가 큐보다 먼저 꺼냄, 이미 받은 메시지라 저장기 버퍼 크기를 넘지 않음)
+        self._retry = deque()
+        self._ids = itertools.count(1)
+
+    def publish(self, topic_path, data: bytes, **attributes):
+        message_id = str(next(self._ids))
+        self.queue.put((message_id, data, attributes, datetime.now(tz=timezone.utc)))
+        return _done_future(message_id)
+
+    def _ack(self, message):
+        pass
+
+    # 구독 스레드에서 호출되므로 막히지 않게 (가득 찬 큐에 put 하면 꺼낼 스레드가 없어 멈춤)
+    def _nack(self, message):
+        item = (message.message_id, message.data, message.attributes, message.publish_time)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self._retry.append(item)
+
+    def subscribe(self, callback, workers=LOCAL_WORKERS, **options):
+        handle = StreamHandle()
+
+        def _loop():
+            while not handle.cancelled():
+                if handle.paused():
+                    handle._cancelled.wait(0.1)
+                    continue
+                try:
+                    message_id, data, attributes, publish_time = self._retry.popleft()
+                except IndexError:
+                    try:
+                        message_id, data, attributes, publish_time = self.queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                callback(Message(message_id, data, attributes, publish_time, self._ack, self._nack))
+
+        for i in range(workers):
+            t = threading.Thread(target=_loop, name=f"chzzk-local-sub-{i}", daemon=True)
+            handle._threads.append(t)
+            t.start()
+        return handle
+
+
+_TRANSPORTS = {
+    "pubsub": PubSubTransport,
+    "redis": RedisStreamsTransport,
+    "local": LocalTransport,
+}
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+# 설정(TRANSPORT)에 따른 전송 계층 (프로세스당 하나 공유)
+def get_transport(name=None):
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = _TRANSPORTS[name or TRANSPORT]()
+        return _instance
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import psycopg2
+
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-archive")
+
+TZ = ZoneInfo(ARCHIVE_TZ)
+MANIFEST_PATH = os.path.join(ARCHIVE_DIR, "manifest.json")
+
+# streamer_id, chat_date 는 디렉터리 이름(hive 파티션)에 들어감
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("message_id", pa.string()),
+    ("user_id", pa.string()),
+    ("msg", pa.string()),
+    ("ts", pa.timestamp("us", tz="UTC")),
+    ("raw", pa.string()),
+])
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 1, "days": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# 하루 (ARCHIVE_TZ 기준) → UTC 구간
+def day_range(day):
+    start = datetime(day.year, day.month, day.day, tzinfo=TZ)
+    return start.astimezone(timezone.utc), (start + timedelta(days=1)).astimezone(timezone.utc)
+
+
+# 끝난 지 ARCHIVE_GRACE 초가 지난 날짜만 아카이브
+def closed_days(first, now=None, grace=ARCHIVE_GRACE):
+    now = now or datetime.now(tz=timezone.utc)
+    day = first
+    while day_range(day)[1] + timedelta(seconds=grace) <= now:
+        yield day
+        day += timedelta(days=1)
+
+
+def _flush(writer, buf):
+    writer.write_table(pa.Table.from_pydict(dict(zip(SCHEMA.names, zip(*buf))), schema=SCHEMA))
+    buf.clear()
+
+
+# (streamer_id, id, message_id, user_id, msg, ts, raw) 행 → 스트리머별 Parquet 파일 (streamer_id 순으로 정렬된 입력)
+def write_day(rows, day_dir, row_group=ARCHIVE_ROW_GROUP, compression=ARCHIVE_COMPRESSION):
+    files, total = {}, 0
+    writer, current, buf = None, None, []
+    try:
+        for streamer_id, *rest in rows:
+            if streamer_id != current:
+                if writer is not None:
+                    if buf:
+                        _flush(writer, buf)
+                    writer.close()
+                current = streamer_id
+                part_dir = os.path.join(day_dir, f"streamer_id={streamer_id}")
+                os.makedirs(part_dir, exist_ok=True)
+                path = os.path.join(part_dir, "part-0.parquet")
+                writer = pq.ParquetWriter(path, SCHEMA, compression=compression)
+                files[streamer_id] = {"path": os.path.relpath(path, day_dir), "rows": 0}
+            buf.append(rest)
+            files[streamer_id]["rows"] += 1
+            total += 1
+            if len(buf) >= row_group:
+                _flush(writer, buf)
+        if writer is not None and buf:
+            _flush(writer, buf)
+    finally:
+        if writer is not None:
+            writer.close()
+    return files, total
+
+
+# 하루치 chat_logs 를 서버 측 커서로 스트리밍해 임시 디렉터리에 쓰고 교체
+def archive_day(conn, day, manifest):
+    start, end = day_range(day)
+    final_dir = os.path.join(ARCHIVE_DIR, f"chat_date={day.isoformat()}")
+    tmp_dir = os.path.join(ARCHIVE_DIR, f"_tmp-chat_date={day.isoformat()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    started = time.monotonic()
+    with conn.cursor(name=f"archive_{day:%Y%m%d}") as cur:
+        cur.itersize = ARCHIVE_FETCH_SIZE
+        cur.execute(SELECT_ARCHIVE_DAY_SQL, (start, end))
+        files, total = write_day(cur, tmp_dir)
+    conn.commit()
+
+    for entry in files.values():
+        entry["path"] = os.path.join(os.path.basename(final_dir), entry["path"])
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+
+    manifest["days"][day.isoformat()] = {
+        "rows": total,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "files": files,
+        "archived_at": datetime.now(tz=timezone.utc).isoformat(),
+    }
+    save_manifest(manifest)
+    logger.info("아카이브 %s | %d rows, 스트리머 %d (%.1fs)", day, total, len(files), time.monotonic() - started)
+    return total
+
+
+# 아직 아카이브하지 않은 닫힌 날짜 전체 (manifest 기준으로 재개)
+def run(conn, since=None):
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    manifest = load_manifest()
+    if since is None and manifest["days"]:
+        since = date.fromisoformat(max(manifest["days"])) + timedelta(days=1)
+    if since is None:
+        with conn.cursor() as cur:
+            cur.execute(SELECT_ARCHIVE_RANGE_SQL)
+            first = cur.fetchone()[0]
+        conn.commit()
+        if first is None:
+            return 0
+        since = first.astimezone(TZ).date()
+
+    total = 0
+    for day in closed_days(since):
+        if day.isoformat() not in manifest["days"]:
+            total += archive_day(conn, day, manifest)
+    return total
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="chat_logs → Parquet 아카이브 (날짜/스트리머별)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="이 날짜부터 (YYYY-MM-DD)")
+    parser.add_argument("--redo", type=date.fromisoformat, default=None, help="지정한 날짜만 다시 아카이브")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        if args.redo:
+            os.makedirs(ARCHIVE_DIR, exist_ok=True)
+            archive_day(conn, args.redo, load_manifest())
+        else:
+            run(conn, args.since)
+    finally:
+        conn.close()
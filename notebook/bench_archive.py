@@ -0,0 +1,93 @@
+import time
+import argparse
+from datetime import date, timedelta
+
+import pandas as pd
+import psycopg2
+
+import lake
+import archive
+from config.settings import *
+
+COLUMNS = ["id", "streamer_id", "user_id", "msg", "ts"]
+
+KEYSET_SQL = """
+SELECT c.id, s.streamer_id, u.nickname, c.msg, c.ts
+FROM chat_logs c
+JOIN streamers s USING (streamer_key)
+LEFT JOIN chat_users u USING (user_key)
+WHERE c.id > %s AND c.ts >= %s AND c.ts < %s
+ORDER BY c.id LIMIT %s;
+"""
+
+AGG_PG_SQL = """
+SELECT s.streamer_id, count(*), count(DISTINCT u.nickname)
+FROM chat_logs c
+JOIN streamers s USING (streamer_key)
+LEFT JOIN chat_users u USING (user_key)
+WHERE c.ts >= %s AND c.ts < %s GROUP BY 1;
+"""
+
+AGG_LAKE_SQL = """
+SELECT streamer_id, count(*), count(DISTINCT user_id) FROM chat_logs
+WHERE chat_date BETWEEN ? AND ? GROUP BY 1;
+"""
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+# eda.ipynb 방식 (id 키셋 페이지네이션 10k 행씩 → DataFrame 합치기)
+def keyset_scan(conn, start, end, batch=10_000):
+    lo_ts, _ = archive.day_range(start)
+    _, hi_ts = archive.day_range(end)
+    last_id, dfs = 0, []
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(KEYSET_SQL, (last_id, lo_ts, hi_ts, batch))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            dfs.append(pd.DataFrame(rows, columns=COLUMNS))
+            last_id = rows[-1][0]
+    conn.commit()
+    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame(columns=COLUMNS)
+
+
+def pg_aggregate(conn, start, end):
+    lo_ts, _ = archive.day_range(start)
+    _, hi_ts = archive.day_range(end)
+    with conn.cursor() as cur:
+        cur.execute(AGG_PG_SQL, (lo_ts, hi_ts))
+        rows = cur.fetchall()
+    conn.commit()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chat_logs 직접 조회 vs Parquet 아카이브 조회")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today() - timedelta(days=8))
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=2))
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        results = [
+            ("전체 행 로드 | Postgres 키셋", *_timed(lambda: len(keyset_scan(conn, args.start, args.end)))),
+            ("전체 행 로드 | pyarrow", *_timed(lambda: len(lake.to_pandas(COLUMNS, start=args.start, end=args.end)))),
+            ("스트리머별 집계 | Postgres", *_timed(lambda: len(pg_aggregate(conn, args.start, args.end)))),
+            ("스트리머별 집계 | DuckDB", *_timed(lambda: len(lake.query(AGG_LAKE_SQL, [args.start, args.end])))),
+        ]
+    finally:
+        conn.close()
+
+    print(f"{args.start} ~ {args.end}")
+    for name, sec, n in results:
+        print(f"{name:<28} {sec:>8.2f}s {n:>12,} rows")
+
+
+if __name__ == "__main__":
+    main()
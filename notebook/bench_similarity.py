@@ -0,0 +1,77 @@
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import terms
+import similarity
+
+
+# 스트리머별 단어 빈도 (Zipf 분포 어휘, 스트리머마다 다른 선호 단어)
+def make_counts(n_streamers, vocab, terms_per_streamer, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_streamers):
+        ids = np.unique((rng.zipf(1.3, size=terms_per_streamer) + i * 37) % vocab)
+        frames.append(pd.DataFrame({
+            "streamer_id": f"{i:032x}",
+            "term": ids.astype(str),
+            "tf": rng.zipf(1.5, size=len(ids)).clip(max=1_000_000),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+# eda.ipynb 방식 (dense 행렬 + t-SNE)
+def baseline(X):
+    from sklearn.manifold import TSNE
+
+    dense = X.toarray()
+    return TSNE(n_components=2, random_state=42, perplexity=min(5, dense.shape[0] - 1)).fit_transform(dense)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스트리머 유사도 계산 비교")
+    parser.add_argument("--streamers", default="100,1000,5000", help="쉼표로 구분한 스트리머 수 단계")
+    parser.add_argument("--vocab", type=int, default=200_000)
+    parser.add_argument("--terms", type=int, default=5_000, help="스트리머당 단어 표본 수")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", action="store_true", help="dense + t-SNE 도 측정 (느림)")
+    args = parser.parse_args()
+
+    print(f"{'streamers':>9} {'nnz':>10} {'tfidf s':>8} {'matrix s':>8} {'knn s':>8} {'svd s':>8} {'query ms':>9} {'dense MB':>9} {'base s':>8}")
+    for n in (int(x) for x in args.streamers.split(",")):
+        counts = make_counts(n, args.vocab, args.terms, args.seed)
+        tfidf_s, weights = _timed(lambda: terms.tfidf(counts))
+        matrix_s, (X, streamers) = _timed(lambda: similarity.build_matrix(weights))
+        knn_s, (idx, scores) = _timed(lambda: similarity.nearest_neighbors(X, args.k))
+        svd_s, _ = _timed(lambda: similarity.map_coords(X))
+        query_s, _ = _timed(lambda: similarity.neighbors_of(X, streamers, streamers[n // 2], args.k))
+
+		# 작은 단계에서 dense 코사인 유사도와 결과 비교
+        if n <= 1000:
+            dense = (X @ X.T).toarray()
+            np.fill_diagonal(dense, -np.inf)
+            expected = np.sort(dense, axis=1)[:, ::-1][:, :idx.shape[1]]
+            assert np.allclose(expected, scores, atol=1e-5)
+
+        dense_mb = X.shape[0] * X.shape[1] * 8 / 1024 / 1024
+        base = "-"
+        if args.baseline:
+            base_s, _ = _timed(lambda: baseline(X))
+            base = f"{base_s:.1f}"
+        print(
+            f"{n:>9} {X.nnz:>10,} {tfidf_s:>8.2f} {matrix_s:>8.2f} {knn_s:>8.2f} {svd_s:>8.2f} "
+            f"{query_s * 1000:>9.1f} {dense_mb:>9,.0f} {base:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# PostgreSQL
+PG_HOST = os.getenv("PGHOST", "distracted_wing")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "postgres")
+PG_USER = os.getenv("PGUSER", "postgres")
+PG_PASS = os.getenv("PGPASSWORD", "password")
+
+# 단어 빈도 증분 작업
+TERMS_BATCH_SIZE = int(os.getenv("TERMS_BATCH_SIZE", "50000"))   # 한 번에 읽는 id 구간 크기
+TERMS_SETTLE = float(os.getenv("TERMS_SETTLE", "60"))            # 상한 id 이하를 쓰는 트랜잭션이 끝나길 기다리는 최대 시간 (초, 넘으면 이번 실행은 건너뜀)
+TERMS_GAP_WINDOW = int(os.getenv("TERMS_GAP_WINDOW", "100000"))  # 진행 위치 아래 이 id 범위의 빈 id 는 매 실행 다시 확인 (늦게 커밋된 행)
+TERMS_INTERVAL = int(os.getenv("TERMS_INTERVAL", "3600"))        # --loop 실행 주기 (초)
+TERMS_MIN_COUNT = int(os.getenv("TERMS_MIN_COUNT", "2"))         # TF-IDF 계산에 쓰는 최소 빈도
+
+# 워드클라우드
+WORDCLOUD_TOP_N = int(os.getenv("WORDCLOUD_TOP_N", "100"))
+WORDCLOUD_DIR = os.getenv("WORDCLOUD_DIR", os.path.join(BASE_DIR, "wordclouds"))
+STOPWORDS_PATH = os.getenv("STOPWORDS_PATH", os.path.join(BASE_DIR, "stopwords-ko.txt"))
+FONT_PATH = os.getenv("FONT_PATH", "/usr/share/fonts/truetype/nanum/NanumGothic.ttf")
+
+# 스트리머 유사도
+SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "10"))        # 저장할 최근접 이웃 수
+SIMILARITY_BLOCK = int(os.getenv("SIMILARITY_BLOCK", "512"))       # 유사도 행렬을 나눠 계산할 행 수
+
+# Parquet 아카이브 (chat_date=YYYY-MM-DD/streamer_id=... 디렉터리, 날짜 기준 ARCHIVE_TZ)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(BASE_DIR, "archive"))
+ARCHIVE_TZ = os.getenv("ARCHIVE_TZ", "Asia/Seoul")
+ARCHIVE_GRACE = int(os.getenv("ARCHIVE_GRACE", "3600"))             # 하루가 끝난 뒤 늦게 저장되는 채팅 대기 (초)
+ARCHIVE_FETCH_SIZE = int(os.getenv("ARCHIVE_FETCH_SIZE", "50000"))   # 서버 측 커서에서 한 번에 가져오는 행 수
+ARCHIVE_ROW_GROUP = int(os.getenv("ARCHIVE_ROW_GROUP", "100000"))
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "zstd")
+
+# 로깅
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -0,0 +1,93 @@
+# 스트리머별 단어 빈도 + 작업 진행 위치
+CREATE_TERMS_SQL = """
+CREATE TABLE IF NOT EXISTS term_counts (
+  streamer_id  TEXT NOT NULL,
+  term         TEXT NOT NULL,
+  tf           BIGINT NOT NULL,
+  PRIMARY KEY (streamer_id, term)
+);
+CREATE TABLE IF NOT EXISTS job_watermarks (
+  job         TEXT PRIMARY KEY,
+  last_id     BIGINT NOT NULL,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+ALTER TABLE job_watermarks ADD COLUMN IF NOT EXISTS gaps BIGINT[] NOT NULL DEFAULT '{}';
+"""
+
+# 진행 위치 + 그 아래에서 비어 있던 id (늦게 커밋될 수 있어 다음 실행에서 다시 확인)
+SELECT_WATERMARK_SQL = "SELECT last_id, gaps FROM job_watermarks WHERE job = %s;"
+
+UPSERT_WATERMARK_SQL = """
+INSERT INTO job_watermarks (job, last_id, gaps) VALUES (%s, %s, %s)
+ON CONFLICT (job) DO UPDATE SET last_id = EXCLUDED.last_id, gaps = EXCLUDED.gaps, updated_at = now();
+"""
+
+# 현재까지 발급된 최대 id (시퀀스 기준) + 그 시점에 진행 중인 쓰기 트랜잭션 (이 트랜잭션들이 끝나야 상한 이하 id 가 확정)
+SELECT_ID_HORIZON_SQL = """
+SELECT COALESCE(pg_sequence_last_value(pg_get_serial_sequence('chat_logs', 'id')::regclass), 0),
+       ARRAY(SELECT pg_snapshot_xip(pg_current_snapshot()))::text[];
+"""
+
+# 위 트랜잭션 중 아직 진행 중인 수
+SELECT_RUNNING_XACTS_SQL = """
+SELECT count(*) FROM unnest(%s::text[]) AS x WHERE pg_xact_status(x::xid8) = 'in progress';
+"""
+
+SELECT_CHATS_SQL = """
+SELECT c.id, s.streamer_id, c.msg FROM chat_logs c JOIN streamers s USING (streamer_key) WHERE c.id > %s AND c.id <= %s;
+"""
+
+SELECT_GAP_CHATS_SQL = """
+SELECT c.id, s.streamer_id, c.msg FROM chat_logs c JOIN streamers s USING (streamer_key) WHERE c.id = ANY(%s::bigint[]);
+"""
+
+UPSERT_TERM_COUNTS_SQL = """
+INSERT INTO term_counts AS t (streamer_id, term, tf) VALUES %s
+ON CONFLICT (streamer_id, term) DO UPDATE SET tf = t.tf + EXCLUDED.tf;
+"""
+
+SELECT_TERM_COUNTS_SQL = """
+SELECT streamer_id, term, tf FROM term_counts WHERE tf >= %s;
+"""
+
+# 스트리머 유사도 (코사인 최근접 이웃 + 2차원 지도 좌표, 매 갱신마다 교체)
+CREATE_SIMILARITY_SQL = """
+CREATE TABLE IF NOT EXISTS streamer_neighbors (
+  streamer_id  TEXT NOT NULL,
+  rank         INT NOT NULL,
+  neighbor_id  TEXT NOT NULL,
+  similarity   DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (streamer_id, rank)
+);
+CREATE TABLE IF NOT EXISTS streamer_coords (
+  streamer_id  TEXT PRIMARY KEY,
+  x            DOUBLE PRECISION NOT NULL,
+  y            DOUBLE PRECISION NOT NULL,
+  updated_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+REPLACE_NEIGHBORS_SQL = "TRUNCATE streamer_neighbors;"
+INSERT_NEIGHBORS_SQL = "INSERT INTO streamer_neighbors (streamer_id, rank, neighbor_id, similarity) VALUES %s;"
+
+REPLACE_COORDS_SQL = "TRUNCATE streamer_coords;"
+INSERT_COORDS_SQL = "INSERT INTO streamer_coords (streamer_id, x, y) VALUES %s;"
+
+# 아카이브 대상 (하루 구간, 스트리머별로 연속되도록 정렬, 보존 기간이 지난 raw 는 collect 의 chat_raw 에서)
+SELECT_ARCHIVE_RANGE_SQL = """
+SELECT min(ts) FROM chat_logs;
+"""
+
+SELECT_ARCHIVE_DAY_SQL = """
+SELECT s.streamer_id, c.id, c.message_id, u.nickname AS user_id, c.msg, c.ts,
+       COALESCE(c.raw, (
+         SELECT r.raws -> c.id::text FROM chat_raw r
+         WHERE r.first_id <= c.id AND r.last_id >= c.id
+         ORDER BY r.first_id DESC LIMIT 1
+       ))::text
+FROM chat_logs c
+JOIN streamers s USING (streamer_key)
+LEFT JOIN chat_users u USING (user_key)
+WHERE c.ts >= %s AND c.ts < %s
+ORDER BY s.streamer_id, c.id;
+"""
@@ -0,0 +1,61 @@
+import os
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from config.settings import *
+
+# 아카이브 Parquet 조회 (chat_date/streamer_id 파티션 가지치기 + 파일 통계 기반 필터)
+PARTITIONING = ds.partitioning(pa.schema([("chat_date", pa.date32()), ("streamer_id", pa.string())]), flavor="hive")
+
+
+def dataset(archive_dir=ARCHIVE_DIR):
+    return ds.dataset(archive_dir, format="parquet", partitioning=PARTITIONING, ignore_prefixes=[".", "_", "manifest"])
+
+
+def _filter(streamer_id=None, start=None, end=None):
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if streamer_id is not None:
+        ids = [streamer_id] if isinstance(streamer_id, str) else list(streamer_id)
+        expr = _and(ds.field("streamer_id").isin(ids))
+    if start is not None:
+        expr = _and(ds.field("chat_date") >= _day(start))
+    if end is not None:
+        expr = _and(ds.field("chat_date") <= _day(end))
+    return expr
+
+
+def _day(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+# pyarrow 로 필요한 컬럼/파티션만 읽기 (start, end 는 날짜, 양끝 포함)
+def scan(columns=None, streamer_id=None, start=None, end=None, archive_dir=ARCHIVE_DIR):
+    return dataset(archive_dir).to_table(columns=columns, filter=_filter(streamer_id, start, end))
+
+
+def to_pandas(columns=None, streamer_id=None, start=None, end=None):
+    return scan(columns, streamer_id, start, end).to_pandas()
+
+
+# DuckDB SQL (chat_logs 뷰 = 아카이브 전체, WHERE 조건은 파티션/통계로 내려감)
+def connect(archive_dir=ARCHIVE_DIR):
+    import duckdb
+
+    con = duckdb.connect()
+    glob = os.path.join(archive_dir, "chat_date=*", "streamer_id=*", "*.parquet")
+    con.execute(f"CREATE VIEW chat_logs AS SELECT * FROM read_parquet('{glob}', hive_partitioning = true, hive_types = {{'chat_date': DATE, 'streamer_id': VARCHAR}});")
+    return con
+
+
+def query(sql, params=None, archive_dir=ARCHIVE_DIR):
+    con = connect(archive_dir)
+    try:
+        return con.execute(sql, params or []).df()
+    finally:
+        con.close()
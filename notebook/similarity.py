@@ -0,0 +1,118 @@
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-similarity")
+
+
+# TF-IDF (streamer_id, term, weight) → 희소 행렬 (행 L2 정규화 상태라 내적 = 코사인 유사도)
+def build_matrix(weights):
+    rows, streamers = pd.factorize(weights["streamer_id"], sort=True)
+    cols, _ = pd.factorize(weights["term"])
+    X = sparse.csr_matrix(
+        (weights["weight"].to_numpy(dtype=np.float32), (rows, cols)),
+        shape=(len(streamers), cols.max() + 1 if len(cols) else 0),
+    )
+    return X, list(streamers)
+
+
+def _top_k(sims, k):
+    k = min(k, sims.shape[1])
+    idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    part = np.take_along_axis(sims, idx, axis=1)
+    order = np.argsort(-part, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+# 전체 스트리머 최근접 이웃 (행 블록 단위 희소 곱, 메모리 block × n)
+def nearest_neighbors(X, k=SIMILARITY_TOP_K, block=SIMILARITY_BLOCK):
+    n = X.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=int), np.empty((n, 0))
+    XT = X.T.tocsc()
+    indices, scores = [], []
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        sims = (X[lo:hi] @ XT).toarray()
+        sims[np.arange(hi - lo), np.arange(lo, hi)] = -np.inf
+        idx, sc = _top_k(sims, k)
+        indices.append(idx)
+        scores.append(sc)
+    return np.vstack(indices), np.vstack(scores)
+
+
+# 한 스트리머의 최근접 이웃 (저장 없이 바로 조회)
+def neighbors_of(X, streamers, streamer_id, k=SIMILARITY_TOP_K):
+    i = streamers.index(streamer_id)
+    sims = (X[i] @ X.T).toarray()
+    sims[0, i] = -np.inf
+    idx, sc = _top_k(sims, min(k, len(streamers) - 1))
+    return [(streamers[j], float(s)) for j, s in zip(idx[0], sc[0])]
+
+
+# 2차원 지도 좌표 (희소 절단 SVD, 모든 문서가 공유하는 첫 성분은 제외)
+def map_coords(X):
+    n, m = X.shape
+    if n < 4 or m < 4:
+        return np.zeros((n, 2))
+    u, s, _ = svds(X.astype(np.float64), k=3, random_state=0)
+    order = np.argsort(-s)
+    coords = u[:, order[1:3]] * s[order[1:3]]
+    return coords
+
+
+def update(conn, weights, k=SIMILARITY_TOP_K):
+    started = time.monotonic()
+    X, streamers = build_matrix(weights)
+    idx, scores = nearest_neighbors(X, k)
+    coords = map_coords(X)
+
+    neighbors = [
+        (streamers[i], rank + 1, streamers[j], float(s))
+        for i in range(len(streamers))
+        for rank, (j, s) in enumerate(zip(idx[i], scores[i]))
+    ]
+    points = [(streamers[i], float(x), float(y)) for i, (x, y) in enumerate(coords)]
+
+    with conn.cursor() as cur:
+        cur.execute(CREATE_SIMILARITY_SQL)
+        cur.execute(REPLACE_NEIGHBORS_SQL)
+        execute_values(cur, INSERT_NEIGHBORS_SQL, neighbors, page_size=10_000)
+        cur.execute(REPLACE_COORDS_SQL)
+        execute_values(cur, INSERT_COORDS_SQL, points, page_size=10_000)
+    conn.commit()
+    logger.info("유사도 갱신 | 스트리머 %d, 단어 %d (%.1fs)", X.shape[0], X.shape[1], time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    import terms
+
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="스트리머 채팅 유사도 (term_counts 기반)")
+    parser.add_argument("streamer_id", nargs="?", help="지정 시 최근접 이웃만 출력")
+    parser.add_argument("-k", type=int, default=SIMILARITY_TOP_K)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        weights = terms.load_tfidf(conn)
+        if args.streamer_id:
+            X, streamers = build_matrix(weights)
+            for neighbor_id, score in neighbors_of(X, streamers, args.streamer_id, args.k):
+                print(f"{neighbor_id}\t{score:.4f}")
+        else:
+            update(conn, weights, args.k)
+    finally:
+        conn.close()
@@ -0,0 +1,169 @@
+import os
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+
+import similarity
+from config.settings import *
+from config.sql import *
+
+logger = logging.getLogger("chatzzk-terms")
+
+JOB = "term_counts"
+
+# 불용어 (작업 시작 시 1회 로드)
+with open(STOPWORDS_PATH, "r", encoding="utf-8") as f:
+    STOPWORDS = frozenset(w.strip() for w in f if w.strip())
+
+# 한글 2글자 이상 (eda.ipynb 의 simple_tokenizer + TfidfVectorizer 기본 토큰 패턴과 동일)
+TOKEN_RE = r"[가-힣]{2,}"
+
+
+# 채팅 → (streamer_id, term)별 빈도 (벡터화 토큰화)
+def count_terms(df):
+    tokens = df["msg"].fillna("").str.findall(TOKEN_RE)
+    exploded = pd.DataFrame({"streamer_id": df["streamer_id"], "term": tokens}).explode("term").dropna()
+    exploded = exploded[~exploded["term"].isin(STOPWORDS)]
+    return exploded.groupby(["streamer_id", "term"], sort=True).size()
+
+
+# 상한을 읽을 때 진행 중이던 트랜잭션이 모두 끝날 때까지 대기 (시간 초과 시 False)
+def _wait_settled(conn, xids, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(SELECT_RUNNING_XACTS_SQL, (xids,))
+            running = cur.fetchone()[0]
+        conn.commit()
+        if not running:
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning("상한 id 이하 트랜잭션 %d개가 %.0f초 안에 끝나지 않아 이번 갱신을 건너뜁니다", running, timeout)
+            return False
+        time.sleep(0.5)
+
+
+# 읽은 채팅 (id, streamer_id, msg) 의 단어 빈도 반영, 읽은 id 배열
+def _apply(cur, fetched):
+    chats = pd.DataFrame(fetched, columns=["id", "streamer_id", "msg"])
+    if not chats.empty:
+        counts = count_terms(chats)
+        values = [(s, t, int(n)) for (s, t), n in counts.items()]
+        if values:
+            execute_values(cur, UPSERT_TERM_COUNTS_SQL, values, page_size=10_000)
+    return chats["id"].to_numpy(dtype=np.int64)
+
+
+# 진행 위치 이후의 새 채팅만 id 구간 단위로 반영 (구간마다 빈도 + 진행 위치를 한 트랜잭션에 커밋)
+# 상한은 xid 로 확정하지만, id 를 받고 아직 xid 가 없던 트랜잭션(첫 행 기록 직전)은 보이지 않으므로
+# 진행 위치 아래 TERMS_GAP_WINDOW 범위의 빈 id 를 기록해 두고 매 실행 다시 확인 (한 번 반영한 id 는 다시 세지 않음)
+def update_counts(conn, batch_size=TERMS_BATCH_SIZE, settle=TERMS_SETTLE, gap_window=TERMS_GAP_WINDOW):
+    with conn.cursor() as cur:
+        cur.execute(CREATE_TERMS_SQL)
+        cur.execute(SELECT_WATERMARK_SQL, (JOB,))
+        row = cur.fetchone()
+        last_id, gaps = row if row else (0, [])
+        cur.execute(SELECT_ID_HORIZON_SQL)
+        horizon, xids = cur.fetchone()
+    conn.commit()
+
+	# 상한 이하 id 는 이미 커밋됐거나 그때 진행 중이던 트랜잭션 안에 있음 → 그 트랜잭션들이 끝나면 확정
+    if horizon > last_id and xids and not _wait_settled(conn, xids, settle):
+        return 0
+    floor = horizon - gap_window
+    started = time.monotonic()
+
+	# 이전 실행에서 비어 있던 id 중 그 뒤에 커밋된 행
+    rows = 0
+    if gaps:
+        with conn.cursor() as cur:
+            cur.execute(SELECT_GAP_CHATS_SQL, (gaps,))
+            found = _apply(cur, cur.fetchall())
+            gaps = [int(g) for g in np.setdiff1d(np.asarray(gaps, dtype=np.int64), found) if g > floor]
+            cur.execute(UPSERT_WATERMARK_SQL, (JOB, last_id, gaps))
+        conn.commit()
+        rows += len(found)
+        if len(found):
+            logger.info("늦게 커밋된 채팅 %d건 반영 (남은 빈 id %d)", len(found), len(gaps))
+
+    while last_id < horizon:
+        hi = min(last_id + batch_size, horizon)
+        with conn.cursor() as cur:
+            cur.execute(SELECT_CHATS_SQL, (last_id, hi))
+            found = _apply(cur, cur.fetchall())
+            if hi > floor:
+                missing = np.setdiff1d(np.arange(max(last_id, floor) + 1, hi + 1, dtype=np.int64), found)
+                gaps = [g for g in gaps if g > floor] + missing.tolist()
+            cur.execute(UPSERT_WATERMARK_SQL, (JOB, hi, gaps))
+        conn.commit()
+        rows += len(found)
+        last_id = hi
+        logger.info("단어 빈도 반영 | id <= %d / %d, %d rows (%.0fs)", hi, horizon, rows, time.monotonic() - started)
+    return rows
+
+
+# 누적 빈도 → 스트리머별 TF-IDF (TfidfVectorizer 기본값: smooth idf, L2 정규화)
+def tfidf(counts):
+    n_docs = counts["streamer_id"].nunique()
+    doc_freq = counts.groupby("term")["streamer_id"].transform("size")
+    weight = counts["tf"] * (np.log((1 + n_docs) / (1 + doc_freq)) + 1)
+    norm = np.sqrt((weight ** 2).groupby(counts["streamer_id"]).transform("sum"))
+    return counts.assign(weight=weight / norm)
+
+
+def load_tfidf(conn, min_count=TERMS_MIN_COUNT):
+    with conn.cursor() as cur:
+        cur.execute(SELECT_TERM_COUNTS_SQL, (min_count,))
+        counts = pd.DataFrame(cur.fetchall(), columns=["streamer_id", "term", "tf"])
+    conn.commit()
+    return tfidf(counts) if not counts.empty else counts.assign(weight=[])
+
+
+def render_wordclouds(weights, out_dir=WORDCLOUD_DIR, top_n=WORDCLOUD_TOP_N):
+    from wordcloud import WordCloud
+
+    os.makedirs(out_dir, exist_ok=True)
+    wc = WordCloud(width=800, height=600, background_color="white", font_path=FONT_PATH)
+    for streamer_id, df in weights.groupby("streamer_id"):
+        top = df.nlargest(top_n, "weight")
+        top = top[top["weight"] > 0]
+        if top.empty:
+            continue
+        path = os.path.join(out_dir, f"{streamer_id}_wordcloud.png")
+        tmp = path + ".tmp.png"
+        wc.generate_from_frequencies(dict(zip(top["term"], top["weight"]))).to_file(tmp)
+        os.replace(tmp, path)
+
+
+def run_once(conn, force=False):
+    rows = update_counts(conn)
+    if rows or force:
+        weights = load_tfidf(conn)
+        render_wordclouds(weights)
+        similarity.update(conn, weights)
+        logger.info("워드클라우드 갱신 | 새 채팅 %d, 스트리머 %d", rows, weights["streamer_id"].nunique())
+    return rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    parser = argparse.ArgumentParser(description="스트리머별 단어 빈도 증분 갱신 + TF-IDF 워드클라우드/유사도")
+    parser.add_argument("--loop", action="store_true", help=f"TERMS_INTERVAL({TERMS_INTERVAL}s) 마다 반복")
+    parser.add_argument("--force", action="store_true", help="새 채팅이 없어도 워드클라우드 다시 생성")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        while True:
+            run_once(conn, force=args.force)
+            if not args.loop:
+                break
+            time.sleep(TERMS_INTERVAL)
+    finally:
+        conn.close()
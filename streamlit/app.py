@@ -1,10 +1,10 @@
 import os
 import altair as alt
-import pandas as pd
-import psycopg2
 import streamlit as st
 import json
+from datetime import date, timedelta
 from PIL import Image
+import db
 from config.settings import *
 
 # 기본 설정
@@ -48,15 +48,6 @@ with open("config/streamer_list.json", "r", encoding="utf-8") as f:
 
 streamer_map = {s["id"]: s["name"] for s in streamer_list}
 
-# 데이터 로딩
-@st.cache_data
-def load_view(view_name):
-    """Postgres 뷰 전체 로드"""
-    with psycopg2.connect(
-        host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS
-    ) as conn:
-        return pd.read_sql(f"SELECT * FROM {view_name};", conn)
-
 # line 차트
 def chart_line(df, x, y, title):
     return (
@@ -102,26 +93,49 @@ def chart_area_stacked(df, x, y_fields, title=""):
 def section(title, level=4):
     st.markdown(f"{'#' * level} {title}")
 
-# 뷰테이블 로딩
-chat_counts = load_view("chat_counts_per_streamer")
-unique_users = load_view("unique_users_per_streamer")
-chat_by_hour = load_view("chat_counts_by_hour")
-user_activity = load_view("user_activity_per_streamer")
-chat_length = load_view("chat_length_distribution")
+# 유사도 지도 (확대/이동, 마우스 오버 시 이름)
+def chart_similarity(df, title=""):
+    return (
+        alt.Chart(df, title=title)
+        .mark_circle(size=80, color=THEME_ACCENT)
+        .encode(
+            x=alt.X("x:Q", axis=None),
+            y=alt.Y("y:Q", axis=None),
+            tooltip=["name"],
+        )
+        .properties(height=CHART_H * 2)
+        .interactive()
+    )
+
+# 상위 N명 vs 나머지 (일별)
+def top_share_chart(df_share, n):
+    top_label = f"Top {n}"
+    df_plot = df_share.rename(columns={"top": top_label, "others": "Others"})
+    return chart_area_stacked(df_plot, "chat_date", [top_label, "Others"], f"참여 집중도 ({top_label} vs Others)")
 
 # Streamlit UI
 st.title("Chzzk 채팅 데이터 대시보드")
 st.sidebar.header("메뉴")
 mode = st.sidebar.radio("보기", ["전체 스트리머", "스트리머별"])
 
+# 조회 기간 (필터는 SQL 로 전달, 페이지에 필요한 조회만 실행)
+today = date.today()
+period = st.sidebar.date_input("기간", (today - timedelta(days=DASHBOARD_DAYS - 1), today))
+start, end = (period[0], period[-1]) if len(period) else (today, today)
+top_n = int(st.sidebar.number_input("참여 집중도 상위 N", min_value=1, max_value=1000, value=TOP_N))
+
 # 전체 스트리머 페이지
 if mode == "전체 스트리머":
+    summary = db.summary(None, start, end)
+    daily_total = db.daily_counts(None, start, end)
+    total_users = db.daily_users(None, start, end)
+
     # 상단 number 차트
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("총 채팅 수", f"{chat_counts['msg_count'].sum():,}")
-    col2.metric("총 유저 수", f"{unique_users['unique_users'].sum():,}")
-    col3.metric("최대 일별 채팅", f"{chat_counts['msg_count'].max():,}")
-    col4.metric("평균 채팅 길이", f"{chat_length['msg_length'].mean():.1f}")
+    col1.metric("총 채팅 수", f"{int(summary['msg_count']):,}")
+    col2.metric("총 유저 수", f"{db.total_users(None, start, end):,}")
+    col3.metric("최대 일별 채팅", f"{int(summary['max_daily']):,}")
+    col4.metric("평균 채팅 길이", f"{db.mean_length(None, start, end):.1f}")
 
     # 레이아웃: 왼쪽 2, 가운데 1, 오른쪽 2
     left, center, right = st.columns([1, 2, 1])
@@ -136,57 +150,43 @@ if mode == "전체 스트리머":
 
     # 왼쪽
     with top_left:
-        daily_total = chat_counts.groupby("chat_date", as_index=False)["msg_count"].sum()
         st.altair_chart(chart_line(daily_total, "chat_date", "msg_count", "일별 채팅 수"))
     with bottom_left:
-        total_users = unique_users.groupby("chat_date", as_index=False)["unique_users"].sum()
         st.altair_chart(chart_bar(total_users, "chat_date", "unique_users", "일별 채팅 유저 수"))
 
     # 가운데
     with center:
-        sim_path = os.path.join("../notebook/similarity_map", "similarity_map.png")
-        if os.path.exists(sim_path):
-            with Image.open(sim_path) as img:
-                st.image(img, caption="스트리머 채팅 유사도", use_container_width=True)
+        coords = db.similarity_map()
+        if not coords.empty:
+            coords["name"] = coords["streamer_id"].map(lambda x: streamer_map.get(x, x))
+            st.altair_chart(chart_similarity(coords, "스트리머 채팅 유사도"), use_container_width=True)
         else:
             st.warning("유사도 맵 없음")
 
     # 오른쪽
     with top_right:
-        hourly_total = chat_by_hour.groupby("chat_hour", as_index=False)["msg_count"].sum()
+        hourly_total = db.hourly_counts(None, start, end)
         st.altair_chart(chart_bar(hourly_total, "chat_hour", "msg_count", "시간대별 전체 채팅 분포"))
     with bottom_right:
-        plot_rows = []
-        for date, df_day in user_activity.groupby("chat_date"):
-            s = df_day.sort_values("user_msg_count", ascending=False)["user_msg_count"]
-            top10 = s.head(10).sum()
-            others = s.sum() - top10
-            plot_rows.append({"chat_date": date, "Top 10": top10, "Others": others})
-        df_plot = pd.DataFrame(plot_rows).sort_values("chat_date")
-        st.altair_chart(
-            chart_area_stacked(df_plot, "chat_date", ["Top 10", "Others"], "참여 집중도 (Top 10 vs Others)"),
-            use_container_width=True,
-        )
+        st.altair_chart(top_share_chart(db.top_share(None, start, end, top_n), top_n), use_container_width=True)
 
 # 스트리머별 페이지
 else:
     # 스트리머 선택
-    streamers = chat_counts["streamer_id"].unique()
-    selected = st.selectbox("스트리머 선택", sorted(streamers.tolist()), format_func=lambda x: streamer_map.get(x, x))
+    streamers = db.streamers()
+    selected = st.selectbox("스트리머 선택", streamers, format_func=lambda x: streamer_map.get(x, x))
 
-    # 데이터 필터링
-    df_counts = chat_counts[chat_counts["streamer_id"] == selected].copy()
-    df_users = unique_users[unique_users["streamer_id"] == selected].copy()
-    df_hour = chat_by_hour[chat_by_hour["streamer_id"] == selected].copy()
-    df_activity = user_activity[user_activity["streamer_id"] == selected].copy()
-    df_length = chat_length[chat_length["streamer_id"] == selected].copy()
+    # 선택한 스트리머만 조회
+    summary = db.summary(selected, start, end)
+    daily = db.daily_counts(selected, start, end)
+    daily_u = db.daily_users(selected, start, end)
 
     # 상단 number 차트
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("총 채팅 수", f"{df_counts['msg_count'].sum():,}")
-    col2.metric("총 유저 수", f"{df_users['unique_users'].sum():,}")
-    col3.metric("최대 일별 채팅", f"{df_counts['msg_count'].max():,}")
-    col4.metric("평균 채팅 길이", f"{df_length['msg_length'].mean():.1f}")
+    col1.metric("총 채팅 수", f"{int(summary['msg_count']):,}")
+    col2.metric("총 유저 수", f"{db.total_users(selected, start, end):,}")
+    col3.metric("최대 일별 채팅", f"{int(summary['max_daily']):,}")
+    col4.metric("평균 채팅 길이", f"{db.mean_length(selected, start, end):.1f}")
 
     # 레이아웃: 왼쪽 2, 가운데 1, 오른쪽 2
     left, center, right = st.columns([1, 2, 1])
@@ -201,10 +201,8 @@ else:
 
     # 왼쪽
     with top_left:
-        daily = df_counts.groupby("chat_date", as_index=False)["msg_count"].sum()
         st.altair_chart(chart_line(daily, "chat_date", "msg_count", "일별 채팅 추세"))
     with bottom_left:
-        daily_u = df_users.groupby("chat_date", as_index=False)["unique_users"].sum()
         st.altair_chart(chart_line(daily_u, "chat_date", "unique_users", "일별 고유 사용자"))
 
     # 가운데
@@ -216,19 +214,14 @@ else:
         else:
             st.warning("워드클라우드 없음")
 
+        similar = db.neighbors(selected)
+        if not similar.empty:
+            similar["name"] = similar["neighbor_id"].map(lambda x: streamer_map.get(x, x))
+            st.altair_chart(chart_bar(similar, "name:N", "similarity:Q", "채팅이 비슷한 스트리머 (코사인 유사도)"))
+
     # 오른쪽
     with top_right:
-        hourly = df_hour.groupby("chat_hour", as_index=False)["msg_count"].sum()
+        hourly = db.hourly_counts(selected, start, end)
         st.altair_chart(chart_bar(hourly, "chat_hour", "msg_count", "시간대별 채팅"))
     with bottom_right:
-        rows = []
-        for date, df_day in df_activity.groupby("chat_date"):
-            s = df_day.sort_values("user_msg_count", ascending=False)["user_msg_count"]
-            top10 = s.head(10).sum()
-            others = s.sum() - top10
-            rows.append({"chat_date": date, "Top 10": top10, "Others": others})
-        df_plot = pd.DataFrame(rows).sort_values("chat_date")
-        st.altair_chart(
-            chart_area_stacked(df_plot, "chat_date", ["Top 10", "Others"], "참여 집중도 (Top 10 vs Others)"),
-            use_container_width=True,
-        )
\ No newline at end of file
+        st.altair_chart(top_share_chart(db.top_share(selected, start, end, top_n), top_n), use_container_width=True)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import db
+from config.settings import *
+
+
+# 이전 app.py 방식 (일자별 반복 + 정렬 + dict 추가)
+def top_share_loop(df_activity, n):
+    rows = []
+    for chat_date, df_day in df_activity.groupby("chat_date"):
+        s = df_day.sort_values("user_msg_count", ascending=False)["user_msg_count"]
+        top = s.head(n).sum()
+        rows.append({"chat_date": chat_date, "top": top, "others": s.sum() - top})
+    return pd.DataFrame(rows).sort_values("chat_date")
+
+
+# 일별 사용자 채팅 수 (롱테일 분포)
+def make_activity(days, users, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=days, freq="D").date
+    return pd.DataFrame({
+        "chat_date": np.repeat(dates, users),
+        "user_msg_count": rng.zipf(1.8, size=days * users).clip(max=100_000),
+    })
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+# 같은 데이터를 임시 테이블에 넣고 윈도 함수 쿼리 시간 측정
+def bench_sql(df, n, repeat):
+    import psycopg2
+    from psycopg2.extras import execute_values
+
+    sql = SELECT_TOP_SHARE_SQL.replace("user_activity_per_streamer", "bench_activity")
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE bench_activity (streamer_id TEXT, chat_date DATE, user_msg_count INT);")
+            execute_values(
+                cur,
+                "INSERT INTO bench_activity VALUES %s",
+                [("bench", d, int(c)) for d, c in zip(df["chat_date"], df["user_msg_count"])],
+                page_size=10_000,
+            )
+            cur.execute("ANALYZE bench_activity;")
+            params = {"streamer_id": None, "start": df["chat_date"].min(), "end": df["chat_date"].max(), "n": n}
+
+            def run():
+                cur.execute(sql, params)
+                return cur.fetchall()
+
+            return _best(run, repeat)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참여 집중도 (상위 N vs 나머지) 계산 비교")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=20_000, help="일별 채팅 사용자 수")
+    parser.add_argument("--n", type=int, default=TOP_N)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sql", action="store_true", help="Postgres 윈도 함수 쿼리도 측정")
+    args = parser.parse_args()
+
+    df = make_activity(args.days, args.users, args.seed)
+    print(f"rows={len(df):,} days={args.days} users/day={args.users:,} n={args.n}")
+
+    loop_s, expected = _best(lambda: top_share_loop(df, args.n), args.repeat)
+    vec_s, result = _best(lambda: db.top_n_share(df, args.n), args.repeat)
+    assert (expected["top"].to_numpy() == result["top"].to_numpy()).all()
+    assert (expected["others"].to_numpy() == result["others"].to_numpy()).all()
+
+    print(f"{'loop (기존)':<16} {loop_s * 1000:>10.1f} ms")
+    print(f"{'pandas 벡터화':<16} {vec_s * 1000:>10.1f} ms  (x{loop_s / vec_s:.1f})")
+    if args.sql:
+        sql_s, _ = bench_sql(df, args.n, args.repeat)
+        print(f"{'SQL 윈도 함수':<16} {sql_s * 1000:>10.1f} ms  (x{loop_s / sql_s:.1f}, 전송 포함)")
+
+
+if __name__ == "__main__":
+    main()
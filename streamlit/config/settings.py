@@ -5,4 +5,25 @@ PG_HOST = os.getenv("PGHOST", "distracted_wing")
 PG_PORT = int(os.getenv("PGPORT", "5432"))
 PG_DB   = os.getenv("PGDATABASE", "postgres")
 PG_USER = os.getenv("PGUSER", "postgres")
-PG_PASS = os.getenv("PGPASSWORD", "password")
\ No newline at end of file
+PG_PASS = os.getenv("PGPASSWORD", "password")
+
+# 대시보드 연결 풀
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "8"))
+
+# 조회 캐시 (벽시계 기준 VIEW_CACHE_TTL 초마다 일괄 만료, 최대 항목 수)
+VIEW_CACHE_TTL = int(os.getenv("VIEW_CACHE_TTL", "60"))
+QUERY_CACHE_ENTRIES = int(os.getenv("QUERY_CACHE_ENTRIES", "256"))
+
+# 기본 조회 기간 (일)
+DASHBOARD_DAYS = int(os.getenv("DASHBOARD_DAYS", "30"))
+
+# 참여 집중도 상위 N명, 계산 위치 (sql: 윈도 함수, pandas: 벡터화)
+TOP_N = int(os.getenv("TOP_N", "10"))
+TOP_SHARE_MODE = os.getenv("TOP_SHARE_MODE", "sql")
+
+# 고유 사용자 수를 HLL 스케치로 계산 (hll 확장 필요, 0 이면 정확한 COUNT(DISTINCT))
+HLL_ENABLED = os.getenv("HLL_ENABLED", "1") == "1"
+
+# 유사 스트리머 표시 수
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "5"))
@@ -1,13 +1,135 @@
+# 대시보드 뷰 (collect/sub.py 가 갱신하는 증분 집계 테이블 기반, 조회 비용은 집계 행 수에 비례)
+DROP_MATERIALIZED_VIEWS = """
+DROP MATERIALIZED VIEW IF EXISTS chat_counts_per_streamer;
+DROP MATERIALIZED VIEW IF EXISTS unique_users_per_streamer;
+DROP MATERIALIZED VIEW IF EXISTS chat_counts_by_hour;
+DROP MATERIALIZED VIEW IF EXISTS user_activity_per_streamer;
+DROP MATERIALIZED VIEW IF EXISTS chat_length_distribution;
+"""
+
 CREATE_VIEW_TABLE_CHAT_COUNTS_PER_STREAMER = """
-CREATE MATERIALIZED VIEW chat_counts_per_streamer AS
-SELECT streamer_id, DATE(ts) AS chat_date, COUNT(*) AS msg_count
-FROM chat_logs
-GROUP BY streamer_id, DATE(ts);
+CREATE OR REPLACE VIEW chat_counts_per_streamer AS
+SELECT streamer_id, chat_date, msg_count
+FROM chat_counts_daily;
 """
 
 CREATE_VIEW_TABLE_UNIQUE_USER_PER_STREAMER = """
-CREATE MATERIALIZED VIEW unique_users_per_streamer AS
-SELECT streamer_id, DATE(ts) AS chat_date, COUNT(DISTINCT user_id) AS unique_users
-FROM chat_logs
-GROUP BY streamer_id, DATE(ts);
-"""
\ No newline at end of file
+CREATE OR REPLACE VIEW unique_users_per_streamer AS
+SELECT streamer_id, chat_date, COUNT(*) AS unique_users
+FROM user_counts_daily
+GROUP BY streamer_id, chat_date;
+"""
+
+CREATE_VIEW_TABLE_CHAT_COUNTS_BY_HOUR = """
+CREATE OR REPLACE VIEW chat_counts_by_hour AS
+SELECT streamer_id,
+       (bucket AT TIME ZONE 'Asia/Seoul')::date AS chat_date,
+       EXTRACT(HOUR FROM bucket AT TIME ZONE 'Asia/Seoul')::int AS chat_hour,
+       msg_count
+FROM chat_counts_hourly;
+"""
+
+CREATE_VIEW_TABLE_USER_ACTIVITY_PER_STREAMER = """
+CREATE OR REPLACE VIEW user_activity_per_streamer AS
+SELECT streamer_id, chat_date, user_key, user_msg_count
+FROM user_counts_daily;
+"""
+
+CREATE_VIEW_TABLE_CHAT_LENGTH_DISTRIBUTION = """
+CREATE OR REPLACE VIEW chat_length_distribution AS
+SELECT streamer_id, chat_date, msg_length, msg_count
+FROM chat_length_daily;
+"""
+
+# 대시보드 조회 (스트리머/기간 필터와 집계는 SQL 에서 처리, streamer_id 가 NULL 이면 전체)
+_FILTER = """
+WHERE (%(streamer_id)s IS NULL OR streamer_id = %(streamer_id)s)
+  AND chat_date BETWEEN %(start)s AND %(end)s
+"""
+
+SELECT_STREAMERS_SQL = """
+SELECT DISTINCT streamer_id FROM chat_counts_per_streamer ORDER BY streamer_id;
+"""
+
+SELECT_SUMMARY_SQL = """
+SELECT COALESCE(SUM(msg_count), 0) AS msg_count, COALESCE(MAX(msg_count), 0) AS max_daily
+FROM chat_counts_per_streamer""" + _FILTER + """;
+"""
+
+SELECT_DAILY_COUNTS_SQL = """
+SELECT chat_date, SUM(msg_count) AS msg_count
+FROM chat_counts_per_streamer""" + _FILTER + """
+GROUP BY chat_date
+ORDER BY chat_date;
+"""
+
+SELECT_DAILY_USERS_SQL = """
+SELECT chat_date, COUNT(DISTINCT user_key) AS unique_users
+FROM user_activity_per_streamer""" + _FILTER + """
+GROUP BY chat_date
+ORDER BY chat_date;
+"""
+
+SELECT_TOTAL_USERS_SQL = """
+SELECT COUNT(DISTINCT user_key) AS unique_users
+FROM user_activity_per_streamer""" + _FILTER + """;
+"""
+
+# HLL 스케치 테이블 존재 여부 (hll 확장이 없으면 collect/rollup.py 가 만들지 않음)
+SELECT_HLL_TABLE_SQL = "SELECT to_regclass('user_hll_daily') IS NOT NULL;"
+
+# HLL 스케치 병합 (collect/rollup.py 가 갱신하는 user_hll_daily, 스트리머/일자 간 중복 제거)
+SELECT_DAILY_USERS_HLL_SQL = """
+SELECT chat_date, ROUND(hll_cardinality(hll_union_agg(users)))::bigint AS unique_users
+FROM user_hll_daily""" + _FILTER + """
+GROUP BY chat_date
+ORDER BY chat_date;
+"""
+
+SELECT_TOTAL_USERS_HLL_SQL = """
+SELECT COALESCE(ROUND(hll_cardinality(hll_union_agg(users))), 0)::bigint AS unique_users
+FROM user_hll_daily""" + _FILTER + """;
+"""
+
+SELECT_HOURLY_COUNTS_SQL = """
+SELECT chat_hour, SUM(msg_count) AS msg_count
+FROM chat_counts_by_hour""" + _FILTER + """
+GROUP BY chat_hour
+ORDER BY chat_hour;
+"""
+
+SELECT_MEAN_LENGTH_SQL = """
+SELECT COALESCE(SUM(msg_length * msg_count)::float / NULLIF(SUM(msg_count), 0), 0) AS mean_length
+FROM chat_length_distribution""" + _FILTER + """;
+"""
+
+SELECT_USER_ACTIVITY_SQL = """
+SELECT chat_date, user_msg_count
+FROM user_activity_per_streamer""" + _FILTER + """;
+"""
+
+# 일별 상위 N명 채팅 수 vs 나머지 (스트리머 지정 시 PARTITION BY chat_date = (streamer_id, chat_date))
+SELECT_TOP_SHARE_SQL = """
+SELECT chat_date,
+       COALESCE(SUM(user_msg_count) FILTER (WHERE rn <= %(n)s), 0) AS top,
+       COALESCE(SUM(user_msg_count) FILTER (WHERE rn > %(n)s), 0) AS others
+FROM (
+  SELECT chat_date, user_msg_count,
+         row_number() OVER (PARTITION BY chat_date ORDER BY user_msg_count DESC) AS rn
+  FROM user_activity_per_streamer""" + _FILTER + """
+) ranked
+GROUP BY chat_date
+ORDER BY chat_date;
+"""
+
+# 스트리머 유사도 (notebook/similarity.py 가 갱신)
+SELECT_SIMILARITY_MAP_SQL = """
+SELECT streamer_id, x, y FROM streamer_coords;
+"""
+
+SELECT_NEIGHBORS_SQL = """
+SELECT neighbor_id, similarity
+FROM streamer_neighbors
+WHERE streamer_id = %(streamer_id)s AND rank <= %(k)s
+ORDER BY rank;
+"""
@@ -0,0 +1,139 @@
+import time
+import weakref
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.pool import ThreadedConnectionPool
+
+from config.settings import *
+from config.sql import *
+
+
+# 세션/스레드가 공유하는 연결 풀 (프로세스당 1개)
+@st.cache_resource
+def get_pool():
+    return ThreadedConnectionPool(
+        DB_POOL_MIN, DB_POOL_MAX,
+        host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS,
+    )
+
+
+@contextmanager
+def connection():
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        conn.autocommit = True
+        yield conn
+    except (OperationalError, InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.putconn(conn, close=broken or conn.closed != 0)
+
+
+# 연결별 user_hll_daily 존재 여부 (연결마다 한 번만 확인)
+_hll_tables = weakref.WeakKeyDictionary()
+
+
+def _has_hll(conn):
+    found = _hll_tables.get(conn)
+    if found is None:
+        with conn.cursor() as cur:
+            cur.execute(SELECT_HLL_TABLE_SQL)
+            found = _hll_tables[conn] = cur.fetchone()[0]
+    return found
+
+
+# fallback: HLL 스케치 테이블이 없을 때 대신 실행할 SQL
+def query(sql, params=None, fallback=None):
+    with connection() as conn, conn.cursor() as cur:
+        if fallback is not None and not (HLL_ENABLED and _has_hll(conn)):
+            sql = fallback
+        cur.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        return pd.DataFrame(cur.fetchall(), columns=columns)
+
+
+# 고정 주기 캐시: 벽시계 기준 VIEW_CACHE_TTL 구간이 바뀌면 모든 조회가 함께 만료
+def _window():
+    return int(time.time() // VIEW_CACHE_TTL)
+
+
+@st.cache_data(ttl=VIEW_CACHE_TTL, max_entries=QUERY_CACHE_ENTRIES, show_spinner=False)
+def _cached(sql, params, window, fallback=None):
+    return query(sql, dict(params), fallback)
+
+
+def _filtered(sql, streamer_id, start, end, fallback=None, **extra):
+    params = (("streamer_id", streamer_id), ("start", start), ("end", end), *sorted(extra.items()))
+    return _cached(sql, params, _window(), fallback)
+
+
+def streamers():
+    return _cached(SELECT_STREAMERS_SQL, (), _window())["streamer_id"].tolist()
+
+
+def summary(streamer_id, start, end):
+    return _filtered(SELECT_SUMMARY_SQL, streamer_id, start, end).iloc[0]
+
+
+def daily_counts(streamer_id, start, end):
+    return _filtered(SELECT_DAILY_COUNTS_SQL, streamer_id, start, end)
+
+
+# HLL 스케치가 없으면 (HLL_ENABLED=0 또는 hll 확장 없음) 정확한 COUNT(DISTINCT)
+def daily_users(streamer_id, start, end):
+    return _filtered(SELECT_DAILY_USERS_HLL_SQL, streamer_id, start, end, fallback=SELECT_DAILY_USERS_SQL)
+
+
+# 기간 전체 고유 사용자 (일별 합이 아닌 병합 결과)
+def total_users(streamer_id, start, end):
+    df = _filtered(SELECT_TOTAL_USERS_HLL_SQL, streamer_id, start, end, fallback=SELECT_TOTAL_USERS_SQL)
+    return int(df["unique_users"].iloc[0])
+
+
+def hourly_counts(streamer_id, start, end):
+    return _filtered(SELECT_HOURLY_COUNTS_SQL, streamer_id, start, end)
+
+
+def mean_length(streamer_id, start, end):
+    return float(_filtered(SELECT_MEAN_LENGTH_SQL, streamer_id, start, end)["mean_length"].iloc[0])
+
+
+def user_activity(streamer_id, start, end):
+    return _filtered(SELECT_USER_ACTIVITY_SQL, streamer_id, start, end)
+
+
+# 일별 상위 n명 채팅 수 합 vs 나머지
+# (일자, 채팅 수)별 사용자 수 히스토그램으로 줄인 뒤 누적합으로 상위 n명 몫 계산, 일자별 반복/전체 정렬 없음
+def top_n_share(df_activity, n):
+    if df_activity.empty:
+        return pd.DataFrame(columns=["chat_date", "top", "others"])
+    h = df_activity.groupby(["chat_date", "user_msg_count"], sort=False).size().reset_index(name="users")
+    h = h.sort_values(["chat_date", "user_msg_count"], ascending=[True, False])
+    before = h.groupby("chat_date", sort=False)["users"].cumsum() - h["users"]
+    take = (n - before).clip(lower=0, upper=h["users"])
+    h["top"] = h["user_msg_count"] * take
+    h["total"] = h["user_msg_count"] * h["users"]
+    out = h.groupby("chat_date", as_index=False)[["top", "total"]].sum()
+    out["others"] = out["total"] - out["top"]
+    return out[["chat_date", "top", "others"]]
+
+
+def top_share(streamer_id, start, end, n=TOP_N):
+    if TOP_SHARE_MODE == "pandas":
+        return top_n_share(user_activity(streamer_id, start, end), n)
+    return _filtered(SELECT_TOP_SHARE_SQL, streamer_id, start, end, n=n)
+
+
+# 유사도 지도 좌표 / 코사인 최근접 이웃 (기간과 무관)
+def similarity_map():
+    return _cached(SELECT_SIMILARITY_MAP_SQL, (), _window())
+
+
+def neighbors(streamer_id, k=SIMILAR_TOP_K):
+    return _cached(SELECT_NEIGHBORS_SQL, (("streamer_id", streamer_id), ("k", k)), _window())